@@ -10,10 +10,29 @@ import os
 import textwrap
 from discord.ext import commands, tasks
 from discord import app_commands
-from bot_setting.server_settings import load_settings, save_settings
+from bot_setting.server_settings import (
+    load_settings, save_settings, peek_settings, get_cache_stats, configure_backend,
+    mark_settings_dirty, flush_dirty_settings, load_due_reminders, new_reminder_id, put_reminder, pop_reminder
+)
 from datetime import datetime, timedelta, time as dt_time
 from logging.handlers import TimedRotatingFileHandler
 from collections import defaultdict, deque
+from usage_metrics import UsageMetrics, hour_bucket
+from reminder_scheduler import ReminderScheduler, ReminderDelivery
+from lang_detect import detect_language
+from translation_cache import TranslationCache
+from translation_batcher import (TranslationBatcher, build_single_prompt, build_batch_prompt, parse_batch_response, parse_translations,
+                                TRANSLATION_SCHEMA, BATCH_TRANSLATION_SCHEMA)
+from adaptive_limiter import AdaptiveLimiter
+from priority_scheduler import DEFAULT_PRIORITY_WEIGHTS
+from structured_output import json_parser, json_generation_config
+from retry_policy import RetryPolicy, CircuitBreaker
+from stream_renderer import StreamRenderer
+from chat_sessions import ChatSessionManager, summarize_evidence
+from translation_queue import GuildTranslationQueue
+from translation_memory import TranslationMemory
+from translation_output import TranslationOutput, TranslationPost
+from prompt_normalizer import PromptNormalizer, URL_PATTERN, EMOJI_PATTERN, estimate_tokens
 from googleapiclient.discovery import build
 import google.generativeai as genai
 from playwright.async_api import async_playwright
@@ -74,6 +93,12 @@ DISCORD_BOT_TOKEN = config['API']['DISCORD_BOT_TOKEN']
 
 genai.configure(api_key=GEMINI_API_KEY)
 
+# 서버 설정 저장소 (json / sqlite)
+configure_backend(
+    config.get('STORAGE', 'SETTINGS_BACKEND', fallback='json'),
+    config.get('STORAGE', 'SQLITE_PATH', fallback=None)
+)
+
 intents = discord.Intents.default()
 intents.message_content = True
 bot = commands.Bot(command_prefix="!", intents=intents)
@@ -83,7 +108,8 @@ discord_log_handler.addFilter(NoDiscordLogFilter())
 root.addHandler(discord_log_handler)
 
 kst = pytz.timezone('Asia/Seoul')
-URL_PATTERN = re.compile(r"https?://\S+")
+HANGUL_PATTERN = re.compile(r'[\uac00-\ud7a3]')
+TRANSLATABLE_PATTERN = re.compile(r'[a-zA-Z\u3040-\u30ff\u4e00-\u9fff]')
 
 # --- '시이' 페르소나 정의 ---
 persona = textwrap.dedent("""
@@ -117,17 +143,38 @@ persona = textwrap.dedent("""
     15. 날씨, 뉴스 등 실시간 정보를 묻는 질문은 각각 독립된 새로운 질문으로 우선 취급해야 하며, 이전 대화의 장소나 주제를 현재 질문에 잘못 연결해서는 안 된다. 단 맥락상 대화를 이어나가는 것은 가능하다.
 """)
 
+LANG_DETECT_THRESHOLD = 0.9  # 로컬 언어 감지 신뢰도가 이 이상이면 Gemini 호출 없이 판단
+MAX_TARGET_LANGUAGES = 5  # 서버당 동시에 자동 번역할 수 있는 언어 수
+STREAM_CHAT = config.getboolean('GEMINI', 'STREAM_CHAT', fallback=True)  # /시이야 답변을 받는 대로 보여줌
+STREAM_EDIT_INTERVAL = config.getint('GEMINI', 'STREAM_EDIT_INTERVAL_MS', fallback=1000) / 1000  # 스트리밍 중 메시지 수정 간격
+
 # 🔹 지원하는 언어 목록
 supported_languages = {"ko": "한국어", "en": "영어", "ja": "일본어", "zh": "중국어", "fr": "프랑스어", "de": "독일어", "es": "스페인어", "it": "이탈리아어", "ru": "러시아어", "pt": "포르투갈어"}
 
 # --- 전역 변수 설정 ---
 chat_model = None
 translation_model = None
-user_chat_sessions = {}
-API_SEMAPHORE = asyncio.Semaphore(15)
+chat_sessions = ChatSessionManager(  # 사용자별 /시이야 대화 세션 (개수·유휴 시간·대화 길이 제한)
+    lambda: chat_model.start_chat(history=[]),
+    max_sessions=config.getint('GEMINI', 'MAX_CHAT_SESSIONS', fallback=500),
+    idle_ttl=config.getint('GEMINI', 'CHAT_IDLE_MINUTES', fallback=60) * 60,
+    token_budget=config.getint('GEMINI', 'CHAT_TOKEN_BUDGET', fallback=8000)
+)
+API_LIMITER = AdaptiveLimiter(  # Gemini 동시 호출 수 (429·타임아웃이 나면 줄이고, 여유가 있으면 늘림)
+    initial_limit=config.getint('GEMINI', 'INITIAL_CONCURRENCY', fallback=15),
+    min_limit=config.getint('GEMINI', 'MIN_CONCURRENCY', fallback=2),
+    max_limit=config.getint('GEMINI', 'MAX_CONCURRENCY', fallback=64)
+)
 
 # --- 통계 및 과부하 감지용 변수 ---
-daily_command_counts = defaultdict(lambda: defaultdict(int))
+usage_metrics = UsageMetrics()  # 서버별·명령어별 시간 단위 사용량 (bot_setting/usage_metrics.db)
+translation_cache = TranslationCache()  # 반복되는 짧은 문장의 번역 결과 (bot_setting/translation_cache.db)
+translation_memory = TranslationMemory(  # 비슷한 문장의 예전 번역 (bot_setting/translation_memory.json)
+    max_entries=config.getint('TRANSLATION', 'MEMORY_SIZE', fallback=300),
+    threshold=config.getfloat('TRANSLATION', 'MEMORY_THRESHOLD', fallback=0.6)
+)
+translation_memory.load()
+prompt_normalizer = PromptNormalizer()  # 번역 프롬프트에서 코드·URL·이모지·멘션을 자리표시자로 바꿈
 SPAM_COUNT = 15
 SPAM_SECONDS = 60
 user_rate_limiter = defaultdict(lambda: deque(maxlen=SPAM_COUNT))
@@ -136,18 +183,22 @@ user_rate_limiter = defaultdict(lambda: deque(maxlen=SPAM_COUNT))
 def get_kst_now():
     return datetime.now(kst)
 
+def get_target_languages(guild_settings):
+    """자동 번역 목표 언어 목록 (예전 설정은 target_language 하나만 있음)"""
+    return list(guild_settings.get("target_languages") or [guild_settings.get("target_language", "ko")])
+
 def record_server_usage(interaction: discord.Interaction):
     if not interaction.guild: return
-    # 일일 사용량 기록
+    # 사용량 기록 (메모리 카운터만 갱신, 저장은 usage_metrics_flusher가 처리)
     if interaction.command:
-        daily_command_counts[interaction.guild.id][interaction.command.name] += 1
+        usage_metrics.record(interaction.guild.id, interaction.command.name, get_kst_now())
 
-    # 영구 사용 기록
-    history = load_server_history()
+    # 영구 사용 기록 (처음 본 서버만 저널에 한 줄 추가)
     server_id_str = str(interaction.guild.id)
-    if server_id_str not in history:
-        history[server_id_str] = {"name": interaction.guild.name if interaction.guild else "DM", "first_seen": get_kst_now().strftime("%Y-%m-%d %H:%M:%S")}
-        save_server_history(history)
+    if server_id_str not in server_history:
+        entry = {"name": interaction.guild.name if interaction.guild else "DM", "first_seen": get_kst_now().strftime("%Y-%m-%d %H:%M:%S")}
+        server_history[server_id_str] = entry
+        append_server_history(server_id_str, entry)
         log.info(f"[서버 기록] 새로운 서버 발견: {interaction.guild.name if interaction.guild else 'DM'} ({server_id_str})")
 
 async def check_rate_limit(interaction: discord.Interaction) -> bool:
@@ -185,7 +236,7 @@ async def check_setup(interaction: discord.Interaction) -> bool:
     if not interaction.guild:  # DM에서는 항상 통과
         return True
 
-    guild_settings = load_settings(str(interaction.guild.id))
+    guild_settings = peek_settings(str(interaction.guild.id))
     main_channel_id = guild_settings.get("translation_channel")  # '기본 채널' ID
 
     if main_channel_id:
@@ -198,16 +249,46 @@ async def check_setup(interaction: discord.Interaction) -> bool:
         )
         return False  # 명령어 실행 중단
 
+SERVER_HISTORY_FILE = 'server_history.json'
+SERVER_HISTORY_JOURNAL = 'server_history.jsonl'  # 스냅샷 이후 새로 발견한 서버 (한 줄에 하나)
+
 def load_server_history():
+    """스냅샷(server_history.json)을 읽고 저널(server_history.jsonl)을 이어서 반영합니다."""
     try:
-        with open('server_history.json', 'r', encoding='utf-8') as f:
-            return json.load(f)
+        with open(SERVER_HISTORY_FILE, 'r', encoding='utf-8') as f:
+            history = json.load(f)
     except (FileNotFoundError, json.JSONDecodeError):
-        return {}
+        history = {}
+    try:
+        with open(SERVER_HISTORY_JOURNAL, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # 비정상 종료로 잘린 마지막 줄은 무시
+                history.setdefault(record["id"], record["entry"])
+    except FileNotFoundError:
+        pass
+    return history
 
 def save_server_history(data):
-    with open('server_history.json', 'w', encoding='utf-8') as f:
+    temp_path = f"{SERVER_HISTORY_FILE}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
         json.dump(data, f, indent=4, ensure_ascii=False)
+    os.replace(temp_path, SERVER_HISTORY_FILE)
+
+def append_server_history(server_id_str, entry):
+    with open(SERVER_HISTORY_JOURNAL, 'a', encoding='utf-8') as f:
+        f.write(json.dumps({"id": server_id_str, "entry": entry}, ensure_ascii=False) + "\n")
+
+def compact_server_history():
+    """현재 기록 전체를 스냅샷으로 저장하고 저널을 비웁니다."""
+    if not os.path.exists(SERVER_HISTORY_JOURNAL):
+        return
+    save_server_history(server_history)
+    os.remove(SERVER_HISTORY_JOURNAL)
+
+server_history = load_server_history()  # 서버 ID(str) -> {name, first_seen}
 
 def load_blacklist():
     try:
@@ -223,6 +304,60 @@ def save_blacklist(data):
     with open('blacklist.json', 'w', encoding='utf-8') as f:
         json.dump(data, f, indent=4)
 
+class BlacklistIndex:
+    """차단 목록을 frozenset으로 메모리에 들고 있는 인덱스 (조회 시 파일을 열지 않음)"""
+    CHECK_SECONDS = 5.0  # 외부 수정 확인(mtime) 주기
+
+    def __init__(self, path='blacklist.json'):
+        self.path = path
+        self._sets = (frozenset(), frozenset())  # (차단 서버, 차단 채널) - 한 번에 교체
+        self._mtime = None
+        self._checked_at = 0.0
+
+    def _get_mtime(self):
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def reload(self):
+        data = load_blacklist()
+        self._sets = (frozenset(data.get("blocked_servers", [])), frozenset(data.get("blocked_channels", [])))
+        self._mtime = self._get_mtime()
+        self._checked_at = time.monotonic()
+
+    def _refresh_if_changed(self):
+        now = time.monotonic()
+        if now - self._checked_at < self.CHECK_SECONDS:
+            return
+        self._checked_at = now
+        if self._get_mtime() != self._mtime:
+            log.info("[차단 목록] 파일 변경을 감지해서 다시 불러왔어요.")
+            self.reload()
+
+    def is_blocked(self, guild_id=None, channel_id=None) -> bool:
+        self._refresh_if_changed()
+        blocked_servers, blocked_channels = self._sets
+        return guild_id in blocked_servers or channel_id in blocked_channels
+
+    @property
+    def blocked_servers(self) -> frozenset:
+        return self._sets[0]
+
+    @property
+    def blocked_channels(self) -> frozenset:
+        return self._sets[1]
+
+    def update(self, blocked_servers, blocked_channels):
+        """새 차단 목록으로 인덱스를 원자적으로 교체하고 파일에 저장"""
+        new_sets = (frozenset(blocked_servers), frozenset(blocked_channels))
+        save_blacklist({"blocked_servers": sorted(new_sets[0]), "blocked_channels": sorted(new_sets[1])})
+        self._sets = new_sets
+        self._mtime = self._get_mtime()
+
+blacklist_index = BlacklistIndex()
+blacklist_index.reload()
+
 def setup_search_tools():
     try:
         g_api_key = config['GOOGLE_SEARCH']['API_KEY']
@@ -351,52 +486,94 @@ async def custom_google_search(query: str, num_results: int = 3, date_restrict:
         return []
 
 # --- Gemini API 함수들 ---
-def async_retry_with_backoff(retries=3, backoff_in_seconds=1):
+# Gemini 장애 시 잠시 호출 중단 (우선순위 클래스별로 따로 두어 자동 번역 실패가 /시이야를 막지 않게 함)
+GEMINI_BREAKERS = {name: CircuitBreaker(failure_threshold=5, cooldown=30.0) for name in DEFAULT_PRIORITY_WEIGHTS}
+RETRY_POLICIES = {}  # 함수 이름 -> RetryPolicy (/캐시통계 지표용)
+
+def async_retry_with_backoff(retries=3, backoff_in_seconds=1, deadline=None, fallback=None, priority="background"):
+    """
+    Gemini 호출용 재시도 데코레이터. 재시도할 만한 오류만 jitter 백오프로 다시 시도하고,
+    deadline(초)을 넘기거나 서킷 브레이커가 열려 있으면 바로 실패합니다. 최종 실패 시 fallback(error, *args, **kwargs) 값을 반환합니다.
+    priority: interactive(/시이야) / manual(/번역) / background(자동 번역) - API_LIMITER 대기열에서의 우선순위
+    """
     def decorator(func):
-        async def wrapper(*args, **kwargs):
-            _retries, _backoff = retries, backoff_in_seconds
-            while _retries > 1:
-                try:
-                    async with API_SEMAPHORE:
-                        return await func(*args, **kwargs)
-                except Exception as e:
-                    log.warning(f"API 호출 실패: {e}. {_backoff}초 후 재시도합니다...")
-                    await asyncio.sleep(_backoff)
-                    _retries -= 1
-                    _backoff *= 2
-            async with API_SEMAPHORE:
-                return await func(*args, **kwargs)
-        return wrapper
+        policy = RETRY_POLICIES.get(func.__name__)
+        if policy is None:
+            policy = RETRY_POLICIES[func.__name__] = RetryPolicy(
+                func.__name__, retries=retries, base_backoff=backoff_in_seconds, deadline=deadline,
+                limiter=API_LIMITER, breaker=GEMINI_BREAKERS[priority], fallback=fallback, priority=priority
+            )
+        return policy(func)
     return decorator
 
-@async_retry_with_backoff()
-async def translate_text_gemini(text, target_lang="ko"):
-    log.info(f"-> Gemini 번역 요청: '{text}'")
-    try:
-        prompt = f"""Analyze the following text. Your primary language for analysis is Korean. 1. First, identify the main language of the text. 2. If the text contains any Korean characters, translation is not needed. 3. Translate the text into Korean ({target_lang}) ONLY IF translation is necessary. Provide the output ONLY in JSON format: {{"detected_language_code": "ISO 639-1 code", "translation_needed": boolean, "translated_text": "Translated text or empty string"}} Original Text: --- {text} ---"""
-        response = await translation_model.generate_content_async(prompt)
-        cleaned_response = response.text.strip().replace("```json", "").replace("```", "")
-        result = json.loads(cleaned_response)
-        detected_language = result.get("detected_language_code", "N/A")
-        translated_text = result.get("translated_text", "")
+def protect_for_prompt(text):
+    """번역할 필요 없는 조각을 자리표시자로 바꾸고, 줄어든 토큰 수를 기록합니다."""
+    protected, spans = prompt_normalizer.protect(text)
+    if spans:
+        log.debug(f"[NO_DISCORD] [프롬프트 정규화] 조각 {len(spans)}개 보호, 토큰 약 {estimate_tokens(text):.0f} → {estimate_tokens(protected):.0f}")
+    return protected, spans
 
-        if translated_text:
+@async_retry_with_backoff(deadline=20, fallback=lambda e, *args, **kwargs: ({}, "error"))
+async def translate_text_gemini(text, target_langs=("ko",)):
+    """text를 target_langs의 모든 언어로 한 번에 번역합니다. → ({언어 코드: 번역문}, 감지된 언어)"""
+    log.info(f"-> Gemini 번역 요청: '{text}'")
+    protected, spans = protect_for_prompt(text)
+    prompt = build_single_prompt(protected, target_langs)
+    response = await translation_model.generate_content_async(prompt, generation_config=json_generation_config(TRANSLATION_SCHEMA))
+    result = json_parser.parse(response.text)
+    detected_language = result.get("detected_language_code", "N/A")
+    translations = {lang: prompt_normalizer.restore(translated_text, spans, text) for lang, translated_text in parse_translations(result, target_langs).items()}
+
+    for target_lang, translated_text in translations.items():
+        log.info(f"-> 자동 번역 결과 ({detected_language}→{target_lang}): '{translated_text}'")
+
+    return translations, detected_language
+
+@async_retry_with_backoff(deadline=30)
+async def translate_batch_gemini(items):
+    """여러 메시지를 API 호출 한 번으로 번역합니다. 실패하면 예외를 그대로 올려 개별 번역으로 넘깁니다."""
+    log.info(f"-> Gemini 배치 번역 요청: {len(items)}개")
+    protected_items = [protect_for_prompt(text) + (target_langs,) for text, target_langs in items]
+    prompt_items = [(protected, target_langs) for protected, _, target_langs in protected_items]
+    response = await translation_model.generate_content_async(build_batch_prompt(prompt_items), generation_config=json_generation_config(BATCH_TRANSLATION_SCHEMA))
+    results = [({lang: prompt_normalizer.restore(translated_text, spans, text) for lang, translated_text in translations.items()}, detected_language)
+               for (text, _), (_, spans, _), (translations, detected_language) in zip(items, protected_items, parse_batch_response(response.text, prompt_items))]
+    for translations, detected_language in results:
+        for target_lang, translated_text in translations.items():
             log.info(f"-> 자동 번역 결과 ({detected_language}→{target_lang}): '{translated_text}'")
+    return results
+
+@async_retry_with_backoff(deadline=20, fallback=lambda e, *args, **kwargs: ("", "error"))
+async def adapt_translation_gemini(text, target_lang, memory_entry):
+    """비슷한 예전 번역을 고쳐 쓰게 하는 짧은 프롬프트로 번역합니다. (JSON 분석 없이 번역문만 받음)"""
+    log.info(f"-> Gemini 번역 수정 요청: '{text}'")
+    prompt = f"""Previous message: {memory_entry['source']}\nIts translation ({target_lang}): {memory_entry['translation']}\nAdapt the translation for this similar message. Output ONLY the translated text.\nMessage: {text}"""
+    response = await translation_model.generate_content_async(prompt)
+    translated_text = response.text.strip()
+    log.info(f"-> 자동 번역 결과 ({memory_entry['detected_language']}→{target_lang}, 번역 메모리): '{translated_text}'")
+    return translated_text, memory_entry["detected_language"]
+
+translation_batcher = TranslationBatcher(
+    translate_batch_gemini, translate_text_gemini,
+    flush_window=config.getint('TRANSLATION', 'BATCH_WINDOW_MS', fallback=300) / 1000,
+    # 자동 번역 워커 하나가 메시지 하나씩 기다리므로 한 배치는 MAX_WORKERS개를 넘을 수 없음 (넘게 잡으면 시간 창으로만 보내짐)
+    max_batch_size=min(config.getint('TRANSLATION', 'BATCH_SIZE', fallback=16), config.getint('TRANSLATION', 'MAX_WORKERS', fallback=16))
+)
 
-        return translated_text, detected_language
-    except Exception as e:
-        log.error(f"Gemini 번역 오류: {e}")
-        return f"번역 중 오류 발생: {e}", "error"
+SEARCH_QUERY_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {"search_query": {"type": "STRING"}, "date_restrict": {"type": "STRING"}},
+    "required": ["search_query", "date_restrict"]
+}
 
-@async_retry_with_backoff()
+@async_retry_with_backoff(deadline=15, fallback=lambda e, question, *args, **kwargs: (question, None), priority="interactive")
 async def get_search_query_from_gemini(question: str, history: list, current_time: str, forced_keywords: str = "") -> tuple[str, str | None]:
     """AI를 이용해 검색어와, 상황에 맞는 기간 필터(dateRestrict)를 함께 추출합니다."""
-    try:
-        log.info(" -> AI에게 대화 맥락 기반 핵심 검색어 및 기간 필터 추출 요청")
-        
-        history_str = "\n".join([f"- {msg['role']}: {msg['parts'][0]}" for msg in history])
-        
-        keyword_prompt = f"""너는 사용자의 질문을 분석해, 가장 효과적인 구글 검색어와 '기간 필터'를 결정하는 검색 전문가다.
+    log.info(" -> AI에게 대화 맥락 기반 핵심 검색어 및 기간 필터 추출 요청")
+    
+    history_str = "\n".join([f"- {msg['role']}: {msg['parts'][0]}" for msg in history])
+    
+    keyword_prompt = f"""너는 사용자의 질문을 분석해, 가장 효과적인 구글 검색어와 '기간 필터'를 결정하는 검색 전문가다.
 
 [현재 시각]
 {current_time}
@@ -424,79 +601,109 @@ async def get_search_query_from_gemini(question: str, history: list, current_tim
   "date_restrict": "d1, w1, m1, None 중 선택한 값"
 }}
 """
-        
-        response = await translation_model.generate_content_async(keyword_prompt)
-        cleaned_response = response.text.strip().replace("```json", "").replace("```", "")
-        result = json.loads(cleaned_response)
+    
+    response = await translation_model.generate_content_async(keyword_prompt, generation_config=json_generation_config(SEARCH_QUERY_SCHEMA))
+    result = json_parser.parse(response.text)
 
-        search_query = result.get("search_query", question)
-        date_restrict = result.get("date_restrict")
-        
-        if date_restrict not in ['d1', 'w1', 'm1']:
-            date_restrict = None
+    search_query = result.get("search_query", question)
+    date_restrict = result.get("date_restrict")
+    
+    if date_restrict not in ['d1', 'w1', 'm1']:
+        date_restrict = None
 
-        log.info(f" -> AI가 추출한 검색어: '{search_query}', 기간 필터: {date_restrict}")
-        return search_query, date_restrict
-        
-    except Exception as e:
-        log.error(f"검색어/기간 필터 추출 중 오류: {e}")
-        return question, None
+    log.info(f" -> AI가 추출한 검색어: '{search_query}', 기간 필터: {date_restrict}")
+    return search_query, date_restrict
 
-@async_retry_with_backoff()
-async def ask_gemini_chat(interaction: discord.Interaction, user, question: str, log_prompt: str | None = None):
+def get_function_call(response):
+    """응답의 첫 부분이 도구 호출이면 반환 (없으면 None)"""
+    try:
+        if response.parts and hasattr(response.parts[0], 'function_call'):
+            return response.parts[0].function_call
+    except (IndexError, AttributeError):
+        pass
+    return None
+
+async def send_chat_message(chat_session, content, stream_renderer=None):
+    """stream_renderer가 있으면 스트리밍으로 받으면서 받은 글자를 넘겨줍니다. (메시지 수정은 렌더러 작업이 따로 함)"""
+    if stream_renderer is None:
+        return await chat_session.send_message_async(content)
+    turn_start = len(stream_renderer.text)
+    response = await chat_session.send_message_async(content, stream=True)
+    async for chunk in response:
+        try:
+            text = chunk.text
+        except ValueError:
+            continue  # 도구 호출처럼 글자가 없는 조각
+        if text:
+            stream_renderer.feed(text)
+    if get_function_call(response):
+        stream_renderer.rewind(turn_start)  # 도구 호출 턴의 중간 답변은 보여주지 않음
+    return response
+
+@async_retry_with_backoff(deadline=60, fallback=lambda e, *args, **kwargs: "죄송해요, 함장님! 지금은 생각 회로에 작은 문제가 생긴 것 같아요!", priority="interactive")
+async def ask_gemini_chat(interaction: discord.Interaction, user, question: str, log_prompt: str | None = None, stream_renderer: StreamRenderer | None = None,
+                          history_prompt: str | None = None):
     # 만약 기록용 프롬프트가 없다면, 그냥 실행용 프롬프트를 기록합니다 (안전장치).
+    # history_prompt가 있으면 턴이 끝난 뒤 대화 기록에는 question 대신 이것만 남깁니다. (수집한 자료 원문 제외)
     prompt_to_log = log_prompt if log_prompt else question
     log.info(f"-> Gemini 대화 요청: '{prompt_to_log}'")
+    if stream_renderer:
+        stream_renderer.rewind(0)  # 재시도 시 앞서 받다 만 답변은 버림
     
     session_id = user.id
+    chat_session = chat_sessions.get(session_id)
+    history_before = list(chat_session.history)
     try:
-        if session_id not in user_chat_sessions:
-            user_chat_sessions[session_id] = chat_model.start_chat(history=[])
-
-        chat_session = user_chat_sessions[session_id]
-        
-        # AI에게는 실행용(원본) 프롬프트를 전달합니다.
-        response = await chat_session.send_message_async(question)
-
-        while True:
-            function_call = None
-            try:
-                if response.parts and hasattr(response.parts[0], 'function_call'):
-                    function_call = response.parts[0].function_call
-            except (IndexError, AttributeError):
-                pass
-
-            if function_call:
-                if function_call.name == 'google_search':
-                    query = function_call.args.get('query', '')
-                    log.info(f"-> Google 검색 실행 (중간 답변 무시): '{query}'")
-                    await interaction.edit_original_response(content=f"🔍 '{query}'에 대해 검색하고 있어요...")
-                    search_result = await custom_google_search(query, num_results=3) 
-                    
-                    # 이 부분은 현재 메인 로직에서는 사용되지 않지만, 만약을 위해 남겨둡니다.
-                    log.info(f"-> Google 검색 결과 (일부): {search_result[:100]}...")
-                    
-                    await interaction.edit_original_response(content="📝 찾은 정보를 정리하고 있어요...")
-                    
-                    response = await chat_session.send_message_async(
-                        [genai.protos.Part(
-                            function_response=genai.protos.FunctionResponse(
-                                name='google_search',
-                                response={'result': str(search_result)} # 결과를 문자열로 변환
-                            )
-                        )]
-                    )
-                    continue
-                else:
-                    log.warning(f"알 수 없는 함수 호출 시도: {function_call.name}")
-                    return "음... 뭔가 잘못된 도구를 사용하려고 한 것 같아요! 다른 질문을 해주시겠어요?"
-            
+        answer = await run_chat_turn(interaction, chat_session, question, stream_renderer)
+    except BaseException:
+        # 중간에 끊긴 스트림은 세션을 깨진 상태로 남기므로(이후 history 접근이 실패함), 턴 시작 전 기록으로 되돌림
+        chat_session.history = history_before
+        raise
+    if answer is None:
+        chat_session.history = history_before  # 답이 끝나지 않은 도구 호출 턴은 기록에 남기지 않음
+        return "음... 뭔가 잘못된 도구를 사용하려고 한 것 같아요! 다른 질문을 해주시겠어요?"
+    if history_prompt:
+        chat_sessions.compact_turn(session_id, len(history_before), history_prompt)
+    chat_sessions.trim(session_id)  # 한 턴이 끝난 뒤 대화 기록을 토큰 예산 안으로 정리
+    return answer
+
+async def run_chat_turn(interaction: discord.Interaction, chat_session, question: str, stream_renderer: StreamRenderer | None = None):
+    """질문 하나를 보내고 도구 호출(검색)을 처리한 뒤 최종 답변을 반환합니다. 알 수 없는 도구를 부르면 None"""
+    # AI에게는 실행용(원본) 프롬프트를 전달합니다.
+    response = await send_chat_message(chat_session, question, stream_renderer)
+
+    while True:
+        function_call = get_function_call(response)
+
+        if function_call:
+            if function_call.name == 'google_search':
+                query = function_call.args.get('query', '')
+                log.info(f"-> Google 검색 실행 (중간 답변 무시): '{query}'")
+                await interaction.edit_original_response(content=f"🔍 '{query}'에 대해 검색하고 있어요...")
+                search_result = await custom_google_search(query, num_results=3) 
+                
+                # 이 부분은 현재 메인 로직에서는 사용되지 않지만, 만약을 위해 남겨둡니다.
+                log.info(f"-> Google 검색 결과 (일부): {search_result[:100]}...")
+                
+                await interaction.edit_original_response(content="📝 찾은 정보를 정리하고 있어요...")
+                
+                response = await send_chat_message(
+                    chat_session,
+                    [genai.protos.Part(
+                        function_response=genai.protos.FunctionResponse(
+                            name='google_search',
+                            response={'result': str(search_result)} # 결과를 문자열로 변환
+                        )
+                    )],
+                    stream_renderer
+                )
+                continue
             else:
-                return "".join(part.text for part in response.parts if hasattr(part, 'text')).strip()
-
-    except Exception as e:
-        log.error(f"Gemini 대화 오류: {e}")
-        return "죄송해요, 함장님! 지금은 생각 회로에 작은 문제가 생긴 것 같아요!"
+                log.warning(f"알 수 없는 함수 호출 시도: {function_call.name}")
+                return None
+        
+        else:
+            return "".join(part.text for part in response.parts if hasattr(part, 'text')).strip()
 
 # --- 알림 관련 클래스 및 함수 ---
 class TimeInputModal(discord.ui.Modal, title="⏰ 알림 시간 설정"):
@@ -533,15 +740,14 @@ class TimeInputModal(discord.ui.Modal, title="⏰ 알림 시간 설정"):
             return
 
         guild_id = str(interaction.guild.id)
-        guild_settings = load_settings(guild_id)
         reminder_data = {
-            "user_id": interaction.user.id, "guild_id": guild_id, "channel_id": interaction.channel.id,
+            "id": new_reminder_id(), "user_id": interaction.user.id, "guild_id": guild_id, "channel_id": interaction.channel.id,
             "frequency": self.frequency, "time": reminder_time.strftime("%Y-%m-%d %H:%M:%S"), "message": self.message
         }
-        guild_settings.setdefault("reminders", []).append(reminder_data)
-        save_settings(guild_id, guild_settings)
+        put_reminder(guild_id, reminder_data, immediate=True)
+        if is_within_window(reminder_data):
+            register_reminder(reminder_data)
         await interaction.response.send_message(f"✅ 약속을 기억했어요!\n📅 `{reminder_time.strftime('%Y-%m-%d %H:%M:%S')}`\n💬 `{self.message}`", ephemeral=True)
-        asyncio.create_task(schedule_reminder(reminder_data))
 
 class ReminderFrequencyView(discord.ui.View):
     def __init__(self, message: str):
@@ -556,50 +762,100 @@ class ReminderFrequencyView(discord.ui.View):
     async def daily_reminder(self, interaction: discord.Interaction, button: discord.ui.Button):
         await interaction.response.send_modal(TimeInputModal("매일", self.message))
 
-async def schedule_reminder(reminder_data):
+# 알림은 서버 설정에 저장해두고, 가까운 시일(REMINDER_WINDOW) 안에 울릴 알림만 스케줄러에 올림
+REMINDER_WINDOW = timedelta(hours=1)
+reminder_index = {}  # 스케줄러에 올라간 알림: reminder_id -> reminder_data
+reminder_settled_at = {}  # 울렸거나 삭제되어 인덱스에서 빠진 알림: reminder_id -> time.monotonic() (refill 중복 방지용)
+last_refill_started = 0.0
+
+def next_fire_time(reminder_data):
+    """알림이 다음에 울릴 시각 (매일 알림은 지난 시각이면 다음 회차로)"""
+    now = get_kst_now()
+    target_time = kst.localize(datetime.strptime(reminder_data["time"], "%Y-%m-%d %H:%M:%S"))
+    if target_time < now and reminder_data["frequency"] == "매일":
+        target_time = now.replace(hour=target_time.hour, minute=target_time.minute, second=target_time.second, microsecond=target_time.microsecond)
+        while target_time < now:
+            target_time += timedelta(days=1)
+    return target_time
+
+def is_within_window(reminder_data) -> bool:
+    return next_fire_time(reminder_data) < get_kst_now() + REMINDER_WINDOW
+
+def schedule_reminder(reminder_data):
+    """알림을 중앙 스케줄러에 등록합니다."""
+    target_time = next_fire_time(reminder_data)
+    if target_time > get_kst_now():
+        log.info(f"⏰ 알림 예약: {target_time.strftime('%Y-%m-%d %H:%M:%S')} (대상: {reminder_data['user_id']})")
+    reminder_scheduler.schedule(reminder_data["id"], target_time.timestamp(), reminder_data)
+
+def register_reminder(reminder_data):
+    """알림을 인덱스에 추가하고 스케줄러에 등록합니다. (이미 올라가 있으면 무시)"""
+    if reminder_data["id"] in reminder_index:
+        return
+    reminder_index[reminder_data["id"]] = reminder_data
+    schedule_reminder(reminder_data)
+
+def unregister_reminder(reminder_id):
+    """알림을 인덱스에서 빼고 대기 중인 타이머도 취소합니다."""
+    reminder_data = reminder_index.pop(reminder_id, None)
+    reminder_scheduler.cancel(reminder_id)
+    reminder_settled_at[reminder_id] = time.monotonic()
+    return reminder_data
+
+def _fetch_due_reminders(until):
+    flush_dirty_settings()  # 지연 저장 중인 알림 변경분을 먼저 반영
+    return load_due_reminders(until)
+
+async def refill_reminders():
+    """다음 REMINDER_WINDOW 안에 울릴 알림을 저장소에서 불러와 스케줄러에 올립니다."""
+    global last_refill_started
+    until = (get_kst_now() + REMINDER_WINDOW).strftime("%Y-%m-%d %H:%M:%S")
+    started = time.monotonic()
+    due_reminders = await asyncio.to_thread(_fetch_due_reminders, until)
+    loaded = 0
+    for r in due_reminders:
+        if not bot.get_guild(int(r["guild_id"])):
+            continue  # 더 이상 접속하지 않은 서버
+        if r["id"] in reminder_settled_at:
+            continue  # 최근에 울렸거나 삭제된 알림의 예전 기록 (읽는 동안 정리된 경우) → 다시 올리면 두 번 울림
+        if r["id"] not in reminder_index:
+            register_reminder(r)
+            loaded += 1
+    # 지난번 refill 전에 정리된 알림은 그 사이 지연 저장까지 반영되었으므로 더 기억할 필요 없음
+    # (매일 알림의 다음 회차는 하루 뒤라 잠시 건너뛰어도 창 안에 들어오기 전에 다시 올라옴)
+    for reminder_id in [k for k, settled in reminder_settled_at.items() if settled < last_refill_started]:
+        del reminder_settled_at[reminder_id]
+    last_refill_started = started
+    log.info(f"[NO_DISCORD] ⏰ 알림 {loaded}개를 새로 불러왔어요. (스케줄러 대기: {len(reminder_scheduler)}개)")
+
+async def fire_reminder(reminder_id, reminder_data, due_ts):
     try:
-        now = get_kst_now()
-        target_time = kst.localize(datetime.strptime(reminder_data["time"], "%Y-%m-%d %H:%M:%S"))
-        if target_time < now and reminder_data["frequency"] == "매일":
-            target_time = now.replace(hour=target_time.hour, minute=target_time.minute, second=target_time.second, microsecond=target_time.microsecond)
-            while target_time < now:
-                target_time += timedelta(days=1)
-
-        wait_time = (target_time - now).total_seconds()
-        if wait_time > 0:
-            log.info(f"⏰ 알림 예약: {target_time.strftime('%Y-%m-%d %H:%M:%S')} (대상: {reminder_data['user_id']})")
-            await asyncio.sleep(wait_time)
-
+        if reminder_index.get(reminder_id) is not reminder_data:
+            return  # 그 사이 삭제되었거나 교체된 알림
+        target_time = datetime.fromtimestamp(due_ts, kst)
         log.info(f"⏰ 알림 실행: '{reminder_data['message']}'")
         guild = bot.get_guild(int(reminder_data["guild_id"]))
         target_channel = bot.get_channel(reminder_data["channel_id"])
         user = guild.get_member(reminder_data["user_id"]) if guild else None
 
         if target_channel:
-            await target_channel.send(f"⏰ <@{reminder_data['user_id']}> 님, 약속 시간이에요! '{reminder_data['message']}'")
+            reminder_delivery.enqueue(target_channel, f"⏰ <@{reminder_data['user_id']}> 님, 약속 시간이에요! '{reminder_data['message']}'")
         elif user:
             await user.send(f"⏰ [{guild.name if guild else '알수없는 서버'}] 알림: '{reminder_data['message']}'")
 
-        guild_id = str(reminder_data["guild_id"])
-        guild_settings = load_settings(guild_id)
-        current_reminders = guild_settings.get("reminders", [])
-        updated_reminders = []
-        rescheduled = False
-        for r in current_reminders:
-            if r['time'] == reminder_data['time'] and r['message'] == reminder_data['message']:
-                if r["frequency"] == "매일" and not rescheduled:
-                    next_time = target_time + timedelta(days=1)
-                    r["time"] = next_time.strftime("%Y-%m-%d %H:%M:%S")
-                    updated_reminders.append(r)
-                    asyncio.create_task(schedule_reminder(r))
-                    rescheduled = True
-            else:
-                updated_reminders.append(r)
-        guild_settings["reminders"] = updated_reminders
-        save_settings(guild_id, guild_settings)
+        unregister_reminder(reminder_id)
+        if reminder_data["frequency"] == "매일":
+            next_time = target_time + timedelta(days=1)
+            reminder_data["time"] = next_time.strftime("%Y-%m-%d %H:%M:%S")
+            put_reminder(reminder_data["guild_id"], reminder_data)  # 다음 회차는 refill 때 다시 스케줄러에 올라옴
+        else:
+            pop_reminder(reminder_data["guild_id"], reminder_id)
     except Exception as e:
         log.error(f"알림 실행 중 오류: {e}")
 
+reminder_scheduler = ReminderScheduler(fire_reminder)  # 모든 알림을 타이머 하나로 관리
+reminder_delivery = ReminderDelivery()  # 같은 채널 알림은 묶어서 전송
+
 # =======================
 # 자동 실행 작업 (Tasks)
 # =======================
@@ -613,10 +869,26 @@ async def periodic_time_check():
 async def before_periodic_time_check():
     await bot.wait_until_ready() # 봇이 완전히 준비될 때까지 대기
 
+def build_usage_report(title, counts) -> str:
+    """{guild_id: {command: count}} 집계를 보고서 문자열로 만듭니다."""
+    lines = [f"## 📊 {title}", ""]
+    sorted_servers = sorted(counts.items(), key=lambda item: sum(item[1].values()), reverse=True)
+
+    for server_id, commands in sorted_servers:
+        server = bot.get_guild(server_id)
+        server_name = server.name if server else f"알 수 없는 서버 ({server_id})"
+        lines.append(f"### 🏢 {server_name} (총 {sum(commands.values())}회)")
+        for command_name, count in sorted(commands.items(), key=lambda item: item[1], reverse=True):
+            lines.append(f"- `/{command_name}`: {count}회")
+        lines.append("")
+    return "\n".join(lines)
+
 @tasks.loop(time=dt_time(hour=0, minute=1, tzinfo=kst))
 async def daily_stats_report():
-    global daily_command_counts
-    if not daily_command_counts:
+    today = get_kst_now().replace(hour=0, minute=0, second=0, microsecond=0)
+    yesterday = today - timedelta(days=1)
+    counts = usage_metrics.guild_command_counts(hour_bucket(yesterday), hour_bucket(today))
+    if not counts:
         log.info("[일일 통계] 어제는 봇 사용 기록이 없었어요!")
         return
 
@@ -630,27 +902,19 @@ async def daily_stats_report():
         log.warning("[일일 통계] 봇 주인을 찾을 수 없어 보고서를 보낼 수 없어요.")
         return
 
-    yesterday = (get_kst_now() - timedelta(days=1)).strftime("%Y년 %m월 %d일")
-    report_message = f"## 📊 {yesterday} 시이 일일 보고서\n\n"
-
-    sorted_servers = sorted(daily_command_counts.items(), key=lambda item: sum(item[1].values()), reverse=True)
-
-    for server_id, commands in sorted_servers:
-        server = bot.get_guild(server_id)
-        server_name = server.name if server else f"알 수 없는 서버 ({server_id})"
-        total_usage = sum(commands.values())
-
-        report_message += f"### 🏢 {server_name} (총 {total_usage}회)\n"
-        sorted_commands = sorted(commands.items(), key=lambda item: item[1], reverse=True)
-        for command_name, count in sorted_commands:
-            report_message += f"- `/{command_name}`: {count}회\n"
-        report_message += "\n"
+    report_message = build_usage_report(f"{yesterday.strftime('%Y년 %m월 %d일')} 시이 일일 보고서", counts)
 
     log.info("[일일 통계] 어제 자 사용량 통계를 봇 주인에게 보고합니다.")
     for chunk in [report_message[i:i + 1990] for i in range(0, len(report_message), 1990)]:
         await owner.send(chunk)
 
-    daily_command_counts = defaultdict(lambda: defaultdict(int))
+@tasks.loop(seconds=60)
+async def usage_metrics_flusher():
+    """1분마다 모아둔 사용량 카운터를 이벤트 루프 밖에서 DB에 합산합니다."""
+    try:
+        await asyncio.to_thread(usage_metrics.flush)
+    except Exception as e:
+        log.error(f"[사용량 통계] 저장 중 오류: {e}")
 
 
 @tasks.loop(seconds=3.0)
@@ -678,6 +942,62 @@ async def log_batch_sender():
         except Exception as e:
             print(f"로그 전송 실패: {e}")
 
+@tasks.loop(minutes=30)
+async def reminder_refill():
+    """30분마다 다음 REMINDER_WINDOW 동안 울릴 알림을 스케줄러에 채워 넣습니다."""
+    try:
+        await refill_reminders()
+    except Exception as e:
+        log.error(f"[알림] 알림 불러오기 중 오류: {e}")
+
+@tasks.loop(seconds=30)
+async def translation_cache_flusher():
+    """30초마다 새 번역 캐시 항목을 이벤트 루프 밖에서 디스크에 기록합니다."""
+    try:
+        await asyncio.to_thread(translation_cache.flush)
+    except Exception as e:
+        log.error(f"[번역 캐시] 저장 중 오류: {e}")
+
+@tasks.loop(minutes=5)
+async def translation_memory_saver():
+    """5분마다 번역 메모리를 이벤트 루프 밖에서 파일로 저장합니다."""
+    try:
+        await asyncio.to_thread(translation_memory.save)
+    except Exception as e:
+        log.error(f"[번역 메모리] 저장 중 오류: {e}")
+
+@tasks.loop(minutes=10)
+async def chat_session_sweeper():
+    """10분마다 오래 쓰지 않은 /시이야 대화 세션을 정리합니다."""
+    try:
+        evicted = chat_sessions.evict_idle()
+        if evicted:
+            log.info(f"[대화 세션] 오래 쓰지 않은 대화 {evicted}개를 정리했어요. (남은 대화: {len(chat_sessions)}개)")
+    except Exception as e:
+        log.error(f"[대화 세션] 정리 중 오류: {e}")
+
+@tasks.loop(hours=6)
+async def server_history_compactor():
+    """6시간마다 서버 기록 저널을 스냅샷으로 합칩니다."""
+    try:
+        compact_server_history()
+    except Exception as e:
+        log.error(f"[서버 기록] 저널 정리 중 오류: {e}")
+
+@tasks.loop(seconds=2.0)
+async def settings_flusher():
+    """지연 저장 대기 중인 서버 설정을 이벤트 루프 밖에서 한꺼번에 저장합니다."""
+    try:
+        written = await asyncio.to_thread(flush_dirty_settings)
+        if written:
+            log.debug(f"[NO_DISCORD] [설정 저장] {written}개 서버 설정 저장 완료")
+    except Exception as e:
+        log.error(f"[설정 저장] 지연 저장 중 오류: {e}")
+
+@settings_flusher.after_loop
+async def after_settings_flusher():
+    flush_dirty_settings()  # 종료 직전 남은 설정 저장
+
 @log_batch_sender.before_loop
 async def before_log_batch_sender():
     await bot.wait_until_ready() # 봇이 완전히 준비될 때까지 대기
@@ -722,14 +1042,23 @@ async def on_ready():
         log.error(f"슬래시 명령어 동기화 중 오류: {e}")
 
     daily_stats_report.start()
-    for guild in bot.guilds:
-        guild_settings = load_settings(str(guild.id))
-        if "reminders" in guild_settings:
-            for r in guild_settings["reminders"]:
-                asyncio.create_task(schedule_reminder(r))
+    if not reminder_refill.is_running():
+        reminder_refill.start()  # 가까운 시일 안에 울릴 알림만 불러옴
     
     periodic_time_check.start()
     log_batch_sender.start()
+    if not settings_flusher.is_running():
+        settings_flusher.start()
+    if not server_history_compactor.is_running():
+        server_history_compactor.start()
+    if not usage_metrics_flusher.is_running():
+        usage_metrics_flusher.start()
+    if not translation_cache_flusher.is_running():
+        translation_cache_flusher.start()
+    if not translation_memory_saver.is_running():
+        translation_memory_saver.start()
+    if not chat_session_sweeper.is_running():
+        chat_session_sweeper.start()
 
 # =======================
 # 명령어 구현 부분
@@ -745,19 +1074,15 @@ WEEKLY_SEARCH_LIMIT = 150 # 서버당 주간 무료 검색 횟수 제한
 async def ask_shii(interaction: discord.Interaction, 질문: str):
     if not await check_setup(interaction): return
     record_server_usage(interaction)
-    blacklist = load_blacklist()
-    if interaction.guild and interaction.guild.id in blacklist["blocked_servers"]: return
-    if interaction.channel.id in blacklist["blocked_channels"]: return
+    if blacklist_index.is_blocked(interaction.guild.id if interaction.guild else None, interaction.channel.id): return
     if await check_rate_limit(interaction): return
 
     log.info(f"/{interaction.command.name} (서버: {interaction.guild.name if interaction.guild else 'DM'}, 사용자: {interaction.user})")
+    request_started = time.monotonic()
     await interaction.response.defer(thinking=True)
 
     session_id = interaction.user.id
-    if session_id not in user_chat_sessions:
-        user_chat_sessions[session_id] = chat_model.start_chat(history=[])
-    
-    chat_session = user_chat_sessions[session_id]
+    chat_session = chat_sessions.get(session_id)
     
     history = chat_session.history
     current_time_str = get_kst_now().strftime("%Y년 %m월 %d일 %H시 %M분")
@@ -810,6 +1135,7 @@ async def ask_shii(interaction: discord.Interaction, 질문: str):
             user_url=user_url,
             search_result_placeholder=log_summary
         )
+        history_prompt = f"[{current_time_str} 질문] {질문}\n[내가 읽은 링크 내용 요약]\n{summarize_evidence(final_search_result)}"
 
     else:
         # --- 2. 일반 검색 로직 (Playwright 적용) ---
@@ -833,11 +1159,11 @@ async def ask_shii(interaction: discord.Interaction, 질문: str):
             if search_usage >= WEEKLY_SEARCH_LIMIT:
                 log.warning(f"-> [서버: {interaction.guild.name if interaction.guild else 'DM'}] 주간 검색 한도({WEEKLY_SEARCH_LIMIT}회)를 초과했습니다.")
                 await interaction.edit_original_response(content=f"앗, 함장님! 😥 이번 주 무료 검색 횟수({WEEKLY_SEARCH_LIMIT}회)를 모두 사용했어요. 다음 주에 다시 찾아와 주시겠어요?")
-                save_settings(guild_id_str, settings)
+                mark_settings_dirty(guild_id_str, settings)
                 return
             
             settings["search_usage_weekly"] = search_usage + 1
-            save_settings(guild_id_str, settings)
+            mark_settings_dirty(guild_id_str, settings)  # 저장은 settings_flusher가 모아서 처리
             log.info(f"-> [서버: {interaction.guild.name if interaction.guild else 'DM'}] 검색 사용량: {settings['search_usage_weekly']}/{WEEKLY_SEARCH_LIMIT}")
         
         await interaction.edit_original_response(content="🤔 질문의 핵심을 파악하고 있어요...")
@@ -901,16 +1227,36 @@ async def ask_shii(interaction: discord.Interaction, 질문: str):
             질문=질문,
             search_result_placeholder=log_summary
         )
+        history_prompt = f"[{current_time_str} 질문] {질문}\n[내가 참고한 자료 요약]\n{summarize_evidence(final_search_result.strip())}"
     
     await interaction.edit_original_response(content="📝 찾은 정보를 종합해서 정리하고 있어요...")
 
-    answer = await ask_gemini_chat(interaction, interaction.user, processed_question, log_prompt=processed_question_for_log)
-    log.info(f"-> 시이 답변 (대상: {interaction.user}): '{answer}'")
-
     embed = discord.Embed(title="✨ 시이의 답변이 도착했어요!", color=discord.Color.from_rgb(139, 195, 74))
     embed.set_author(name=f"{interaction.user.display_name} 함장님의 질문", icon_url=interaction.user.display_avatar.url)
     embed.add_field(name="❓ 질문 내용", value=f"```{질문}```", inline=False)
 
+    if STREAM_CHAT:
+        # 받은 만큼 바로 보여주고, 2000자를 넘으면 후속 메시지로 이어서 씀
+        renderer = StreamRenderer(
+            lambda content, embed=None: interaction.edit_original_response(content=content, embed=embed),
+            lambda content: interaction.followup.send(content=content, wait=True),
+            interval=STREAM_EDIT_INTERVAL, started=request_started
+        )
+        renderer.start()
+        try:
+            answer = await ask_gemini_chat(interaction, interaction.user, processed_question, log_prompt=processed_question_for_log, stream_renderer=renderer,
+                                           history_prompt=history_prompt)
+        finally:
+            await renderer.stop()
+        log.info(f"-> 시이 답변 (대상: {interaction.user}): '{answer}'")
+        await renderer.finish(answer, embed=embed)
+        first_visible = f"{renderer.first_visible:.2f}초" if renderer.first_visible is not None else "없음"
+        log.info(f"-> [스트리밍] 첫 글자 표시까지 {first_visible}, 전체 {time.monotonic() - request_started:.2f}초 (메시지 수정 {renderer.edits}회)")
+        return
+
+    answer = await ask_gemini_chat(interaction, interaction.user, processed_question, log_prompt=processed_question_for_log, history_prompt=history_prompt)
+    log.info(f"-> 시이 답변 (대상: {interaction.user}): '{answer}'")
+
     if len(answer) <= 1024:
         embed.add_field(name="💫 시이의 답변", value=answer, inline=False)
         await interaction.followup.send(embed=embed)
@@ -926,8 +1272,7 @@ async def new_chat(interaction: discord.Interaction):
     record_server_usage(interaction)
     log.info(f"/{interaction.command.name} (서버: {interaction.guild.name if interaction.guild else 'DM'}, 사용자: {interaction.user})")
     session_id = interaction.user.id
-    if session_id in user_chat_sessions:
-        del user_chat_sessions[session_id]
+    if chat_sessions.reset(session_id):
         await interaction.response.send_message("알겠습니다! 이전 대화는 잊고 새로운 이야기를 시작해봐요! ✨", ephemeral=True)
     else:
         await interaction.response.send_message("음... 원래부터 저와 나눈 대화가 없었던 것 같아요!", ephemeral=True)
@@ -962,28 +1307,29 @@ async def list_reminders(interaction: discord.Interaction):
     if not await check_setup(interaction): return
     record_server_usage(interaction)
     log.info(f"/{interaction.command.name} (서버: {interaction.guild.name if interaction.guild else 'DM'}, 사용자: {interaction.user})")
-    guild_settings = load_settings(str(interaction.guild.id))
-    reminders = guild_settings.get("reminders", [])
+    reminders = peek_settings(str(interaction.guild.id)).get("reminders", {}).values()
     if not reminders:
         await interaction.response.send_message("📌 지금은 기억하고 있는 약속이 없는걸요!", ephemeral=True)
         return
-    reminder_list = [f"🔔 **{idx}.** `{r['time']}` | {r['frequency']} | 💬 {r['message']}" for idx, r in enumerate(reminders, 1)]
+    reminder_list = [f"🔔 **{idx}.** `{r['time']}` | {r['frequency']} | 💬 {r['message']} (ID: `{r['id']}`)" for idx, r in enumerate(reminders, 1)]
     await interaction.response.send_message(f"📌 **시이가 기억하고 있는 약속 목록이에요!**\n\n" + "\n\n".join(reminder_list), ephemeral=True)
 
 @bot.tree.command(name="알림삭제", description="기억하고 있는 약속을 취소해요.")
-@app_commands.describe(번호="취소할 약속의 번호를 알려주세요! (`/알림목록`으로 확인)")
-async def remove_reminder(interaction: discord.Interaction, 번호: int):
+@app_commands.describe(번호="취소할 약속의 번호 또는 ID를 알려주세요! (`/알림목록`으로 확인)")
+async def remove_reminder(interaction: discord.Interaction, 번호: str):
     if not await check_setup(interaction): return
     record_server_usage(interaction)
     log.info(f"/{interaction.command.name} (서버: {interaction.guild.name if interaction.guild else 'DM'}, 사용자: {interaction.user})")
-    guild_settings = load_settings(str(interaction.guild.id))
-    reminders = guild_settings.get("reminders", [])
-    if not 1 <= 번호 <= len(reminders):
+    guild_id = str(interaction.guild.id)
+    reminders = peek_settings(guild_id).get("reminders", {})
+    key = 번호.strip()
+    if key not in reminders and key.isdigit() and 1 <= int(key) <= len(reminders):
+        key = list(reminders)[int(key) - 1]  # /알림목록의 번호 → ID
+    removed = pop_reminder(guild_id, key, immediate=True)
+    if removed is None:
         await interaction.response.send_message("⚠ 앗, 그런 번호의 약속은 없는 것 같아요!", ephemeral=True)
         return
-    removed = reminders.pop(번호 - 1)
-    guild_settings["reminders"] = reminders
-    save_settings(str(interaction.guild.id), guild_settings)
+    unregister_reminder(key)  # 대기 중인 타이머도 취소
     await interaction.response.send_message(f"✅ 알겠어요! `{removed['message']}` 약속은 잊어버릴게요!")
 
 @bot.tree.command(name="번역", description="[수동 번역] 원하는 텍스트를 지정한 언어로 번역해요!")
@@ -1000,7 +1346,7 @@ async def manual_translate(interaction: discord.Interaction, 언어: str, 텍스
         return
 
     try:
-        @async_retry_with_backoff()
+        @async_retry_with_backoff(priority="manual")
         async def get_translation():
             target_lang_name = supported_languages.get(language_code, language_code)
             prompt = f"Translate the following text into {target_lang_name}. Just provide the translated text directly.\n\nText to translate:\n---\n{텍스트}\n---"
@@ -1009,7 +1355,12 @@ async def manual_translate(interaction: discord.Interaction, 언어: str, 텍스
             if not translated_text: raise ValueError("Translated text is empty.")
             return translated_text, target_lang_name
 
-        translated_text, target_lang_name = await get_translation()
+        cached = await translation_cache.get("manual", language_code, 텍스트)
+        if cached:
+            translated_text, target_lang_name = cached
+        else:
+            translated_text, target_lang_name = await get_translation()
+            translation_cache.put("manual", language_code, 텍스트, [translated_text, target_lang_name])
         log.info(f"-> 수동 번역 결과 ({interaction.user}): '{텍스트}' → '{translated_text}'")
 
         embed = discord.Embed(title="📝 시이의 수동 번역 결과랍니다!", color=discord.Color.green())
@@ -1079,7 +1430,7 @@ async def set_main_channel(interaction: discord.Interaction, 채널: discord.Tex
 async def check_settings(interaction: discord.Interaction):
     record_server_usage(interaction)
     log.info(f"/{interaction.command.name} (서버: {interaction.guild.name if interaction.guild else 'DM'}, 사용자: {interaction.user})")
-    guild_settings = load_settings(str(interaction.guild.id))
+    guild_settings = peek_settings(str(interaction.guild.id))
     source_channels_ids = guild_settings.get("source_channels", [])
     main_channel_id = guild_settings.get("translation_channel")
     source_channels_text = "\n".join([f"<#{channel_id}>" for channel_id in source_channels_ids]) if source_channels_ids else "없답니다!"
@@ -1087,6 +1438,7 @@ async def check_settings(interaction: discord.Interaction):
     embed = discord.Embed(title="📜 시이의 서버 설정 현황이에요!", color=discord.Color.blue())
     embed.add_field(name="📢 봇 기본 채널 (공지, 번역 결과 등)", value=main_channel_text, inline=False)
     embed.add_field(name="👀 자동 번역 감지 채널", value=source_channels_text, inline=False)
+    embed.add_field(name="🌐 자동 번역 언어", value=", ".join(supported_languages.get(code, code) for code in get_target_languages(guild_settings)), inline=False)
     await interaction.response.send_message(embed=embed)
 
 @bot.tree.command(name="번역채널추가", description="[관리자] 자동 번역을 수행할 채널 목록에 추가해요.")
@@ -1117,21 +1469,26 @@ async def remove_source_channel(interaction: discord.Interaction, 채널: discor
     else:
         await interaction.response.send_message(f"`{채널.name}` 채널은 원래부터 번역 목록에 없었어요!")
 
-@bot.tree.command(name="언어설정", description="[관리자] 자동 번역될 언어를 변경해요.")
+@bot.tree.command(name="언어설정", description="[관리자] 자동 번역될 언어를 변경해요. (쉼표로 여러 언어 지정 가능)")
 @app_commands.default_permissions(administrator=True)
-@app_commands.describe(언어="번역할 언어의 코드 (예: en, ja)")
+@app_commands.describe(언어="번역할 언어의 코드 (예: en 또는 en, ja)")
 async def set_language(interaction: discord.Interaction, 언어: str):
     if not await check_setup(interaction): return
     record_server_usage(interaction)
     log.info(f"/{interaction.command.name} (서버: {interaction.guild.name if interaction.guild else 'DM'}, 사용자: {interaction.user})")
     guild_settings = load_settings(str(interaction.guild.id))
-    language_code = 언어.lower()
-    if language_code not in supported_languages:
+    language_codes = list(dict.fromkeys(code.strip().lower() for code in 언어.split(",") if code.strip()))
+    if not language_codes or any(code not in supported_languages for code in language_codes):
         await interaction.response.send_message("앗! 그건 시이가 아직 모르는 언어예요! `/언어목록`으로 확인할 수 있답니다!", ephemeral=True)
         return
-    guild_settings["target_language"] = language_code
+    if len(language_codes) > MAX_TARGET_LANGUAGES:
+        await interaction.response.send_message(f"⚠ 자동 번역 언어는 최대 {MAX_TARGET_LANGUAGES}개까지 지정할 수 있어요!", ephemeral=True)
+        return
+    guild_settings["target_language"] = language_codes[0]  # 예전 설정과의 호환용
+    guild_settings["target_languages"] = language_codes
     save_settings(str(interaction.guild.id), guild_settings)
-    await interaction.response.send_message(f"✅ 자동 번역 언어를 **{supported_languages[language_code]}**으(로) 변경했어요!")
+    language_names = ", ".join(supported_languages[code] for code in language_codes)
+    await interaction.response.send_message(f"✅ 자동 번역 언어를 **{language_names}**으(로) 변경했어요!")
 
 @bot.tree.command(name="공지", description="[관리자] 시이가 지정된 채널에 메시지를 보내요!")
 @app_commands.default_permissions(administrator=True)
@@ -1167,7 +1524,7 @@ async def broadcast_all(interaction: discord.Interaction, 메시지: str):
     success_count, fail_count = 0, 0
     for guild in bot.guilds:
         try:
-            guild_settings = load_settings(str(guild.id))
+            guild_settings = peek_settings(str(guild.id))
             output_channel_id = guild_settings.get("translation_channel")
             if output_channel_id:
                 channel = bot.get_channel(output_channel_id)
@@ -1205,17 +1562,15 @@ async def block_target(interaction: discord.Interaction, 아이디: str):
     log.info(f"/{interaction.command.name} (서버: {interaction.guild.name if interaction.guild else 'DM'}, 사용자: {interaction.user})")
     try:
         target_id = int(아이디)
-        blacklist = load_blacklist()
-        if target_id in blacklist["blocked_servers"] or target_id in blacklist["blocked_channels"]:
+        blocked_servers, blocked_channels = blacklist_index.blocked_servers, blacklist_index.blocked_channels
+        if target_id in blocked_servers or target_id in blocked_channels:
             await interaction.response.send_message(f"이미 차단 목록에 있는 ID예요! ({target_id})", ephemeral=True)
             return
         if bot.get_guild(target_id):
-            blacklist["blocked_servers"].append(target_id)
-            save_blacklist(blacklist)
+            blacklist_index.update(blocked_servers | {target_id}, blocked_channels)
             await interaction.response.send_message(f"✅ 서버를 성공적으로 차단했어요! (ID: {target_id})", ephemeral=True)
         elif bot.get_channel(target_id):
-            blacklist["blocked_channels"].append(target_id)
-            save_blacklist(blacklist)
+            blacklist_index.update(blocked_servers, blocked_channels | {target_id})
             await interaction.response.send_message(f"✅ 채널을 성공적으로 차단했어요! (ID: {target_id})", ephemeral=True)
         else:
             await interaction.response.send_message(f"⚠ 유효하지 않은 ID 같아요! 서버나 채널 ID가 맞는지 확인해주세요!", ephemeral=True)
@@ -1230,14 +1585,12 @@ async def unblock_target(interaction: discord.Interaction, 아이디: str):
     log.info(f"/{interaction.command.name} (서버: {interaction.guild.name if interaction.guild else 'DM'}, 사용자: {interaction.user})")
     try:
         target_id = int(아이디)
-        blacklist = load_blacklist()
-        if target_id in blacklist["blocked_servers"]:
-            blacklist["blocked_servers"].remove(target_id)
-            save_blacklist(blacklist)
+        blocked_servers, blocked_channels = blacklist_index.blocked_servers, blacklist_index.blocked_channels
+        if target_id in blocked_servers:
+            blacklist_index.update(blocked_servers - {target_id}, blocked_channels)
             await interaction.response.send_message(f"✅ 서버 차단을 해제했어요! (ID: {target_id})", ephemeral=True)
-        elif target_id in blacklist["blocked_channels"]:
-            blacklist["blocked_channels"].remove(target_id)
-            save_blacklist(blacklist)
+        elif target_id in blocked_channels:
+            blacklist_index.update(blocked_servers, blocked_channels - {target_id})
             await interaction.response.send_message(f"✅ 채널 차단을 해제했어요! (ID: {target_id})", ephemeral=True)
         else:
             await interaction.response.send_message(f"⚠ 차단 목록에 없는 ID예요!", ephemeral=True)
@@ -1270,6 +1623,71 @@ async def spam_test(interaction: discord.Interaction, 횟수: int = 15, 간격:
         await asyncio.sleep(간격)
     await interaction.followup.send("테스트가 끝났지만 과부하가 감지되지 않았어요.", ephemeral=True)
 
+@bot.tree.command(name="캐시통계", description="[봇 주인] 캐시, 알림 스케줄러 등 시이 내부 현황을 확인해요.", guild=OWNER_GUILD)
+@app_commands.check(is_bot_owner)
+async def cache_stats(interaction: discord.Interaction):
+    record_server_usage(interaction)
+    log.info(f"/{interaction.command.name} (서버: {interaction.guild.name if interaction.guild else 'DM'}, 사용자: {interaction.user})")
+    stats = get_cache_stats()
+    reminder_stats = reminder_scheduler.get_stats()
+    delivery_stats = reminder_delivery.stats
+    translation_stats = translation_cache.get_stats()
+    batch_stats = translation_batcher.get_stats()
+    queue_stats = translation_queue.get_stats()
+    memory_stats = translation_memory.stats
+    normalizer_stats = prompt_normalizer.get_stats()
+    output_stats = translation_output.get_stats()
+    parse_stats = json_parser.stats
+    limiter_stats = API_LIMITER.get_stats()
+    session_stats = chat_sessions.get_stats()
+    priority_names = {"interactive": "대화", "manual": "수동 번역", "background": "자동 번역"}
+    priority_lines = [f"{priority_names.get(name, name)}: 대기 {s['depth']}개 · 처리 {s['dispatched']}개 · 대기 시간 p50/p99 {s['p50_wait']:.2f} / {s['p99_wait']:.2f}초 (최대 {s['max_wait']:.2f}초, 에이징 {s['aged']}회)"
+                      for name, s in limiter_stats['priorities'].items()]
+    baseline_text = " · ".join(f"{priority_names.get(name, name)} {latency:.2f}초" for name, latency in limiter_stats['baseline_latency'].items()) or "아직 없음"
+    retry_lines = [f"`{name}`: 호출 {s['calls']}회 · 재시도 {s['retries']}회 · 즉시 실패 {s['fatal']}회 · 재시도 소진 {s['exhausted']}회 · 마감 초과 {s['deadline_exceeded']}회 · 차단 {s['short_circuited']}회 · 평균 {s['avg_latency']:.2f}초"
+                   for name, s in ((name, policy.get_stats()) for name, policy in RETRY_POLICIES.items())]
+    embed = discord.Embed(title="🗂️ 시이의 내부 현황이에요!", color=discord.Color.dark_teal())
+    embed.add_field(name="서버 설정 캐시", value=f"적중: {stats['hits']}회 / 미스: {stats['misses']}회 / 무효화: {stats['invalidations']}회\n적중률: {stats['hit_rate']:.1%} · 캐시된 서버: {stats['size']}개", inline=False)
+    embed.add_field(name="알림 스케줄러", value=f"대기: {reminder_stats['pending']}개 / 실행: {reminder_stats['fired']}회 / 취소: {reminder_stats['cancelled']}회\n지연(평균/최대): {reminder_stats['avg_lag']:.2f}초 / {reminder_stats['max_lag']:.2f}초\n묶음 전송: 알림 {delivery_stats['reminders']}개 → 메시지 {delivery_stats['sends']}개 (절약 {delivery_stats['saved_sends']}회)", inline=False)
+    embed.add_field(name="번역 캐시", value=f"메모리 적중: {translation_stats['memory_hits']}회 / 디스크 적중: {translation_stats['disk_hits']}회 / 미스: {translation_stats['misses']}회\n적중률: {translation_stats['hit_rate']:.1%} · 메모리 항목: {translation_stats['memory_size']}개", inline=False)
+    embed.add_field(name="자동 번역 배치", value=f"메시지: {batch_stats['messages']}개 / API 호출: {batch_stats['api_calls']}회 (메시지당 {batch_stats['calls_per_message']:.2f}회)\n배치: {batch_stats['batches']}회 / 개별 재시도: {batch_stats['fallbacks']}회", inline=False)
+    embed.add_field(name="자동 번역 대기열", value=f"대기: {queue_stats['depth']}개 (서버 {queue_stats['active_guilds']}곳, 최대 {queue_stats['busiest_depth']}개: {queue_stats['busiest_guild']})\n워커: {queue_stats['workers']}개 (차례 대기 서버 {queue_stats['waiting_guilds']}곳)\n처리: {queue_stats['processed']}개 / 버림: {queue_stats['dropped']}개 / 합침: {queue_stats['merged']}개 / 실패: {queue_stats['failed']}개", inline=False)
+    embed.add_field(name="번역 메모리", value=f"템플릿 재사용: {memory_stats['template_hits']}회 (API 생략) / 짧은 수정 요청: {memory_stats['adapt_hits']}회 / 미스: {memory_stats['misses']}회", inline=False)
+    embed.add_field(name="번역 프롬프트 정규화", value=f"보호 적용: {normalizer_stats['protected_messages']}/{normalizer_stats['messages']}개 메시지 (자리표시자 유실로 원문 사용: {normalizer_stats['restore_fallbacks']}회)\n절약 토큰(추정): 메시지당 {normalizer_stats['saved_per_message']:.1f}개 ({normalizer_stats['saved_ratio']:.1%})", inline=False)
+    embed.add_field(name="번역 결과 전송", value=f"번역: {output_stats['posts']}개 → 메시지 {output_stats['sends']}개 (절약 {output_stats['saved_sends']}회, 실패 {output_stats['failed']}회, 대기 {output_stats['pending']}개)\n전송 지연(평균/최대): {output_stats['avg_latency']:.2f}초 / {output_stats['max_latency']:.2f}초 · 가장 느린 채널: {output_stats['slowest_channel']} ({output_stats['slowest_avg_latency']:.2f}초)", inline=False)
+    embed.add_field(name="JSON 응답 해석", value=f"바로 성공: {parse_stats['parsed']}회 / 복구 후 성공: {parse_stats['recovered']}회 / 실패: {parse_stats['failed']}회", inline=False)
+    embed.add_field(name="Gemini 동시 호출 한도", value=f"현재 한도: {limiter_stats['limit']:.1f} / 실행 중: {limiter_stats['in_flight']}개 / 대기: {limiter_stats['queue_depth']}개 (최대 {limiter_stats['max_queue']}개)\n429·타임아웃: {limiter_stats['throttled']}회 / 한도 증가: {limiter_stats['increases']}회 · 감소: {limiter_stats['decreases']}회 / 기준 지연: {baseline_text}", inline=False)
+    embed.add_field(name="대화 세션", value=f"세션: {session_stats['sessions']}개 (최대 {chat_sessions.max_sessions}개) · 기록 {session_stats['history_chars']}자 (약 {session_stats['estimated_tokens']:.0f}토큰, 가장 긴 대화 {session_stats['largest_session_tokens']:.0f}토큰)\n정리: 오래된 순 {session_stats['lru_evictions']}개 / 유휴 {session_stats['idle_evictions']}개 / 새대화 {session_stats['resets']}개 · 대화 줄이기 {session_stats['trims']}회 (메시지 {session_stats['trimmed_messages']}개)\n수집 자료 요약으로 바꾼 턴: {session_stats['compacted_turns']}회 (약 {session_stats['compacted_chars'] / 4:.0f}토큰 절약)", inline=False)
+    embed.add_field(name="Gemini 호출 우선순위", value="\n".join(priority_lines), inline=False)
+    breaker_text = ", ".join(f"{priority_names.get(name, name)} {breaker.state} (열림 {breaker.stats['opened']}회)" for name, breaker in GEMINI_BREAKERS.items())
+    embed.add_field(name=f"Gemini 재시도 정책 (서킷 브레이커: {breaker_text})"[:256], value="\n".join(retry_lines)[:1024] or "아직 호출이 없어요.", inline=False)
+    await interaction.response.send_message(embed=embed, ephemeral=True)
+
+@bot.tree.command(name="사용량통계", description="[봇 주인] 기간별 명령어 사용량과 상위 서버를 확인해요.", guild=OWNER_GUILD)
+@app_commands.describe(시작일="시작 날짜 (예: 2025-01-01)", 종료일="종료 날짜 (포함, 비우면 시작일 하루)", 상위="상위 서버 개수 (1~25)")
+@app_commands.check(is_bot_owner)
+async def usage_stats(interaction: discord.Interaction, 시작일: str, 종료일: str = None, 상위: app_commands.Range[int, 1, 25] = 10):
+    record_server_usage(interaction)
+    log.info(f"/{interaction.command.name} (서버: {interaction.guild.name if interaction.guild else 'DM'}, 사용자: {interaction.user})")
+    try:
+        start_date = datetime.strptime(시작일, "%Y-%m-%d")
+        end_date = datetime.strptime(종료일, "%Y-%m-%d") if 종료일 else start_date
+    except ValueError:
+        await interaction.response.send_message("⚠ 날짜는 `2025-01-01` 형식으로 입력해주세요!", ephemeral=True)
+        return
+    start_hour, end_hour = hour_bucket(start_date), hour_bucket(end_date + timedelta(days=1))
+
+    top_guilds = usage_metrics.top_guilds(start_hour, end_hour, 상위)
+    if not top_guilds:
+        await interaction.response.send_message("해당 기간에는 사용 기록이 없었어요!", ephemeral=True)
+        return
+    lines = []
+    for rank, (guild_id, total) in enumerate(top_guilds, 1):
+        guild = bot.get_guild(guild_id)
+        lines.append(f"**{rank}.** {guild.name if guild else f'알 수 없는 서버 ({guild_id})'} - {total}회")
+    embed = discord.Embed(title=f"📊 {start_date:%Y-%m-%d} ~ {end_date:%Y-%m-%d} 사용량 상위 서버", description="\n".join(lines), color=discord.Color.dark_gold())
+    await interaction.response.send_message(embed=embed, ephemeral=True)
+
 # 봇 주인 전용 명령어 에러 핸들러
 @broadcast_all.error
 @set_log_channel.error
@@ -1277,6 +1695,8 @@ async def spam_test(interaction: discord.Interaction, 횟수: int = 15, 간격:
 @unblock_target.error
 @list_all_servers.error
 @spam_test.error
+@cache_stats.error
+@usage_stats.error
 async def owner_command_error(interaction: discord.Interaction, error: app_commands.AppCommandError):
     if isinstance(error, app_commands.CheckFailure):
         await interaction.response.send_message("❗ 이 명령어는 시이의 주인님만 사용할 수 있답니다!", ephemeral=True)
@@ -1289,41 +1709,105 @@ async def on_message(message):
     if message.author == bot.user or not message.guild:
         return
 
-    blacklist = load_blacklist()
-    if message.guild.id in blacklist["blocked_servers"]: return
-    if message.channel.id in blacklist["blocked_channels"]: return
+    if blacklist_index.is_blocked(message.guild.id, message.channel.id): return
 
-    guild_settings = load_settings(str(message.guild.id))
+    guild_settings = peek_settings(str(message.guild.id))
     if message.channel.id not in guild_settings.get("source_channels", []): return
     if not guild_settings.get("translation_channel"): return
 
     original_content = message.content
     if not original_content or URL_PATTERN.fullmatch(original_content.strip()): return
-    if re.search(r'[\uac00-\ud7a3]', original_content): return
+    if HANGUL_PATTERN.search(original_content): return
 
-    content_for_filtering = re.sub(r'<a?:\w+:\d+>', '', original_content).strip() # 이모지 제거
-    if not content_for_filtering or not re.search(r'[a-zA-Z\u3040-\u30ff\u4e00-\u9fff]', content_for_filtering):
+    content_for_filtering = EMOJI_PATTERN.sub('', original_content).strip() # 이모지 제거
+    if not content_for_filtering or not TRANSLATABLE_PATTERN.search(content_for_filtering):
         return
 
+    target_languages = get_target_languages(guild_settings)
+    detected, confidence = detect_language(content_for_filtering)
+    if confidence >= LANG_DETECT_THRESHOLD:
+        target_languages = [lang for lang in target_languages if lang != detected]  # 이미 그 언어인 대상은 생략
+    if not target_languages: return
+
     log.info(f"-> 자동 번역 감지 (서버: {message.guild.name}): '{original_content}'")
     translation_channel = bot.get_channel(guild_settings["translation_channel"])
     if not translation_channel: return
 
-    target_language = guild_settings.get("target_language", "ko")
-    translated_text, detected_language = await translate_text_gemini(original_content, target_language)
-    if detected_language == "error": return
+    # 모든 언어를 캐시나 번역 메모리 템플릿으로 채울 수 있으면 API 없이 바로 전송
+    translations, detected_language, memory_entry = {}, None, None
+    for target_language in target_languages:
+        cached = await translation_cache.get("auto", target_language, original_content)
+        if cached:
+            translations[target_language], detected_language = cached
+            continue
+        # 숫자·이모지·멘션만 다른 예전 번역이 있으면 바꿔 끼움
+        match_kind, templated, memory_entry = translation_memory.lookup(message.guild.id, original_content, target_language)
+        if match_kind != "template":
+            if match_kind == "adapt" and len(target_languages) > 1:
+                translation_memory.count_adapt(False)  # 여러 언어는 한 번에 요청하므로 수정 프롬프트를 쓰지 않음
+                memory_entry = None
+            break
+        translations[target_language], detected_language = templated, memory_entry["detected_language"]
+        translation_cache.put("auto", target_language, original_content, [templated, detected_language])
+    else:
+        post_translation(message, translation_channel, original_content, translations, detected_language)
+        return
 
-    if translated_text and translated_text.strip():
-        async with translation_channel.typing():
-            await asyncio.sleep(0.5)
-            embed = discord.Embed(color=discord.Color.og_blurple())
-            embed.set_author(name=f"{message.author.display_name} 님의 메시지", icon_url=message.author.display_avatar.url, url=message.jump_url)
-            embed.add_field(name="원본 메시지", value=f"```{original_content}```", inline=False)
-            embed.add_field(name="번역 결과", value=f"```{translated_text}```", inline=False)
-            target_lang_name = supported_languages.get(target_language, target_language)
-            embed.set_footer(text=f"자동 번역: {detected_language} → {target_lang_name}")
-            await translation_channel.send(embed=embed)
+    # API가 필요하면 모든 언어를 한 번의 호출로 요청 (서버별 대기열, 넘치면 정책에 따라 버리거나 합침)
+    translation_queue.submit(message.guild.id, {
+        "message": message, "author_id": message.author.id, "channel_id": message.channel.id,
+        "text": original_content, "target_languages": target_languages, "translation_channel": translation_channel,
+        "memory_entry": memory_entry if len(target_languages) == 1 else None  # 비슷한 예전 번역이 있으면 짧은 수정 프롬프트 사용
+    })
+
+async def process_translation_job(job):
+    """대기열에서 꺼낸 자동 번역 작업 하나를 처리합니다."""
+    original_content, target_languages = job["text"], job["target_languages"]
+    if job.get("memory_entry"):
+        translated_text, detected_language = await adapt_translation_gemini(original_content, target_languages[0], job["memory_entry"])
+        translation_memory.count_adapt(detected_language != "error" and bool(translated_text))
+        translations = {target_languages[0]: translated_text}
+    else:
+        translations, detected_language = await translation_batcher.translate(original_content, target_languages)
+    if detected_language == "error": return
+    for target_language in target_languages:
+        translated_text = translations.get(target_language, "")
+        if translated_text:
+            translation_cache.put("auto", target_language, original_content, [translated_text, detected_language])
+            translation_memory.add(job["message"].guild.id, original_content, translated_text, target_language, detected_language)
+        elif detected_language == target_language:
+            # 이미 그 언어라 번역할 필요 없음 → 빈 번역을 그대로 캐시해 다음에도 API를 부르지 않음
+            translation_cache.put("auto", target_language, original_content, ["", detected_language])
+        else:
+            # 응답에서 빠진 언어는 캐시하지 않음 (빈 결과를 7일 동안 재사용하지 않도록, 다음 메시지 때 다시 요청)
+            log.warning(f"[자동 번역] '{target_language}' 번역이 응답에 없어요. (감지 언어: {detected_language})")
+    post_translation(job["message"], job["translation_channel"], original_content, translations, detected_language)
+
+def post_translation(message, translation_channel, original_content, translations, detected_language):
+    """translations({언어 코드: 번역문})를 번역 채널 전송 대기열에 넣습니다. (가까운 시각의 결과는 임베드 하나로 묶임)"""
+    translations = {lang: text for lang, text in translations.items() if text and text.strip()}
+    if translations:
+        fields = [("번역 결과" if len(translations) == 1 else f"번역 결과 ({supported_languages.get(lang, lang)})", text) for lang, text in translations.items()]
+        target_lang_names = ", ".join(supported_languages.get(lang, lang) for lang in translations)
+        translation_output.enqueue(translation_channel, TranslationPost(
+            message.author.display_name, message.author.display_avatar.url, message.jump_url,
+            original_content, fields, f"자동 번역: {detected_language} → {target_lang_names}"
+        ))
+
+translation_output = TranslationOutput(window=config.getint('TRANSLATION', 'OUTPUT_WINDOW_MS', fallback=500) / 1000)
+
+translation_queue = GuildTranslationQueue(
+    process_translation_job,
+    max_depth=config.getint('TRANSLATION', 'QUEUE_DEPTH', fallback=20),
+    workers_per_guild=config.getint('TRANSLATION', 'WORKERS_PER_GUILD', fallback=2),
+    max_workers=config.getint('TRANSLATION', 'MAX_WORKERS', fallback=16),
+    overflow_policy=config.get('TRANSLATION', 'OVERFLOW_POLICY', fallback='drop_oldest')
+)
 
 # 🔹 봇 실행
 if __name__ == "__main__":
     bot.run(DISCORD_BOT_TOKEN, log_handler=None)
+    flush_dirty_settings()  # 종료 시 지연 저장 중인 설정 마무리
+    usage_metrics.close()
+    translation_cache.close()
+    translation_memory.save()
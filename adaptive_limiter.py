@@ -0,0 +1,166 @@
+import asyncio
+import contextlib
+import logging
+import time
+from collections import deque
+
+from priority_scheduler import WeightedPriorityQueue
+
+log = logging.getLogger('RubyBot')
+
+# 🔹 Gemini 동시 호출 수를 상황에 맞게 조절하는 AIMD 리미터 (고정 Semaphore 대체)
+# 429(할당량 초과)·503·모델 호출 자체의 타임아웃(DeadlineExceeded)처럼 "너무 많이 보냈다"는 신호로 보는 예외 이름
+# 일반 TimeoutError는 넣지 않음 (우리 쪽 마감 시간이나 검색 같은 다른 작업의 타임아웃까지 과부하로 보게 되므로)
+THROTTLE_ERROR_NAMES = frozenset({"ResourceExhausted", "TooManyRequests", "DeadlineExceeded", "ServiceUnavailable"})
+THROTTLE_STATUS_CODES = frozenset({429, 503})
+
+class SlotTimeoutError(TimeoutError):
+    """slot(timeout=...) 안에 자리를 받지 못함 (API를 부르지 않았으므로 통계에 넣지 않음)"""
+
+def is_throttle_error(error):
+    """예외가 API 과부하(429, 503, 모델 호출 타임아웃)를 뜻하면 True"""
+    if any(cls.__name__ in THROTTLE_ERROR_NAMES for cls in type(error).__mro__):
+        return True
+    return getattr(error, "code", None) in THROTTLE_STATUS_CODES
+
+class SlotLease:
+    """slot()이 넘겨주는 자리. API를 부르지 않고 끝낸 경우 skip_sample()을 부르면 지연·오류 통계에 넣지 않습니다."""
+
+    __slots__ = ("priority", "record")
+
+    def __init__(self, priority):
+        self.priority = priority
+        self.record = True
+
+    def skip_sample(self):
+        self.record = False
+
+class AdaptiveLimiter:
+    """
+    AIMD(가산 증가, 곱셈 감소) 방식 동시 실행 제한기.
+    - 지연이 기준 이내이고 최근 오류율이 낮으면 호출이 끝날 때마다 limit += 1/limit (limit개가 끝나면 약 +1)
+      기준 지연은 우선순위 클래스별로 따로 잽니다. (짧은 번역과 도구를 쓰는 긴 대화를 한 기준으로 비교하지 않도록)
+    - 429·503이나 모델 호출 타임아웃이 나면 limit *= backoff_ratio (같은 폭주에 여러 번 줄지 않도록 cooldown 동안 한 번만)
+    자리를 기다리는 요청은 우선순위 클래스별 대기열(WeightedPriorityQueue)에서 차례를 받습니다.
+    취소된 호출은 통계에 넣지 않습니다.
+    사용법: async with limiter.slot("interactive", timeout=남은 시간) as lease: ...
+    """
+
+    def __init__(self, initial_limit=15, min_limit=2, max_limit=64, backoff_ratio=0.5, latency_tolerance=3.0,
+                 error_rate_threshold=0.1, window=50, cooldown=1.0, waiters=None):
+        self.limit = float(initial_limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff_ratio = backoff_ratio
+        self.latency_tolerance = latency_tolerance  # 기준 지연의 몇 배까지 "정상"으로 볼지
+        self.error_rate_threshold = error_rate_threshold
+        self.cooldown = cooldown
+        self._in_flight = 0
+        self._waiters = waiters if waiters is not None else WeightedPriorityQueue()
+        self._outcomes = deque(maxlen=window)  # 최근 호출의 오류 여부
+        self._baselines = {}  # 우선순위 클래스 -> 기준 지연 (관측된 최소 지연, 서서히 위로 풀림)
+        self._last_decrease = 0.0
+        self.stats = {"acquired": 0, "throttled": 0, "errors": 0, "increases": 0, "decreases": 0, "max_queue": 0}
+
+    @property
+    def in_flight(self):
+        return self._in_flight
+
+    @property
+    def queue_depth(self):
+        return len(self._waiters)
+
+    async def acquire(self, priority=None):
+        if self._in_flight < int(self.limit) and not self._waiters:
+            self._in_flight += 1
+            self.stats["acquired"] += 1
+            self._waiters.record_immediate(priority)
+            return
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.push(future, priority)
+        self.stats["max_queue"] = max(self.stats["max_queue"], len(self._waiters))
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self._in_flight -= 1  # 자리를 받은 직후 취소됨 → 돌려줌
+                self._wake()
+            else:
+                self._waiters.remove(future)
+            raise
+        self.stats["acquired"] += 1
+
+    def release(self, latency=None, throttled=False, failed=False, priority=None):
+        self._in_flight -= 1
+        if latency is not None:
+            self._record(latency, throttled, failed, self._waiters.resolve(priority))
+        self._wake()
+
+    def _wake(self):
+        while self._in_flight < int(self.limit):
+            future = self._waiters.pop()
+            if future is None:
+                break
+            self._in_flight += 1
+            future.set_result(None)
+
+    def _record(self, latency, throttled, failed, priority):
+        self._outcomes.append(throttled or failed)
+        if throttled:
+            self.stats["throttled"] += 1
+            now = time.monotonic()
+            if now - self._last_decrease >= self.cooldown:
+                self._last_decrease = now
+                old_limit = self.limit
+                self.limit = max(self.min_limit, self.limit * self.backoff_ratio)
+                self.stats["decreases"] += 1
+                log.warning(f"[API 리미터] 과부하 감지, 동시 호출 한도 {old_limit:.1f} → {self.limit:.1f}")
+            return
+        if failed:
+            self.stats["errors"] += 1
+            return
+
+        baseline = self._baselines.get(priority)
+        baseline = self._baselines[priority] = latency if baseline is None else min(latency, baseline * 1.01)
+        error_rate = sum(self._outcomes) / len(self._outcomes)
+        if latency <= baseline * self.latency_tolerance and error_rate < self.error_rate_threshold and self.limit < self.max_limit:
+            before = int(self.limit)
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+            if int(self.limit) > before:
+                self.stats["increases"] += 1
+
+    @contextlib.asynccontextmanager
+    async def slot(self, priority=None, timeout=None):
+        """timeout초 안에 자리를 받지 못하면 SlotTimeoutError (대기열에서 빠지고 통계에는 남기지 않음)"""
+        if timeout is None:
+            await self.acquire(priority)
+        else:
+            try:
+                await asyncio.wait_for(self.acquire(priority), timeout)
+            except asyncio.TimeoutError:
+                raise SlotTimeoutError(f"{timeout:.1f}초 안에 자리를 받지 못했어요.") from None
+        lease = SlotLease(priority)
+        started = time.monotonic()
+        throttled = failed = False
+        try:
+            yield lease
+        except Exception as e:
+            throttled = is_throttle_error(e)
+            failed = not throttled
+            raise
+        except BaseException:
+            lease.skip_sample()  # 취소(CancelledError 등): API 상태와 무관하므로 기록하지 않음
+            raise
+        finally:
+            self.release(time.monotonic() - started if lease.record else None, throttled, failed, priority)
+
+    def get_stats(self):
+        return {
+            **self.stats,
+            "limit": self.limit,
+            "in_flight": self._in_flight,
+            "queue_depth": len(self._waiters),
+            "priorities": self._waiters.get_stats(),
+            "baseline_latency": dict(self._baselines),
+            "error_rate": sum(self._outcomes) / len(self._outcomes) if self._outcomes else 0.0
+        }
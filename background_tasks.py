@@ -0,0 +1,25 @@
+import asyncio
+import logging
+
+log = logging.getLogger('RubyBot')
+
+# 🔹 백그라운드 작업 보관: 이벤트 루프는 task를 약한 참조로만 들고 있어서, 참조를 버리면 실행 중에 GC될 수 있음
+_tasks = set()
+
+def spawn(coro):
+    """asyncio.create_task + 끝날 때까지 참조 보관, 처리되지 않은 예외는 로그로 남김"""
+    task = asyncio.create_task(coro)
+    _tasks.add(task)
+    task.add_done_callback(_on_done)
+    return task
+
+def _on_done(task):
+    _tasks.discard(task)
+    if task.cancelled():
+        return
+    error = task.exception()
+    if error is not None:
+        log.error(f"[백그라운드 작업] {task.get_coro().__qualname__} 실패: {type(error).__name__}: {error}")
+
+def running_count():
+    return len(_tasks)
@@ -0,0 +1,109 @@
+"""Gemini 동시 호출 제한 벤치마크 (고정 Semaphore(15) vs AIMD 리미터, 가짜 백엔드)
+
+사용법: python benchmarks/adaptive_limiter_bench.py [동시 사용자 수] [구간 길이(초)]
+가짜 백엔드는 구간마다 허용 동시 호출 수가 바뀌고(여유 → 할당량 부족 → 회복),
+넘치면 ResourceExhausted(429)를 냅니다. async_retry_with_backoff와 같은 재시도(백오프만 1/10로 축소)를 씌워
+처리량, 429 횟수, 최종 실패, 요청 지연(p50/p95)을 비교합니다.
+"""
+import asyncio
+import logging
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from adaptive_limiter import AdaptiveLimiter
+
+logging.getLogger('RubyBot').setLevel(logging.ERROR)  # 한도 조정 경고는 출력하지 않음
+
+CAPACITY_PHASES = (40, 8, 30)  # 구간별 허용 동시 호출 수
+
+class ResourceExhausted(Exception):
+    code = 429
+
+class FakeGemini:
+    def __init__(self, phase_seconds):
+        self.phase_seconds = phase_seconds
+        self.started = time.monotonic()
+        self.in_flight = 0
+        self.throttled = 0
+
+    def capacity(self):
+        phase = int((time.monotonic() - self.started) / self.phase_seconds)
+        return CAPACITY_PHASES[min(phase, len(CAPACITY_PHASES) - 1)]
+
+    async def call(self):
+        self.in_flight += 1
+        try:
+            if self.in_flight > self.capacity():
+                await asyncio.sleep(0.01)
+                self.throttled += 1
+                raise ResourceExhausted("429 Resource has been exhausted")
+            await asyncio.sleep(random.uniform(0.04, 0.08))
+        finally:
+            self.in_flight -= 1
+
+class FixedLimiter:
+    def __init__(self, limit):
+        self._semaphore = asyncio.Semaphore(limit)
+        self.limit = limit
+
+    def slot(self):
+        return self._semaphore
+
+async def with_retry(limiter, backend, retries=3, backoff=0.1):
+    """async_retry_with_backoff와 같은 흐름 (백오프 시간만 축소)"""
+    while retries > 1:
+        try:
+            async with limiter.slot():
+                return await backend.call()
+        except ResourceExhausted:
+            await asyncio.sleep(backoff)
+            retries -= 1
+            backoff *= 2
+    async with limiter.slot():
+        return await backend.call()
+
+async def run(label, limiter, users, phase_seconds):
+    random.seed(7)
+    backend = FakeGemini(phase_seconds)
+    deadline = backend.started + phase_seconds * len(CAPACITY_PHASES)
+    latencies, failures, limit_trace = [], 0, []
+
+    async def user():
+        nonlocal failures
+        while time.monotonic() < deadline:
+            started = time.monotonic()
+            try:
+                await with_retry(limiter, backend)
+                latencies.append(time.monotonic() - started)
+            except ResourceExhausted:
+                failures += 1
+            await asyncio.sleep(random.uniform(0, 0.05))
+
+    async def sample_limit():
+        while time.monotonic() < deadline:
+            limit_trace.append(limiter.limit)
+            await asyncio.sleep(phase_seconds / 4)
+
+    await asyncio.gather(sample_limit(), *(user() for _ in range(users)))
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2] if latencies else 0.0
+    p95 = latencies[int(len(latencies) * 0.95)] if latencies else 0.0
+    elapsed = phase_seconds * len(CAPACITY_PHASES)
+    print(f"{label:10s} | 성공: {len(latencies) / elapsed:6.1f}건/초 | 429: {backend.throttled:5d}회 | 최종 실패: {failures:4d}건 | "
+          f"지연 p50/p95: {p50 * 1000:5.0f} / {p95 * 1000:5.0f}ms")
+    print(f"{'':10s} | 한도 변화: {' '.join(f'{limit:.0f}' for limit in limit_trace)}")
+
+def main():
+    users = int(sys.argv[1]) if len(sys.argv) > 1 else 60
+    phase_seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 3.0
+    print(f"허용 동시 호출 수 구간: {CAPACITY_PHASES} (구간당 {phase_seconds:.0f}초), 동시 사용자: {users}명")
+    asyncio.run(run("고정(15)", FixedLimiter(15), users, phase_seconds))
+    asyncio.run(run("AIMD", AdaptiveLimiter(initial_limit=15, cooldown=0.1), users, phase_seconds))
+
+if __name__ == "__main__":
+    main()
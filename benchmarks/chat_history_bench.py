@@ -0,0 +1,62 @@
+"""/시이야 대화 기록 토큰 벤치마크 (수집 자료 원문을 기록에 남길 때 vs 요약만 남길 때, 가짜 세션)
+
+사용법: python benchmarks/chat_history_bench.py [턴 수] [자료 1개당 글자 수]
+매 턴마다 웹페이지 3개를 읽어 질문에 붙여 보내는 대화를 흉내 내고,
+턴마다 Gemini에 보내는 입력 토큰(대화 기록 + 이번 질문, 추정)을 비교합니다.
+토큰 예산에 의한 대화 정리는 끄고(예산 무제한) 기록 방식의 차이만 봅니다.
+"""
+import os
+import random
+import sys
+from types import SimpleNamespace
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from chat_sessions import ChatSessionManager, summarize_evidence
+from prompt_normalizer import estimate_tokens
+
+class FakeChatSession:
+    def __init__(self):
+        self.history = []
+
+    def send(self, question, answer):
+        self.history += [SimpleNamespace(role="user", parts=[SimpleNamespace(text=question)]),
+                         SimpleNamespace(role="model", parts=[SimpleNamespace(text=answer)])]
+
+def fake_evidence(turn, page_chars):
+    words = ["함선", "정보", "업데이트", "일정", "공지", "이벤트", "보상", "패치"]
+    pages = [f"--- [출처: https://example.com/{turn}/{i}] ---\n" + " ".join(random.choice(words) for _ in range(page_chars // 4))
+             for i in range(3)]
+    return "\n\n".join(pages)
+
+def run(compact, turns, page_chars):
+    random.seed(5)
+    sessions = ChatSessionManager(FakeChatSession, token_budget=float("inf"))
+    session = sessions.get(1)
+    per_turn = []
+    for turn in range(1, turns + 1):
+        question = f"{turn}번째 질문: 지난번 이야기 이어서 알려줘"
+        evidence = fake_evidence(turn, page_chars)
+        prompt = f"[사용자의 최근 질문]\n\"{question}\"\n[내가 미리 찾아본 관련 정보]\n---\n{evidence}\n---\n[나의 임무] ..."
+        per_turn.append(sessions.get_stats()["estimated_tokens"] + estimate_tokens(prompt))
+        turn_start = len(session.history)
+        session.send(prompt, "시이의 답변이에요! " * 40)
+        if compact:
+            sessions.compact_turn(1, turn_start, f"[질문] {question}\n[내가 참고한 자료 요약]\n{summarize_evidence(evidence)}")
+        sessions.trim(1)  # 봇처럼 턴이 끝날 때마다 정리 (예산 무제한이라 크기만 잼)
+    return per_turn
+
+def main():
+    turns = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    page_chars = int(sys.argv[2]) if len(sys.argv) > 2 else 3000
+    before = run(False, turns, page_chars)
+    after = run(True, turns, page_chars)
+    print(f"{turns}턴 대화, 턴마다 자료 3개 (각 {page_chars}자) · 턴별 입력 토큰(추정)")
+    print(" 턴 | 원문 기록 | 요약 기록")
+    for turn, (b, a) in enumerate(zip(before, after), 1):
+        print(f"{turn:3d} | {b:9.0f} | {a:9.0f}")
+    print(f"합계 | {sum(before):9.0f} | {sum(after):9.0f} ({1 - sum(after) / sum(before):.1%} 절약)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""오프라인 언어 감지기 정확도·처리량 벤치마크
+
+사용법: python benchmarks/lang_detect_bench.py [신뢰도 임계값]
+라벨이 붙은 채팅 문장으로 정확도, API로 넘어가는 비율, 초당 처리량을 측정합니다.
+지원하지 않는 언어 문장(OTHER_CORPUS)은 임계값 아래로 나와 API로 넘어가야 정상입니다. (이미 목표 언어로 잘못 보고 건너뛰면 안 됨)
+"""
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from lang_detect import detect_language
+
+CORPUS = [
+    ("en", "where is everyone, the raid starts in ten minutes"),
+    ("en", "can someone help me with this quest please"),
+    ("en", "thank you so much, that was really helpful"),
+    ("en", "I will be late today because of work"),
+    ("en", "does anyone know how to get the new weapon"),
+    ("en", "good morning everyone"),
+    ("fr", "bonjour tout le monde, comment allez-vous"),
+    ("fr", "je ne sais pas où est le donjon"),
+    ("fr", "merci pour ton aide, c'est gentil"),
+    ("fr", "on se retrouve ce soir pour le raid"),
+    ("fr", "quelqu'un peut m'expliquer cette quête"),
+    ("de", "guten morgen, wie geht es euch allen"),
+    ("de", "ich habe keine zeit heute abend"),
+    ("de", "kann mir jemand bei der quest helfen"),
+    ("de", "wir treffen uns um acht uhr"),
+    ("de", "das ist eine sehr gute idee"),
+    ("es", "hola a todos, cómo están hoy"),
+    ("es", "alguien puede ayudarme con esta misión"),
+    ("es", "no tengo tiempo esta noche, lo siento"),
+    ("es", "nos vemos mañana en el juego"),
+    ("es", "muchas gracias por la ayuda"),
+    ("it", "ciao a tutti, come state oggi"),
+    ("it", "qualcuno può aiutarmi con questa missione"),
+    ("it", "stasera non ho tempo, mi dispiace"),
+    ("it", "ci vediamo domani nel gioco"),
+    ("it", "grazie mille per l'aiuto"),
+    ("pt", "olá a todos, como vocês estão hoje"),
+    ("pt", "alguém pode me ajudar com essa missão"),
+    ("pt", "não tenho tempo hoje à noite, desculpa"),
+    ("pt", "nos vemos amanhã no jogo"),
+    ("pt", "muito obrigado pela ajuda"),
+    ("ru", "всем привет, как дела"),
+    ("ru", "кто может помочь с этим заданием"),
+    ("ja", "みなさんこんにちは、今日もよろしくお願いします"),
+    ("ja", "レイドは何時から始まりますか"),
+    ("zh", "大家好，今天晚上一起打副本吗"),
+    ("zh", "谢谢你的帮助"),
+    ("ko", "오늘 레이드 몇 시에 시작해요?"),
+    ("ko", "도와주셔서 감사합니다"),
+]
+
+OTHER_CORPUS = [
+    ("nl", "ik wil nu spelen"),
+    ("nl", "kan iemand mij helpen met deze quest"),
+    ("nl", "ik heb geen tijd vanavond"),
+    ("sv", "jag vill spela nu"),
+    ("da", "hej alle sammen"),
+    ("pl", "nie mam czasu dzisiaj"),
+    ("id", "saya mau main sekarang"),
+    ("tr", "bugün oynamak istiyorum"),
+]
+
+def main():
+    threshold = float(sys.argv[1]) if len(sys.argv) > 1 else 0.9
+    correct = confident = confident_correct = 0
+    for label, text in CORPUS:
+        lang, confidence = detect_language(text)
+        correct += lang == label
+        if confidence >= threshold:
+            confident += 1
+            confident_correct += lang == label
+        else:
+            print(f"  [API로 넘김] {label} → {lang} ({confidence:.2f}): {text}")
+
+    rounds = 200
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for _, text in CORPUS:
+            detect_language(text)
+    elapsed = time.perf_counter() - started
+
+    misjudged = 0
+    for label, text in OTHER_CORPUS:
+        lang, confidence = detect_language(text)
+        if confidence >= threshold:
+            misjudged += 1
+            print(f"  [미지원 언어 오판] {label} → {lang} ({confidence:.2f}): {text}")
+
+    total = len(CORPUS)
+    print(f"정확도(전체): {correct}/{total} ({correct / total:.1%})")
+    print(f"임계값 {threshold} 이상 판정: {confident}/{total} ({confident / total:.1%}), 그중 정확도 {confident_correct / max(confident, 1):.1%}")
+    print(f"미지원 언어 문장을 확신한 경우: {misjudged}/{len(OTHER_CORPUS)}")
+    print(f"처리량: {rounds * total / elapsed:,.0f} 문장/초")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""Gemini 호출 우선순위 벤치마크 (FIFO vs 가중치 우선순위 대기열, 가짜 백엔드)
+
+사용법: python benchmarks/priority_scheduler_bench.py [자동 번역 요청 수] [동시 호출 한도]
+자동 번역 요청이 한꺼번에 몰리는 동안 /시이야 요청을 일정 간격으로 보내,
+/시이야가 자리를 받기까지 기다린 시간(p50/p99)과 자동 번역 처리 완료 시간을 비교합니다.
+기본값(2500개, 한도 10)은 폭주가 약 25초 이어져 자동 번역 대기 시간이 aging 기준(10초)을 넘습니다.
+"""
+import asyncio
+import logging
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from adaptive_limiter import AdaptiveLimiter
+from priority_scheduler import WeightedPriorityQueue
+
+logging.getLogger('RubyBot').setLevel(logging.ERROR)
+
+async def fake_gemini():
+    await asyncio.sleep(random.uniform(0.05, 0.15))
+
+def percentile(samples, ratio):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * ratio))] if samples else 0.0
+
+async def run(label, use_priority, background_count, limit):
+    random.seed(3)
+    weights = {"interactive": 6, "manual": 3, "background": 1} if use_priority else {"fifo": 1}
+    limiter = AdaptiveLimiter(initial_limit=limit, min_limit=limit, max_limit=limit, waiters=WeightedPriorityQueue(weights))
+    interactive_waits = []
+    started = time.monotonic()
+    background_done = []
+
+    async def call(priority):
+        queued = time.monotonic()
+        async with limiter.slot(priority if use_priority else None):
+            if priority == "interactive":
+                interactive_waits.append(time.monotonic() - queued)
+            await fake_gemini()
+        if priority == "background":
+            background_done.append(time.monotonic() - started)
+
+    async def interactive_users():
+        # 자동 번역 폭주가 끝날 때까지 0.25초마다 /시이야 요청
+        tasks = []
+        while len(background_done) < background_count:
+            tasks.append(asyncio.create_task(call("interactive")))
+            await asyncio.sleep(0.25)
+        await asyncio.gather(*tasks)
+
+    await asyncio.gather(interactive_users(), *(call("background") for _ in range(background_count)))
+    aged = limiter.get_stats()["priorities"].get("background", {}).get("aged", 0)
+    print(f"{label:8s} | /시이야 {len(interactive_waits)}개 대기 p50/p99: {percentile(interactive_waits, 0.5) * 1000:6.0f} / {percentile(interactive_waits, 0.99) * 1000:6.0f}ms | "
+          f"자동 번역 {background_count}개 완료: {max(background_done):.1f}초 (aging {aged}회)")
+
+def main():
+    background_count = int(sys.argv[1]) if len(sys.argv) > 1 else 2500
+    limit = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    print(f"자동 번역 {background_count}개 폭주 + 폭주가 끝날 때까지 /시이야 (0.25초 간격), 동시 호출 한도 {limit}")
+    asyncio.run(run("FIFO", False, background_count, limit))
+    asyncio.run(run("우선순위", True, background_count, limit))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""서버 설정 저장소 벤치마크 (JSON 파일 vs SQLite)
+
+사용법: python benchmarks/settings_backend_bench.py [서버 수]
+임시 디렉터리에 가짜 서버 설정을 만들어 콜드 스타트 로드 시간과 설정 1건 갱신 지연을 비교합니다.
+"""
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+def make_settings(i):
+    return {
+        "source_channels": [i * 10 + k for k in range(3)],
+        "translation_channel": i * 10 + 9,
+        "admin_roles": [],
+        "target_language": "ko",
+        "reminders": [{"user_id": i, "guild_id": str(i), "channel_id": i * 10, "frequency": "매일",
+                       "time": "2026-01-01 23:50:00", "message": f"알림 {k}"} for k in range(5)],
+        "search_usage_weekly": 0,
+        "last_reset_week": 0
+    }
+
+def run(ss, backend, guild_count, update_count):
+    ss.configure_backend(backend)
+    ss.MTIME_CHECK_INTERVAL = 0
+    guild_ids = [str(i) for i in range(guild_count)]
+
+    started = time.perf_counter()
+    for guild_id in guild_ids:
+        ss.load_settings(guild_id)
+    cold_start = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for n in range(update_count):
+        guild_id = guild_ids[n % guild_count]
+        settings = ss.load_settings(guild_id)
+        settings["search_usage_weekly"] += 1
+        ss.save_settings(guild_id, settings)
+    per_update = (time.perf_counter() - started) / update_count
+
+    print(f"{backend:>6} | 콜드 스타트 {guild_count}개: {cold_start * 1000:8.1f}ms | 갱신 1건: {per_update * 1e6:8.1f}µs")
+
+def main():
+    guild_count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        import server_setting as ss
+
+        for i in range(guild_count):
+            ss.save_settings(str(i), make_settings(i))
+        ss.migrate_json_to_sqlite(ss.SETTINGS_DIR, ss.SQLITE_PATH)
+
+        run(ss, "json", guild_count, 1000)
+        run(ss, "sqlite", guild_count, 1000)
+        ss.configure_backend("json")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""자동 번역 마이크로 배치 벤치마크 (가짜 Gemini 백엔드)
+
+사용법: python benchmarks/translation_batch_bench.py [메시지 수] [배치 크기]
+메시지 1개당 API 호출 수와 입력 토큰 수(문자 4개 ≈ 토큰 1개로 추정)를 배치 전후로 비교합니다.
+"""
+import asyncio
+import os
+import random
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from translation_batcher import TranslationBatcher, build_single_prompt, build_batch_prompt
+
+MESSAGES = [
+    "need 2 more for boss", "anyone up for the raid tonight?", "gg wp everyone", "thanks for the carry",
+    "where do I get the new armor set", "brb dinner", "can someone invite me to the guild", "lol that was close",
+    "おつかれさまでした", "今日は何時から？", "bonjour tout le monde", "wer ist heute online?",
+]
+
+def estimate_tokens(prompt):
+    return len(prompt) / 4
+
+class FakeGemini:
+    def __init__(self):
+        self.calls = 0
+        self.input_tokens = 0
+
+    async def single(self, text, target_langs):
+        self.calls += 1
+        self.input_tokens += estimate_tokens(build_single_prompt(text, target_langs))
+        await asyncio.sleep(0.05)
+        return {lang: f"[{lang}] {text}" for lang in target_langs}, "en"
+
+    async def batch(self, items):
+        self.calls += 1
+        self.input_tokens += estimate_tokens(build_batch_prompt(items))
+        await asyncio.sleep(0.08)
+        return [({lang: f"[{lang}] {text}" for lang in target_langs}, "en") for text, target_langs in items]
+
+async def run(message_count, batch_size, batched):
+    backend = FakeGemini()
+    batcher = TranslationBatcher(backend.batch, backend.single, flush_window=0.3, max_batch_size=batch_size)
+
+    async def one(text):
+        await asyncio.sleep(random.uniform(0, 2))  # 2초 동안 고르게 도착하는 메시지
+        if batched:
+            return await batcher.translate(text, ("ko",))
+        return await backend.single(text, ("ko",))
+
+    random.seed(1)
+    await asyncio.gather(*(one(random.choice(MESSAGES)) for _ in range(message_count)))
+    label = "배치" if batched else "개별"
+    print(f"{label} | API 호출: {backend.calls:4d}회 ({backend.calls / message_count:.3f}회/메시지) | "
+          f"입력 토큰: {backend.input_tokens / message_count:6.1f}/메시지")
+
+def main():
+    message_count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    batch_size = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    asyncio.run(run(message_count, batch_size, batched=False))
+    asyncio.run(run(message_count, batch_size, batched=True))
+
+if __name__ == "__main__":
+    main()
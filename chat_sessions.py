@@ -0,0 +1,164 @@
+import logging
+import re
+import time
+from collections import OrderedDict
+
+
+log = logging.getLogger('RubyBot')
+
+# 🔹 사용자별 Gemini 대화 세션 관리 (개수 제한 LRU + 유휴 만료 + 세션별 토큰 예산)
+SOURCE_PATTERN = re.compile(r"--- \[출처: (\S+)\] ---\n")  # smart_scrape_urls가 자료마다 붙이는 머리말
+EVIDENCE_EXCERPT_CHARS = 150  # 대화 기록에 남길 자료별 요약 길이
+
+def _part_size(part):
+    """대화 기록 한 조각의 글자 수 (글자가 없는 도구 호출/응답은 직렬화한 길이로 추정)"""
+    text = getattr(part, "text", "")
+    return len(text) if text else len(str(part))
+
+def _content_size(content):
+    return sum(_part_size(part) for part in content.parts)
+
+def history_size(history):
+    return sum(_content_size(content) for content in history)
+
+def _tokens(chars):
+    """글자 수 -> 대략적인 토큰 수 (prompt_normalizer.estimate_tokens와 같은 기준, 4글자당 1토큰)"""
+    return chars / 4
+
+def _is_user_text(content):
+    """사용자가 직접 보낸 메시지인지 (도구 응답 제외) - 한 턴의 시작이며, 잘라낸 기록은 여기서 시작해야 함"""
+    return content.role == "user" and any(getattr(part, "text", "") for part in content.parts)
+
+def summarize_evidence(evidence, excerpt_chars=EVIDENCE_EXCERPT_CHARS):
+    """수집한 웹페이지 본문 -> 출처별 앞부분 몇 줄만 남긴 참고 자료 목록"""
+    pieces = SOURCE_PATTERN.split(evidence)
+    sources = list(zip(pieces[1::2], pieces[2::2]))
+    if not sources:
+        sources = [(None, evidence)]  # 출처 머리말이 없는 자료 (검색 실패 안내 등)
+    lines = []
+    for url, content in sources:
+        excerpt = " ".join(content.split())
+        if len(excerpt) > excerpt_chars:
+            excerpt = excerpt[:excerpt_chars] + "…"
+        lines.append(f"- {url}: {excerpt}" if url else f"- {excerpt}")
+    return "\n".join(lines)
+
+class ChatSessionManager:
+    """
+    user_id -> ChatSession. 세션은 최대 max_sessions개까지 두고 가장 오래 안 쓴 것부터 지우며,
+    idle_ttl초 동안 쓰지 않은 세션은 evict_idle()에서 지웁니다.
+    compact_turn()은 한 턴의 긴 질문(수집한 자료 포함)을 짧은 기록용 질문으로 바꾸고,
+    trim()은 대화 기록이 token_budget(추정 토큰)을 넘으면 오래된 턴부터 통째로 버립니다.
+    세션별 기록 크기는 턴이 끝날 때(compact_turn/trim) 재어 두고, get_stats()는 그 값을 합산만 합니다.
+    """
+
+    def __init__(self, factory, max_sessions=500, idle_ttl=3600, token_budget=8000):
+        self._factory = factory  # () -> 새 ChatSession
+        self.max_sessions = max_sessions
+        self.idle_ttl = idle_ttl
+        self.token_budget = token_budget
+        self._sessions = OrderedDict()  # user_id -> [session, last_used, 기록 글자 수]
+        self.stats = {"created": 0, "lru_evictions": 0, "idle_evictions": 0, "resets": 0, "trims": 0, "trimmed_messages": 0,
+                      "compacted_turns": 0, "compacted_chars": 0}
+
+    def get(self, user_id):
+        """세션 반환 (없으면 새로 만듦)"""
+        entry = self._sessions.get(user_id)
+        if entry is None:
+            entry = self._sessions[user_id] = [self._factory(), 0.0, 0]
+            self.stats["created"] += 1
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+                self.stats["lru_evictions"] += 1
+        entry[1] = time.monotonic()
+        self._sessions.move_to_end(user_id)
+        return entry[0]
+
+    def reset(self, user_id):
+        """/새대화: 세션을 지움. 지운 세션이 있었으면 True"""
+        if self._sessions.pop(user_id, None) is None:
+            return False
+        self.stats["resets"] += 1
+        return True
+
+    def __contains__(self, user_id):
+        return user_id in self._sessions
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def evict_idle(self):
+        cutoff = time.monotonic() - self.idle_ttl
+        expired = [user_id for user_id, (_, last_used, _) in self._sessions.items() if last_used < cutoff]
+        for user_id in expired:
+            del self._sessions[user_id]
+        self.stats["idle_evictions"] += len(expired)
+        return len(expired)
+
+    def compact_turn(self, user_id, turn_start, stored_question):
+        """
+        방금 끝난 턴(history[turn_start:])을 [stored_question, 최종 답변] 두 메시지로 줄입니다.
+        수집한 웹페이지 본문이 담긴 질문과 도구 호출/응답이 다음 질문 때마다 다시 전송되지 않게 합니다.
+        """
+        entry = self._sessions.get(user_id)
+        if entry is None:
+            return 0
+        session = entry[0]
+        history = list(session.history)
+        turn = history[turn_start:]
+        if len(turn) < 2 or turn[0].role != "user" or turn[-1].role != "model":
+            return 0
+        question = turn[0]
+        compact = type(question)(role=question.role, parts=[type(question.parts[0])(text=stored_question)])
+        before = history_size(turn)
+        session.history = history[:turn_start] + [compact, turn[-1]]
+        saved = before - history_size([compact, turn[-1]])
+        entry[2] = history_size(history[:turn_start]) + before - saved
+        self.stats["compacted_turns"] += 1
+        self.stats["compacted_chars"] += saved
+        return saved
+
+    def trim(self, user_id):
+        """
+        대화 기록이 토큰 예산을 넘으면 오래된 턴(사용자 메시지 ~ 다음 사용자 메시지 전)부터 통째로 버립니다.
+        도구 호출과 응답이 떨어지지 않고, 남은 기록은 항상 사용자 메시지로 시작합니다.
+        마지막 턴 하나만 남았는데도 넘으면 질문과 최종 답변만 남깁니다. 버린 메시지 수 반환
+        """
+        entry = self._sessions.get(user_id)
+        if entry is None:
+            return 0
+        session = entry[0]
+        history = list(session.history)
+        sizes = [_content_size(content) for content in history]
+        size = entry[2] = sum(sizes)
+        if _tokens(size) <= self.token_budget:
+            return 0
+        start = 0
+        for turn_start in (i for i, content in enumerate(history) if i > 0 and _is_user_text(content)):
+            if _tokens(size) <= self.token_budget:
+                break
+            size -= sum(sizes[start:turn_start])
+            start = turn_start
+        kept = history[start:]
+        if _tokens(size) > self.token_budget and len(kept) > 2 and _is_user_text(kept[0]) and kept[-1].role == "model":
+            kept = [kept[0], kept[-1]]
+            size = sizes[start] + sizes[-1]
+        dropped = len(history) - len(kept)
+        if dropped == 0:
+            return 0
+        session.history = kept
+        entry[2] = size
+        self.stats["trims"] += 1
+        self.stats["trimmed_messages"] += dropped
+        log.info(f"[대화 세션] {user_id}의 대화 기록 {dropped}개를 정리했어요. (남은 토큰 약 {_tokens(size):.0f})")
+        return dropped
+
+    def get_stats(self):
+        sizes = [size for _, _, size in self._sessions.values()]
+        return {
+            **self.stats,
+            "sessions": len(self._sessions),
+            "history_chars": sum(sizes),
+            "estimated_tokens": _tokens(sum(sizes)),
+            "largest_session_tokens": _tokens(max(sizes, default=0))
+        }
@@ -0,0 +1,116 @@
+import math
+import re
+from collections import Counter
+
+from prompt_normalizer import EMOJI_PATTERN, MENTION_PATTERN, URL_PATTERN
+
+# 🔹 오프라인 언어 감지기 (문자 영역 + 라틴 문자용 3-gram 모델)
+# 자동 번역 전에 "이미 목표 언어인지"를 API 호출 없이 판단하기 위한 용도입니다.
+
+HANGUL_PATTERN = re.compile(r'[가-힣㄰-㆏]')
+KANA_PATTERN = re.compile(r'[぀-ヿ]')
+HAN_PATTERN = re.compile(r'[一-鿿]')
+CYRILLIC_PATTERN = re.compile(r'[Ѐ-ӿ]')
+LATIN_PATTERN = re.compile(r'[a-zA-ZÀ-ɏ]')
+STRIP_PATTERN = re.compile("|".join(p.pattern for p in (EMOJI_PATTERN, MENTION_PATTERN, URL_PATTERN)))  # 이모지, 멘션, URL 제거
+WORD_PATTERN = re.compile(r"[^\W\d_]+(?:'[^\W\d_]+)?")
+
+# 라틴 문자 언어별 학습 문장 (자주 쓰는 단어 위주)
+LATIN_SAMPLES = {
+    "en": (
+        "the be to of and a in that have i it for not on with he as you do at this but his by from they we say her she or an will my one all would there their what so up out if about who get which go me when make can like time no just him know take people into year your good some could them see other than then now look only come its over think also back after use two how our work first well way even new want because any these give day most us "
+        "is are was were been has had did does should thanks thank please help someone anyone everyone where why really very much today tonight tomorrow morning night late ready let going need sorry yes yeah okay nice great game play team join wait online"
+    ),
+    "fr": (
+        "le de un être et à il avoir ne je son que se qui ce dans en du elle au pour pas vous par sur faire plus dire me on mon lui nous comme mais pouvoir avec tout y aller voir bien où sans tu ou leur si deux moi vouloir te venir quand grand celui "
+        "est sont était les des une cette ces aussi très encore déjà toujours jamais rien quelque chose personne quelqu'un bonjour salut merci beaucoup bonsoir aujourd'hui demain soir matin nuit peut veux sais suis es avez allez comment pourquoi "
+        "c'est qu'il n'est j'ai d'accord désolé prêt attendre jouer jeu équipe aide aider"
+    ),
+    "de": (
+        "der die und in den von zu das mit sich des auf für ist im dem nicht ein eine als auch es an werden aus er hat dass sie nach wird bei einer um am sind noch wie einem über einen so zum war haben nur oder aber vor zur bis mehr durch man "
+        "ich du wir ihr mir dir uns euch mein dein kein keine habe hast kann kannst muss will wollen soll heute morgen abend nacht jetzt schon immer wieder hier dort warum wann wo jemand alle allen etwas nichts "
+        "danke bitte hallo guten tag gut sehr schön spiel spielen warten helfen hilfe bereit leider entschuldigung uhr zeit"
+    ),
+    "es": (
+        "el la de que y a en un ser se no haber por con su para como estar tener le lo todo pero más hacer o poder decir este ir otro ese si me ya ver porque dar cuando él muy sin vez mucho saber qué sobre mi alguno mismo yo también hasta "
+        "los las una unos es son está están estoy estás era fue hay tengo tienes puedo puede quiero hoy mañana noche tarde ahora siempre nunca aquí dónde cómo quién alguien nadie todos nada "
+        "hola gracias muchas buenos días buenas lo siento perdón listo esperar jugar juego equipo ayuda ayudar nos vemos"
+    ),
+    "it": (
+        "il di che è e la per un in non sono mi ho lo ha le si ma cosa con da una del questo bene qui tu ti io hai sei come al mio se della no alla anche gli era più perché solo sua "
+        "dei delle degli nel nella sul sulla questa quello quella c'è ci siamo siete fare posso può puoi voglio oggi domani stasera sera notte adesso sempre mai dove quando chi qualcuno nessuno tutti niente "
+        "ciao grazie mille buongiorno buonasera scusa mi dispiace pronto aspettare giocare gioco squadra aiuto aiutare vediamo"
+    ),
+    "pt": (
+        "o de a e que do da em um para com não uma os no se na por mais as dos como mas foi ao ele das tem à seu sua ou ser quando muito há nos já está eu também só pelo pela até isso ela entre era depois sem mesmo "
+        "você vocês estão estou estava são tenho tem posso pode quero hoje amanhã noite tarde agora sempre nunca aqui onde quem alguém ninguém todos nada essa esse "
+        "olá oi obrigado obrigada bom dia boa desculpa pronto esperar jogar jogo time ajuda ajudar vemos"
+    ),
+}
+
+# 지원하지 않는 라틴 문자 언어(네덜란드어, 스웨덴어 등)도 나이브 베이즈는 가장 가까운 언어로 확신해 버리므로,
+# 문장의 단어 중 이 비율 이상이 해당 언어 어휘(학습 문장의 단어)여야 신뢰도를 그대로 인정합니다.
+MIN_WORD_COVERAGE = 0.5
+
+def _features(text):
+    """단어 단위 3-gram + 단어 전체(자주 쓰는 기능어를 잡기 위함)"""
+    features = []
+    for word in WORD_PATTERN.findall(text.lower()):
+        padded = f" {word} "
+        features.extend(padded[i:i + 3] for i in range(len(padded) - 2))
+        features.append(padded)
+    return features
+
+def _build_model(samples):
+    model = {}
+    for lang, sample in samples.items():
+        counts = Counter(_features(sample))
+        total = sum(counts.values())
+        vocab = len(counts) + 1
+        model[lang] = ({gram: math.log((count + 1) / (total + vocab)) for gram, count in counts.items()},
+                       math.log(1 / (total + vocab)))
+    return model
+
+LATIN_MODEL = _build_model(LATIN_SAMPLES)
+LATIN_VOCAB = {lang: frozenset(WORD_PATTERN.findall(sample.lower())) for lang, sample in LATIN_SAMPLES.items()}
+
+def _detect_latin(text):
+    grams = _features(text)
+    if not grams:
+        return None, 0.0
+    scores = {}
+    for lang, (log_probs, unseen) in LATIN_MODEL.items():
+        scores[lang] = sum(log_probs.get(gram, unseen) for gram in grams)
+    best = max(scores, key=scores.get)
+    # 나이브 베이즈 사후확률을 신뢰도로 사용하되, 그 언어의 단어가 충분히 보이지 않으면 낮춤 (미지원 언어 대비)
+    total = sum(math.exp(score - scores[best]) for score in scores.values())
+    words = WORD_PATTERN.findall(text.lower())
+    coverage = sum(word in LATIN_VOCAB[best] for word in words) / len(words)
+    return best, min(1.0, coverage / MIN_WORD_COVERAGE) / total
+
+def detect_language(text):
+    """
+    텍스트의 주 언어와 신뢰도(0~1)를 반환합니다. 판단할 글자가 없으면 (None, 0.0).
+    지원 언어: ko, ja, zh, ru, en, fr, de, es, it, pt (그 밖의 라틴 문자 언어는 가장 가까운 언어로 나오지만 신뢰도가 낮음)
+    """
+    text = STRIP_PATTERN.sub(" ", text)
+    hangul = len(HANGUL_PATTERN.findall(text))
+    kana = len(KANA_PATTERN.findall(text))
+    han = len(HAN_PATTERN.findall(text))
+    cyrillic = len(CYRILLIC_PATTERN.findall(text))
+    latin = len(LATIN_PATTERN.findall(text))
+    letters = hangul + kana + han + cyrillic + latin
+    if not letters:
+        return None, 0.0
+
+    if hangul:
+        return "ko", hangul / letters
+    if kana:
+        return "ja", (kana + han) / letters
+    if han:
+        return "zh", 0.7 * han / letters  # 가나 없는 한자는 일본어일 수도 있어 신뢰도를 낮게 잡음
+    if cyrillic:
+        return "ru", cyrillic / letters
+
+    lang, confidence = _detect_latin(text)
+    return lang, confidence * latin / letters
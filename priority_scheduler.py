@@ -0,0 +1,98 @@
+import time
+from collections import deque
+
+# 🔹 Gemini 호출 대기열 우선순위: 사용자가 기다리는 요청을 자동 번역보다 먼저 처리
+# 클래스 이름 -> 가중치 (대기 중인 클래스끼리 가중치 비율대로 자리를 나눠 가짐)
+DEFAULT_PRIORITY_WEIGHTS = {"interactive": 6, "manual": 3, "background": 1}
+
+class WeightedPriorityQueue:
+    """
+    우선순위 클래스별 대기열. 다음 차례는 smooth weighted round-robin으로 고르므로
+    낮은 클래스도 가중치만큼은 자리를 받습니다. 맨 앞 요청이 max_wait초 넘게 기다린 클래스는
+    가중치를 가장 높은 클래스와 같게 올려 줍니다(aging). 맨 앞으로 새치기하지는 않으므로
+    폭주가 길어져도 대화 요청은 최소한 자기 몫(가중치 비율)만큼 자리를 계속 받습니다.
+    클래스별 대기 시간(최근 sample_size개)을 기록해 p50/p99를 계산합니다.
+    """
+
+    def __init__(self, weights=None, max_wait=10.0, sample_size=500):
+        self.weights = dict(weights or DEFAULT_PRIORITY_WEIGHTS)
+        self.default_class = min(self.weights, key=self.weights.get)  # 지정하지 않으면 가장 낮은 클래스
+        self.top_weight = max(self.weights.values())
+        self.max_wait = max_wait
+        self._queues = {name: deque() for name in self.weights}  # 클래스 -> deque[(future, enqueued_at)]
+        self._current = {name: 0 for name in self.weights}
+        self._samples = {name: deque(maxlen=sample_size) for name in self.weights}
+        self.stats = {name: {"queued": 0, "dispatched": 0, "aged": 0, "max_wait": 0.0} for name in self.weights}
+
+    def resolve(self, priority):
+        return priority if priority in self._queues else self.default_class
+
+    def push(self, future, priority=None):
+        name = self.resolve(priority)
+        self._queues[name].append((future, time.monotonic()))
+        self.stats[name]["queued"] += 1
+
+    def remove(self, future):
+        for queue in self._queues.values():
+            for item in queue:
+                if item[0] is future:
+                    queue.remove(item)
+                    return
+
+    def record_immediate(self, priority=None):
+        """기다리지 않고 바로 자리를 받은 요청 (대기 시간 0으로 기록)"""
+        name = self.resolve(priority)
+        self.stats[name]["dispatched"] += 1
+        self._samples[name].append(0.0)
+
+    def _pick(self, now):
+        active = [name for name, queue in self._queues.items() if queue]
+        if not active:
+            return None
+        # aging: 너무 오래 기다린 클래스는 이번 차례에 가장 높은 가중치로 경쟁
+        aged = {name for name in active if now - self._queues[name][0][1] >= self.max_wait and self.weights[name] < self.top_weight}
+        total = 0
+        for name in active:
+            weight = self.top_weight if name in aged else self.weights[name]
+            self._current[name] += weight
+            total += weight
+        chosen = max(active, key=lambda name: self._current[name])
+        self._current[chosen] -= total
+        if chosen in aged:
+            self.stats[chosen]["aged"] += 1
+        return chosen
+
+    def pop(self):
+        """다음 차례 future 반환 (이미 취소된 것은 건너뜀, 비어 있으면 None)"""
+        now = time.monotonic()
+        while True:
+            name = self._pick(now)
+            if name is None:
+                return None
+            future, enqueued_at = self._queues[name].popleft()
+            if future.done():
+                continue
+            waited = now - enqueued_at
+            stats = self.stats[name]
+            stats["dispatched"] += 1
+            stats["max_wait"] = max(stats["max_wait"], waited)
+            self._samples[name].append(waited)
+            return future
+
+    def __len__(self):
+        return sum(len(queue) for queue in self._queues.values())
+
+    def depth(self, priority):
+        return len(self._queues[self.resolve(priority)])
+
+    def get_stats(self):
+        result = {}
+        for name, stats in self.stats.items():
+            samples = sorted(self._samples[name])
+            result[name] = {
+                **stats,
+                "depth": len(self._queues[name]),
+                "p50_wait": samples[len(samples) // 2] if samples else 0.0,
+                "p99_wait": samples[min(len(samples) - 1, int(len(samples) * 0.99))] if samples else 0.0
+            }
+        return result
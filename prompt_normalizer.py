@@ -0,0 +1,60 @@
+import re
+
+# 🔹 번역 프롬프트 정규화: 번역할 필요 없는 부분을 짧은 자리표시자로 바꿨다가 응답에서 되돌림
+CODE_BLOCK_PATTERN = re.compile(r"```.*?```|`[^`\n]+`", re.DOTALL)
+URL_PATTERN = re.compile(r"https?://\S+")
+EMOJI_PATTERN = re.compile(r"<a?:\w+:\d+>")
+MENTION_PATTERN = re.compile(r"<[@#][!&]?\d+>")
+PROTECTED_PATTERN = re.compile("|".join(p.pattern for p in (CODE_BLOCK_PATTERN, URL_PATTERN, EMOJI_PATTERN, MENTION_PATTERN)), re.DOTALL)
+PLACEHOLDER_PATTERN = re.compile(r"⟦\s*(\d+)\s*⟧")
+
+def estimate_tokens(text):
+    """대략적인 토큰 수 (문자 4개당 1토큰)"""
+    return len(text) / 4
+
+class PromptNormalizer:
+    """
+    코드 블록, URL, 커스텀 이모지, 멘션을 ⟦0⟧ 같은 자리표시자로 바꿔 API에 보내고,
+    번역 결과에서 원래 내용으로 되돌립니다. 토큰 절약량을 stats에 누적합니다.
+    """
+
+    def __init__(self):
+        self.stats = {"messages": 0, "protected_messages": 0, "tokens_before": 0.0, "tokens_after": 0.0, "restore_fallbacks": 0}
+
+    def protect(self, text):
+        """(자리표시자로 바꾼 텍스트, 원래 조각 목록) 반환"""
+        self.stats["messages"] += 1
+        if PLACEHOLDER_PATTERN.search(text):
+            spans = []  # 원문에 이미 자리표시자 모양이 있으면 되돌릴 때 헷갈리므로 그대로 보냄
+            protected = text
+        else:
+            spans = PROTECTED_PATTERN.findall(text)
+            counter = iter(range(len(spans)))
+            protected = PROTECTED_PATTERN.sub(lambda _: f"⟦{next(counter)}⟧", text)
+        if spans:
+            self.stats["protected_messages"] += 1
+        self.stats["tokens_before"] += estimate_tokens(text)
+        self.stats["tokens_after"] += estimate_tokens(protected)
+        return protected, spans
+
+    def restore(self, text, spans, original):
+        """
+        번역 결과의 자리표시자를 원래 조각으로 되돌립니다. (순서가 바뀌어도 번호로 되돌림)
+        자리표시자가 빠졌거나 없는 번호가 섞여 있으면 링크·멘션이 깨지므로 원문(original)을 그대로 반환
+        """
+        if not spans or not text:
+            return text
+        found = {int(m.group(1)) for m in PLACEHOLDER_PATTERN.finditer(text)}
+        if found != set(range(len(spans))):
+            self.stats["restore_fallbacks"] += 1
+            return original
+        return PLACEHOLDER_PATTERN.sub(lambda m: spans[int(m.group(1))], text)
+
+    def get_stats(self):
+        messages = self.stats["messages"]
+        saved = self.stats["tokens_before"] - self.stats["tokens_after"]
+        return {
+            **self.stats,
+            "saved_per_message": saved / messages if messages else 0.0,
+            "saved_ratio": saved / self.stats["tokens_before"] if self.stats["tokens_before"] else 0.0
+        }
@@ -0,0 +1,156 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+
+from background_tasks import spawn
+
+log = logging.getLogger('RubyBot')
+
+class ReminderScheduler:
+    """
+    min-heap(마감 시각 기준) + 타이머 하나로 모든 알림을 관리하는 스케줄러.
+    알림마다 잠자는 task를 만들지 않고, 가장 빠른 알림 시각에만 타이머를 걸어둡니다.
+    """
+
+    def __init__(self, fire_callback):
+        self._fire_callback = fire_callback  # async def callback(reminder_id, payload, due_ts)
+        self._heap = []  # (due_ts, seq, reminder_id)
+        self._entries = {}  # reminder_id -> (due_ts, seq, payload)
+        self._seq = itertools.count()
+        self._timer = None
+        self._timer_due = None
+        self.stats = {"fired": 0, "cancelled": 0, "last_lag": 0.0, "max_lag": 0.0, "total_lag": 0.0}
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, reminder_id):
+        return reminder_id in self._entries
+
+    def schedule(self, reminder_id, due_ts, payload):
+        """알림 등록 (같은 ID가 있으면 교체). O(log n)"""
+        seq = next(self._seq)
+        self._entries[reminder_id] = (due_ts, seq, payload)
+        heapq.heappush(self._heap, (due_ts, seq, reminder_id))
+        if self._timer_due is None or due_ts < self._timer_due:
+            self._arm()
+
+    def cancel(self, reminder_id) -> bool:
+        """알림 취소. 힙에서는 꺼낼 때 건너뛰는 지연 삭제 방식 (O(1), 힙 정리는 O(log n))"""
+        if self._entries.pop(reminder_id, None) is None:
+            return False
+        self.stats["cancelled"] += 1
+        self._discard_stale_head()
+        if not self._heap:
+            self._disarm()
+        return True
+
+    def next_due(self):
+        self._discard_stale_head()
+        return self._heap[0][0] if self._heap else None
+
+    def _discard_stale_head(self):
+        while self._heap:
+            due_ts, seq, reminder_id = self._heap[0]
+            entry = self._entries.get(reminder_id)
+            if entry is not None and entry[1] == seq:
+                return
+            heapq.heappop(self._heap)
+
+    def _disarm(self):
+        if self._timer:
+            self._timer.cancel()
+        self._timer = None
+        self._timer_due = None
+
+    def _arm(self):
+        self._disarm()
+        due_ts = self.next_due()
+        if due_ts is None:
+            return
+        loop = asyncio.get_running_loop()
+        self._timer = loop.call_later(max(0.0, due_ts - time.time()), self._on_timer)
+        self._timer_due = due_ts
+
+    def _on_timer(self):
+        self._timer = None
+        self._timer_due = None
+        now = time.time()
+        while True:
+            due_ts = self.next_due()
+            if due_ts is None or due_ts > now:
+                break
+            _, seq, reminder_id = heapq.heappop(self._heap)
+            _, _, payload = self._entries.pop(reminder_id)
+
+            lag = now - due_ts
+            self.stats["fired"] += 1
+            self.stats["last_lag"] = lag
+            self.stats["total_lag"] += lag
+            self.stats["max_lag"] = max(self.stats["max_lag"], lag)
+            if lag > 5:
+                log.warning(f"⏰ 알림 스케줄러 지연: {lag:.1f}초 늦게 실행됨 ({reminder_id})")
+
+            spawn(self._fire_callback(reminder_id, payload, due_ts))
+        self._arm()
+
+    def get_stats(self):
+        fired = self.stats["fired"]
+        return {
+            **self.stats,
+            "pending": len(self._entries),
+            "avg_lag": self.stats["total_lag"] / fired if fired else 0.0
+        }
+
+class ReminderDelivery:
+    """같은 채널에서 비슷한 시각에 울린 알림을 모아 메시지 하나(2000자 이내)로 보냅니다."""
+    MAX_MESSAGE_LENGTH = 2000
+
+    def __init__(self, window=0.5):
+        self.window = window  # 모으는 시간 (초)
+        self._pending = {}  # channel_id -> (channel, [line, ...])
+        self.stats = {"reminders": 0, "sends": 0, "saved_sends": 0}
+
+    def enqueue(self, channel, line):
+        pending = self._pending.get(channel.id)
+        if pending is None:
+            self._pending[channel.id] = (channel, [line])
+            asyncio.get_running_loop().call_later(self.window, lambda: spawn(self._flush(channel.id)))
+        else:
+            pending[1].append(line)
+
+    def _pack(self, lines):
+        """줄을 이어 붙여 2000자 이내 메시지로 묶음. 한 줄이 2000자를 넘으면 잘라서 여러 메시지로 보냄"""
+        limit = self.MAX_MESSAGE_LENGTH
+        chunks, current = [], ""
+        for line in lines:
+            while len(line) > limit:
+                if current:
+                    chunks.append(current)
+                    current = ""
+                chunks.append(line[:limit])
+                line = line[limit:]
+            if current and len(current) + 1 + len(line) > limit:
+                chunks.append(current)
+                current = line
+            else:
+                current = f"{current}\n{line}" if current else line
+        if current:
+            chunks.append(current)
+        return chunks
+
+    async def _flush(self, channel_id):
+        channel, lines = self._pending.pop(channel_id)
+        chunks = self._pack(lines)
+        self.stats["reminders"] += len(lines)
+        self.stats["sends"] += len(chunks)
+        self.stats["saved_sends"] += len(lines) - len(chunks)
+        if len(lines) > 1:
+            log.info(f"⏰ 알림 {len(lines)}개를 메시지 {len(chunks)}개로 묶어서 보내요. (채널: {channel_id})")
+        for chunk in chunks:
+            try:
+                await channel.send(chunk)
+            except Exception as e:
+                log.error(f"알림 전송 실패 (채널: {channel_id}): {e}")
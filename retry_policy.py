@@ -0,0 +1,209 @@
+import asyncio
+import functools
+import logging
+import random
+import time
+
+from adaptive_limiter import SlotTimeoutError, is_throttle_error
+
+log = logging.getLogger('RubyBot')
+
+# 🔹 재시도 정책: 오류 분류, full jitter 백오프, 호출별 마감 시간, 서킷 브레이커, 함수별 지표
+RETRYABLE_STATUS_CODES = frozenset({408, 429, 500, 502, 503, 504})
+RETRYABLE_ERROR_NAMES = frozenset({"InternalServerError", "Aborted", "GatewayTimeout", "BadGateway", "ServerDisconnectedError", "ClientConnectionError"})
+
+class CircuitOpenError(RuntimeError):
+    """서킷 브레이커가 열려 있어 호출하지 않고 바로 실패함"""
+
+class CallDeadlineError(RuntimeError):
+    """호출의 마감 시간이 지남 (자리 대기 중이든 호출 중이든 우리 쪽 제한이므로 API 과부하·브레이커 실패로 보지 않음)"""
+
+def is_retryable_error(error):
+    """다시 보내면 성공할 수도 있는 오류(과부하, 타임아웃, 서버·네트워크 오류)면 True. 요청 자체의 문제는 False"""
+    if is_throttle_error(error) or isinstance(error, (TimeoutError, ConnectionError)):
+        return True
+    if any(cls.__name__ in RETRYABLE_ERROR_NAMES for cls in type(error).__mro__):
+        return True
+    return getattr(error, "code", None) in RETRYABLE_STATUS_CODES
+
+class CircuitBreaker:
+    """
+    재시도할 만한 오류가 failure_threshold번 연속으로 나면 cooldown 동안 호출을 막습니다(열림).
+    cooldown이 지나면 시험 호출 하나만 보내서(반열림) 성공하면 닫고, 실패하면 다시 엽니다.
+    """
+
+    def __init__(self, failure_threshold=5, cooldown=30.0):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self._failures = 0
+        self._opened_at = None
+        self._trial_running = False
+        self.stats = {"opened": 0, "short_circuited": 0}
+
+    @property
+    def state(self):
+        if self._opened_at is None:
+            return "closed"
+        return "half_open" if time.monotonic() - self._opened_at >= self.cooldown else "open"
+
+    def allow(self):
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half_open" and not self._trial_running:
+            self._trial_running = True
+            return True
+        self.stats["short_circuited"] += 1
+        return False
+
+    def record_success(self):
+        self._failures = 0
+        self._opened_at = None
+        self._trial_running = False
+
+    def record_failure(self):
+        self._failures += 1
+        if self._trial_running or (self._opened_at is None and self._failures >= self.failure_threshold):
+            if self._opened_at is None:
+                log.error(f"[서킷 브레이커] 연속 {self._failures}회 실패, {self.cooldown:.0f}초 동안 Gemini 호출을 멈춰요.")
+            self._opened_at = time.monotonic()
+            self.stats["opened"] += 1
+        self._trial_running = False
+
+    def release_trial(self):
+        """시험 호출이 성공도 실패도 아니게 끝남 (요청 자체 오류, 취소 등)"""
+        self._trial_running = False
+
+class _Deadline:
+    """호출 하나의 마감 시간. 호출한 순간부터 잽니다. (대기열에서 기다린 시간도 포함: 디스코드 응답 토큰은 그동안에도 만료되므로)"""
+
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self.started = time.monotonic()
+
+    def remaining(self):
+        if self.seconds is None:
+            return None
+        return self.seconds - (time.monotonic() - self.started)
+
+    def expired(self):
+        remaining = self.remaining()
+        return remaining is not None and remaining <= 0
+
+class RetryPolicy:
+    """
+    async 함수를 감싸는 재시도 정책입니다.
+    - 재시도 가능한 오류만 다시 시도하고, 대기 시간은 0 ~ min(max_backoff, base_backoff * 2^n) 사이 무작위 (full jitter)
+    - deadline(초) 안에 끝나지 않으면 CallDeadlineError (호출한 순간부터 잼. 자리 대기·재시도 대기·호출 시간 모두 포함)
+      마감으로 끊긴 호출은 리미터 지연 통계·과부하 신호와 브레이커 실패로 기록하지 않음 (429/503·모델 자체 타임아웃만 과부하)
+    - limiter가 있으면 시도마다 limiter.slot(priority) 안에서 실행, breaker가 열려 있으면 바로 실패
+    - 최종 실패 시 fallback(error, *args, **kwargs)이 있으면 그 값을 반환하고, 없으면 예외를 그대로 올림
+    """
+
+    def __init__(self, name, retries=3, base_backoff=1.0, max_backoff=8.0, deadline=None, limiter=None, breaker=None, fallback=None,
+                 priority=None):
+        self.name = name
+        self.priority = priority
+        self.retries = retries
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.deadline = deadline
+        self.limiter = limiter
+        self.breaker = breaker
+        self.fallback = fallback
+        self.stats = {"calls": 0, "successes": 0, "retries": 0, "fatal": 0, "exhausted": 0, "deadline_exceeded": 0,
+                      "short_circuited": 0, "fallbacks": 0, "total_latency": 0.0}
+
+    def __call__(self, func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            try:
+                return await self.run(func, *args, **kwargs)
+            except Exception as e:
+                if self.fallback is None:
+                    raise
+                self.stats["fallbacks"] += 1
+                log.error(f"[{self.name}] 최종 실패: {type(e).__name__}: {e}")
+                return self.fallback(e, *args, **kwargs)
+        wrapper.retry_policy = self
+        return wrapper
+
+    async def run(self, func, *args, **kwargs):
+        self.stats["calls"] += 1
+        started = time.monotonic()
+        deadline = _Deadline(self.deadline)
+        attempt = 0
+        try:
+            while True:
+                attempt += 1
+                trial = self.breaker is not None and self.breaker.state == "half_open"
+                if self.breaker and not self.breaker.allow():
+                    self.stats["short_circuited"] += 1
+                    raise CircuitOpenError("Gemini 호출이 잠시 중단된 상태예요.")
+                try:
+                    result = await self._attempt(func, args, kwargs, deadline)
+                except CallDeadlineError:
+                    self.stats["deadline_exceeded"] += 1
+                    raise
+                except Exception as e:
+                    retryable = is_retryable_error(e)
+                    if self.breaker and retryable:
+                        self.breaker.record_failure()
+                    elif self.breaker:
+                        self.breaker.release_trial()
+                    if not retryable:
+                        self.stats["fatal"] += 1
+                        raise
+                    if attempt >= self.retries:
+                        self.stats["exhausted"] += 1
+                        raise
+                    delay = random.uniform(0, min(self.max_backoff, self.base_backoff * 2 ** (attempt - 1)))
+                    remaining = deadline.remaining()
+                    if remaining is not None and delay >= remaining:
+                        self.stats["deadline_exceeded"] += 1
+                        raise
+                    self.stats["retries"] += 1
+                    log.warning(f"[{self.name}] API 호출 실패: {e}. {delay:.1f}초 후 재시도합니다... ({attempt}/{self.retries - 1})")
+                    await asyncio.sleep(delay)
+                    continue
+                else:
+                    if self.breaker:
+                        self.breaker.record_success()
+                    self.stats["successes"] += 1
+                    return result
+                finally:
+                    if trial:
+                        self.breaker.release_trial()  # 취소 등으로 결과를 기록하지 못해도 시험 호출 자리를 풀어줌
+        finally:
+            self.stats["total_latency"] += time.monotonic() - started
+
+    def _deadline_error(self, what):
+        return CallDeadlineError(f"{self.name}: {what} 마감 시간({self.deadline}초)이 지났어요.")
+
+    async def _attempt(self, func, args, kwargs, deadline):
+        if deadline.expired():
+            raise self._deadline_error("호출하기 전에")
+        if self.limiter is None:
+            return await self._call(func, args, kwargs, deadline, None)
+        try:
+            async with self.limiter.slot(self.priority, timeout=deadline.remaining()) as lease:
+                return await self._call(func, args, kwargs, deadline, lease)
+        except SlotTimeoutError:
+            raise self._deadline_error("자리를 기다리다") from None
+
+    async def _call(self, func, args, kwargs, deadline, lease):
+        remaining = deadline.remaining()
+        if remaining is None:
+            return await func(*args, **kwargs)
+        try:
+            return await asyncio.wait_for(func(*args, **kwargs), remaining)
+        except asyncio.TimeoutError:
+            if not deadline.expired():
+                raise  # 함수 안에서 난 타임아웃 (모델 호출 자체의 타임아웃 등)
+            if lease is not None:
+                lease.skip_sample()  # 중간에 끊은 호출의 지연은 API 상태를 말해주지 않음
+            raise self._deadline_error("호출 중에") from None
+
+    def get_stats(self):
+        calls = self.stats["calls"]
+        return {**self.stats, "avg_latency": self.stats["total_latency"] / calls if calls else 0.0}
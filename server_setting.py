@@ -1,34 +1,484 @@
+import argparse
+import copy
+import hashlib
 import json
 import os
+import sqlite3
+import threading
+import time
+import uuid
+from types import MappingProxyType
 
 # 🔹 서버별 설정 파일을 저장할 디렉터리
 SETTINGS_DIR = "bot_setting/server_settings"
 os.makedirs(SETTINGS_DIR, exist_ok=True)  # 폴더가 없으면 생성
 
+# 🔹 설정 캐시 (guild_id -> 캐시 항목)
+MTIME_CHECK_INTERVAL = 5.0  # 저장소 변경(mtime/version) 확인 주기 (초)
+_settings_cache = {}
+_cache_stats = {"hits": 0, "misses": 0, "invalidations": 0}
+
+# 🔹 저장소 백엔드 ("json": 서버별 JSON 파일 / "sqlite": 단일 SQLite DB)
+SQLITE_PATH = "bot_setting/settings.db"
+_backend = "json"
+_db = None
+_db_lock = threading.RLock()
+
+# 🔹 지연 저장(write-behind) 대기열 (guild_id -> 저장할 설정 스냅샷)
+_dirty_settings = {}
+_dirty_lock = threading.Lock()
+_write_lock = threading.Lock()
+
+# 🔹 JSON 백엔드용 알림 시각 인덱스 (guild_id -> (설정 파일 mtime, 가장 이른 알림 시각))
+# 알림 본문은 들고 있지 않고, SETTINGS_DIR의 사이드카 파일에도 남겨 재시작 때는 mtime이 바뀐 설정 파일만 다시 읽음
+REMINDER_DUE_INDEX_NAME = "reminder_due.index"
+_due_index = None
+_due_index_dirty = False
+_due_index_lock = threading.Lock()
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS guild_settings (
+    guild_id TEXT PRIMARY KEY,
+    data TEXT NOT NULL,
+    version INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS source_channels (
+    guild_id TEXT NOT NULL,
+    channel_id INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    PRIMARY KEY (guild_id, channel_id)
+);
+CREATE INDEX IF NOT EXISTS idx_source_channels_channel ON source_channels (channel_id);
+CREATE TABLE IF NOT EXISTS reminders (
+    reminder_id TEXT PRIMARY KEY,
+    guild_id TEXT NOT NULL,
+    due_time TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_reminders_guild ON reminders (guild_id);
+CREATE INDEX IF NOT EXISTS idx_reminders_due_time ON reminders (due_time);
+"""
+
 def get_guild_settings_path(guild_id):
     """서버별 설정 파일 경로 반환"""
     return os.path.join(SETTINGS_DIR, f"{guild_id}.json")
 
-def load_settings(guild_id):
-    """서버별 JSON 파일에서 설정 불러오기"""
-    file_path = get_guild_settings_path(guild_id)
-    if os.path.exists(file_path):
-        with open(file_path, "r", encoding="utf-8") as f:
-            return json.load(f)
-
-    # 기본 설정값
+def default_settings():
+    """기본 설정값"""
     return {
         "source_channels": [],
         "translation_channel": None,
         "admin_roles": [],
         "target_language": "ko",
-        "reminders": [],  # 리마인더 저장용 리스트 추가
+        "target_languages": ["ko"],  # 여러 언어로 동시에 자동 번역할 때 사용
+        "reminders": {},  # 리마인더 저장용 (reminder_id -> 알림, 등록 순서 유지)
         "search_usage_weekly": 0,
         "last_reset_week": 0
     }
 
-def save_settings(guild_id, settings):
-    """서버별 JSON 파일에 설정 저장"""
+def new_reminder_id():
+    return uuid.uuid4().hex[:12]
+
+def _normalize_reminders(settings):
+    """예전 형식(목록)의 알림을 ID 기준 dict로 바꿉니다. ID가 없던 알림은 내용으로 ID를 만들어 다시 읽어도 같은 ID가 나오게 함"""
+    reminders = settings.get("reminders")
+    if isinstance(reminders, list):
+        keyed = {}
+        for position, r in enumerate(reminders):
+            if "id" not in r:
+                r["id"] = hashlib.sha1(f"{position}|{json.dumps(r, sort_keys=True, ensure_ascii=False)}".encode()).hexdigest()[:12]
+            keyed[r["id"]] = r
+        settings["reminders"] = keyed
+    return settings
+
+def _freeze(value):
+    """dict/list를 수정할 수 없는 읽기 전용 구조로 변환"""
+    if isinstance(value, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+def _get_mtime(file_path):
+    try:
+        return os.stat(file_path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+def configure_backend(backend="json", sqlite_path=None):
+    """
+    설정 저장소 백엔드 선택 (load_settings/save_settings API는 그대로 유지)
+    바꾸기 전에 지연 저장 대기분을 기존 백엔드에 먼저 저장함 (저장에 실패하면 예외를 올리고 백엔드는 그대로 둠)
+    """
+    global _backend, _db, SQLITE_PATH
+    if backend not in ("json", "sqlite"):
+        raise ValueError(f"알 수 없는 저장소 백엔드: {backend}")
+    if _dirty_settings and (_backend != "sqlite" or _db is not None):
+        flush_dirty_settings()
+    with _db_lock:
+        if _db is not None:
+            _db.close()
+            _db = None
+        _backend = backend
+        if sqlite_path:
+            SQLITE_PATH = sqlite_path
+        if backend == "sqlite":
+            _db = open_database(SQLITE_PATH)
+    with _dirty_lock:
+        _dirty_settings.clear()
+    _settings_cache.clear()
+    _reset_due_index()
+
+def open_database(db_path):
+    """WAL 모드 SQLite DB 연결 (테이블이 없으면 생성)"""
+    os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+    db = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+    db.execute("PRAGMA journal_mode=WAL")
+    db.execute("PRAGMA synchronous=NORMAL")
+    db.executescript(SQLITE_SCHEMA)
+    return db
+
+def _db_get_version(guild_id):
+    with _db_lock:
+        row = _db.execute("SELECT version FROM guild_settings WHERE guild_id = ?", (guild_id,)).fetchone()
+    return row[0] if row else None
+
+def _db_read(guild_id):
+    with _db_lock:
+        row = _db.execute("SELECT data, version FROM guild_settings WHERE guild_id = ?", (guild_id,)).fetchone()
+        if row is None:
+            return None, None
+        settings = json.loads(row[0])
+        settings["source_channels"] = [r[0] for r in _db.execute(
+            "SELECT channel_id FROM source_channels WHERE guild_id = ? ORDER BY position", (guild_id,))]
+        settings["reminders"] = [json.loads(r[0]) for r in _db.execute(
+            "SELECT data FROM reminders WHERE guild_id = ? ORDER BY rowid", (guild_id,))]  # 등록 순서 (갱신해도 rowid 유지)
+    _normalize_reminders(settings)
+    return settings, row[1]
+
+def _db_write(db, guild_id, settings):
+    """
+    한 서버의 설정을 트랜잭션 하나로 기록하고 새 버전 번호를 반환.
+    채널/알림 행은 지금 저장된 행과 비교해 바뀐 행만 추가·수정·삭제합니다. (카운터만 바뀐 저장은 guild_settings 한 행만 씀)
+    알림 행은 ID로 찾으므로 앞쪽 알림을 지워도 뒤쪽 행은 다시 쓰지 않습니다.
+    """
+    data = {k: v for k, v in settings.items() if k not in ("source_channels", "reminders")}
+    channels = {}
+    for channel_id in settings.get("source_channels", []):
+        channels.setdefault(channel_id, len(channels))  # 중복 채널은 처음 위치만 (INSERT OR IGNORE와 같은 결과)
+    reminders = {reminder_id: (r.get("time", ""), json.dumps(r, ensure_ascii=False))
+                 for reminder_id, r in settings.get("reminders", {}).items()}
+    with _db_lock:
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            db.execute(
+                "INSERT INTO guild_settings (guild_id, data, version) VALUES (?, ?, 1) "
+                "ON CONFLICT(guild_id) DO UPDATE SET data = excluded.data, version = version + 1",
+                (guild_id, json.dumps(data, ensure_ascii=False)))
+
+            stored_channels = dict(db.execute("SELECT channel_id, position FROM source_channels WHERE guild_id = ?", (guild_id,)))
+            if stored_channels != channels:
+                db.executemany("DELETE FROM source_channels WHERE guild_id = ? AND channel_id = ?",
+                               [(guild_id, channel_id) for channel_id in stored_channels.keys() - channels.keys()])
+                db.executemany(
+                    "INSERT OR REPLACE INTO source_channels (guild_id, channel_id, position) VALUES (?, ?, ?)",
+                    [(guild_id, channel_id, position) for channel_id, position in channels.items()
+                     if stored_channels.get(channel_id) != position])
+
+            stored_reminders = {reminder_id: (due_time, row) for reminder_id, due_time, row in db.execute(
+                "SELECT reminder_id, due_time, data FROM reminders WHERE guild_id = ?", (guild_id,))}
+            if stored_reminders != reminders:
+                db.executemany("DELETE FROM reminders WHERE reminder_id = ?",
+                               [(reminder_id,) for reminder_id in stored_reminders.keys() - reminders.keys()])
+                db.executemany(
+                    "INSERT INTO reminders (reminder_id, guild_id, due_time, data) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT(reminder_id) DO UPDATE SET guild_id = excluded.guild_id, due_time = excluded.due_time, data = excluded.data",
+                    [(reminder_id, guild_id, due_time, row) for reminder_id, (due_time, row) in reminders.items()
+                     if stored_reminders.get(reminder_id) != (due_time, row)])
+            version = db.execute("SELECT version FROM guild_settings WHERE guild_id = ?", (guild_id,)).fetchone()[0]
+            db.execute("COMMIT")
+        except Exception:
+            db.execute("ROLLBACK")
+            raise
+    return version
+
+def _reset_due_index():
+    global _due_index, _due_index_dirty
+    with _due_index_lock:
+        _due_index, _due_index_dirty = None, False
+
+def _earliest_due(settings):
+    return min((r.get("time", "") for r in settings.get("reminders", {}).values()), default=None)
+
+def _index_due(guild_id, settings, mtime):
+    """설정 파일을 읽거나 쓸 때마다 그 서버의 가장 이른 알림 시각을 갱신"""
+    global _due_index_dirty
+    entry = (mtime, _earliest_due(settings))
+    with _due_index_lock:
+        if _due_index is not None and _due_index.get(guild_id) != entry:
+            _due_index[guild_id] = entry
+            _due_index_dirty = True
+
+def _due_index_path():
+    return os.path.join(SETTINGS_DIR, REMINDER_DUE_INDEX_NAME)
+
+def _load_due_index():
+    """사이드카 인덱스를 읽고, 파일 mtime이 달라졌거나 새로 생긴 설정 파일만 다시 읽어 맞춤 (나머지는 stat만)"""
+    global _due_index, _due_index_dirty
+    try:
+        with open(_due_index_path(), "r", encoding="utf-8") as f:
+            stored = {guild_id: tuple(entry) for guild_id, entry in json.load(f).items()}
+    except (FileNotFoundError, ValueError):
+        stored = {}
+    index = {}
+    for file_name in os.listdir(SETTINGS_DIR):
+        if not file_name.endswith(".json"):
+            continue
+        guild_id = file_name[:-len(".json")]
+        file_path = os.path.join(SETTINGS_DIR, file_name)
+        mtime = _get_mtime(file_path)
+        entry = stored.get(guild_id)
+        if entry is None or entry[0] != mtime:
+            with open(file_path, "r", encoding="utf-8") as f:
+                entry = (mtime, _earliest_due(_normalize_reminders(json.load(f))))
+        index[guild_id] = entry
+    with _due_index_lock:
+        if _due_index is None:
+            _due_index, _due_index_dirty = index, index != stored
+
+def _save_due_index():
+    global _due_index_dirty
+    with _due_index_lock:
+        if not _due_index_dirty:
+            return
+        data = json.dumps(_due_index, ensure_ascii=False)
+        _due_index_dirty = False
+    temp_path = f"{_due_index_path()}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        f.write(data)
+    os.replace(temp_path, _due_index_path())
+
+def _get_version(guild_id):
+    """저장소에 기록된 설정의 버전 (JSON은 파일 mtime, SQLite는 version 컬럼)"""
+    if _backend == "sqlite":
+        return _db_get_version(guild_id)
+    return _get_mtime(get_guild_settings_path(guild_id))
+
+def _read_settings(guild_id):
+    if _backend == "sqlite":
+        return _db_read(guild_id)
+    file_path = get_guild_settings_path(guild_id)
+    mtime = _get_mtime(file_path)
+    if mtime is None:
+        return None, None
+    with open(file_path, "r", encoding="utf-8") as f:
+        settings = _normalize_reminders(json.load(f))
+    _index_due(guild_id, settings, mtime)  # 외부에서 수정된 파일도 반영
+    return settings, mtime
+
+def _write_settings(guild_id, settings):
+    if _backend == "sqlite":
+        return _db_write(_db, guild_id, settings)
     file_path = get_guild_settings_path(guild_id)
-    with open(file_path, "w", encoding="utf-8") as f:
+    temp_path = f"{file_path}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
         json.dump(settings, f, ensure_ascii=False, indent=4)
+    os.replace(temp_path, file_path)  # 임시 파일 → 교체로 원자적 저장
+    mtime = _get_mtime(file_path)
+    _index_due(guild_id, settings, mtime)
+    return mtime
+
+def _store(guild_id, settings, version):
+    _settings_cache[str(guild_id)] = {
+        "settings": settings,
+        "view": None,  # peek_settings() 때 만듦 (알림 하나만 바꿔도 설정 전체를 다시 얼리지 않도록)
+        "version": version,  # JSON: 파일 mtime / SQLite: version 컬럼
+        "checked_at": time.monotonic()
+    }
+
+def _get_entry(guild_id):
+    """캐시 항목 반환. 일정 주기마다 저장소 버전(mtime)을 비교해 외부 수정분을 반영"""
+    guild_id = str(guild_id)
+    entry = _settings_cache.get(guild_id)
+    if entry is not None:
+        now = time.monotonic()
+        if now - entry["checked_at"] < MTIME_CHECK_INTERVAL:
+            _cache_stats["hits"] += 1
+            return entry
+        entry["checked_at"] = now
+        if guild_id in _dirty_settings or _get_version(guild_id) == entry["version"]:
+            _cache_stats["hits"] += 1
+            return entry
+        _cache_stats["invalidations"] += 1
+
+    _cache_stats["misses"] += 1
+    dirty = _dirty_settings.get(guild_id)
+    if dirty is not None:  # 캐시에서 빠졌어도 아직 저장 안 된 값이 디스크 값보다 새것
+        _store(guild_id, dirty, None)
+        return _settings_cache[guild_id]
+    settings, version = _read_settings(guild_id)
+    if settings is None:
+        settings = default_settings()
+    _store(guild_id, settings, version)
+    return _settings_cache[guild_id]
+
+def load_settings(guild_id):
+    """서버별 설정 불러오기 (캐시된 설정의 복사본을 반환하므로 자유롭게 수정 가능)"""
+    return copy.deepcopy(_get_entry(guild_id)["settings"])
+
+def peek_settings(guild_id):
+    """서버별 설정을 읽기 전용 뷰로 반환 (복사 없음, on_message 같은 조회 전용 경로용)"""
+    entry = _get_entry(guild_id)
+    if entry["view"] is None:
+        entry["view"] = _freeze(entry["settings"])
+    return entry["view"]
+
+def save_settings(guild_id, settings):
+    """서버별 설정 저장 (캐시도 함께 갱신)"""
+    _save_snapshot(str(guild_id), _normalize_reminders(copy.deepcopy(settings)))
+
+def _save_snapshot(guild_id, snapshot):
+    """snapshot을 그대로 캐시에 넣고 저장 (이후 snapshot은 수정하면 안 됨)"""
+    with _write_lock:
+        version = _write_settings(guild_id, snapshot)
+        with _dirty_lock:
+            _dirty_settings.pop(guild_id, None)
+            _store(guild_id, snapshot, version)
+
+def mark_settings_dirty(guild_id, settings):
+    """설정을 캐시에만 반영하고 저장은 flush_dirty_settings()에 맡김 (자주 바뀌는 카운터용)"""
+    _mark_snapshot_dirty(str(guild_id), _normalize_reminders(copy.deepcopy(settings)))
+
+def _mark_snapshot_dirty(guild_id, snapshot):
+    with _dirty_lock:
+        entry = _settings_cache.get(guild_id)
+        _store(guild_id, snapshot, entry["version"] if entry else None)
+        _dirty_settings[guild_id] = snapshot
+
+def _change_reminders(guild_id, change, immediate):
+    """
+    캐시된 설정에서 알림 dict만 새로 만들어 change(reminders)를 적용하고 저장합니다. change의 반환값을 그대로 반환
+    설정 전체를 깊은 복사하지 않으며, 저장 중일 수 있는 기존 스냅샷은 건드리지 않습니다. (바뀌지 않은 부분은 공유)
+    """
+    guild_id = str(guild_id)
+    snapshot = dict(_get_entry(guild_id)["settings"])
+    reminders = snapshot["reminders"] = dict(snapshot.get("reminders", {}))
+    result = change(reminders)
+    if immediate:
+        _save_snapshot(guild_id, snapshot)
+    else:
+        _mark_snapshot_dirty(guild_id, snapshot)
+    return result
+
+def put_reminder(guild_id, reminder, immediate=False):
+    """알림 하나를 ID로 추가하거나 갱신합니다. (immediate가 아니면 지연 저장)"""
+    stored = copy.deepcopy(reminder)
+    _change_reminders(guild_id, lambda reminders: reminders.__setitem__(stored["id"], stored), immediate)
+
+def pop_reminder(guild_id, reminder_id, immediate=False):
+    """알림 하나를 ID로 지우고 지운 알림을 반환 (없으면 None, 저장하지 않음)"""
+    if reminder_id not in _get_entry(guild_id)["settings"].get("reminders", {}):
+        return None
+    return _change_reminders(guild_id, lambda reminders: reminders.pop(reminder_id), immediate)
+
+def flush_dirty_settings():
+    """
+    대기 중인 설정을 서버당 한 번씩 저장하고 저장한 서버 수를 반환 (이벤트 루프 밖 스레드에서 호출)
+    저장이 끝난 항목만 대기열에서 빼므로, 저장 전이나 실패한 설정은 계속 dirty로 남아 다시 읽기에 덮이지 않음
+    """
+    with _dirty_lock:
+        pending = list(_dirty_settings.items())
+
+    written, error = 0, None
+    for guild_id, snapshot in pending:
+        with _write_lock:
+            if _dirty_settings.get(guild_id) is not snapshot:
+                continue  # 그 사이 save_settings/mark_settings_dirty로 더 새로운 값이 들어옴
+            try:
+                version = _write_settings(guild_id, snapshot)
+            except Exception as e:
+                error = error or e  # 대기열에 그대로 두고 다음 주기에 다시 시도
+                continue
+            with _dirty_lock:
+                if _dirty_settings.get(guild_id) is snapshot:
+                    del _dirty_settings[guild_id]
+                entry = _settings_cache.get(guild_id)
+                if entry is not None and entry["settings"] is snapshot:
+                    entry["version"] = version
+            written += 1
+    if error:
+        raise error
+    return written
+
+def pending_settings_count():
+    """아직 저장되지 않은 서버 설정 수"""
+    return len(_dirty_settings)
+
+def invalidate_settings(guild_id=None):
+    """캐시 무효화 (guild_id가 없으면 전체)"""
+    if guild_id is None:
+        _settings_cache.clear()
+    else:
+        _settings_cache.pop(str(guild_id), None)
+    _cache_stats["invalidations"] += 1
+
+def get_cache_stats():
+    """캐시 적중/미스 통계 반환"""
+    total = _cache_stats["hits"] + _cache_stats["misses"]
+    return {
+        **_cache_stats,
+        "size": len(_settings_cache),
+        "hit_rate": _cache_stats["hits"] / total if total else 0.0
+    }
+
+def load_due_reminders(until):
+    """
+    시각(time)이 until('%Y-%m-%d %H:%M:%S') 이전인 모든 서버의 알림 목록
+    SQLite는 due_time 인덱스를 사용합니다. JSON은 서버별 가장 이른 알림 시각 인덱스로 해당 서버의 설정 파일만 읽습니다.
+    (알림 수가 늘어도 메모리·재시작 비용이 거의 그대로인 것은 SQLite 쪽이며, JSON은 서버 수만큼의 작은 인덱스를 둠)
+    """
+    if _backend == "sqlite":
+        with _db_lock:
+            rows = _db.execute("SELECT data FROM reminders WHERE due_time < ? ORDER BY due_time", (until,)).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    if _due_index is None:
+        _load_due_index()
+    with _due_index_lock:
+        guild_ids = [guild_id for guild_id, (_, earliest) in _due_index.items() if earliest is not None and earliest < until]
+    due = []
+    for guild_id in guild_ids:
+        settings, _ = _read_settings(guild_id)  # 파일에서 새로 읽으므로 복사할 필요 없음
+        if settings is not None:
+            due.extend(r for r in settings["reminders"].values() if r.get("time", "") < until)
+    _save_due_index()
+    return due
+
+def migrate_json_to_sqlite(settings_dir=SETTINGS_DIR, db_path=SQLITE_PATH):
+    """서버별 JSON 설정 파일을 SQLite DB로 한 번에 옮기고 옮긴 서버 수를 반환"""
+    db = open_database(db_path)
+    migrated = 0
+    try:
+        for file_name in sorted(os.listdir(settings_dir)):
+            if not file_name.endswith(".json"):
+                continue
+            guild_id = file_name[:-len(".json")]
+            with open(os.path.join(settings_dir, file_name), "r", encoding="utf-8") as f:
+                settings = _normalize_reminders(json.load(f))
+            _db_write(db, guild_id, settings)
+            migrated += 1
+    finally:
+        db.close()
+    return migrated
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="서버 설정 저장소 관리 도구")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    migrate_parser = subparsers.add_parser("migrate", help="JSON 설정 파일을 SQLite DB로 옮기기")
+    migrate_parser.add_argument("--settings-dir", default=SETTINGS_DIR)
+    migrate_parser.add_argument("--db", default=SQLITE_PATH)
+    args = parser.parse_args()
+
+    if args.command == "migrate":
+        count = migrate_json_to_sqlite(args.settings_dir, args.db)
+        print(f"✅ {count}개 서버의 설정을 {args.db} 로 옮겼어요!")
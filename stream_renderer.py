@@ -0,0 +1,125 @@
+import asyncio
+import contextlib
+import logging
+import time
+
+log = logging.getLogger('RubyBot')
+
+# 🔹 스트리밍 답변 표시: 받은 만큼 메시지를 고쳐 쓰고, 2000자를 넘으면 다음 메시지로 이어서 씀
+MESSAGE_LIMIT = 2000
+
+def split_message(text, limit=MESSAGE_LIMIT):
+    """text를 limit자 이하 조각으로 나눕니다. 가능하면 줄바꿈/공백에서 자르며, 이미 꽉 찬 조각의 경계는 글이 늘어나도 바뀌지 않습니다."""
+    chunks = []
+    while len(text) > limit:
+        window = text[:limit]
+        cut = window.rfind("\n")
+        if cut < limit // 2:
+            cut = window.rfind(" ")
+        if cut < limit // 2:
+            cut = limit
+        chunks.append(text[:cut])
+        text = text[cut:].lstrip("\n")
+    if text:
+        chunks.append(text)
+    return chunks
+
+class StreamRenderer:
+    """
+    스트리밍으로 받은 답변을 interval초에 한 번씩만 메시지에 반영합니다. (디스코드 수정 속도 제한 대비)
+    첫 조각은 원래 응답(edit_original), 2000자를 넘는 부분은 후속 메시지(send_followup)로 보냅니다.
+    feed()는 글자만 쌓고, 메시지 수정은 start()로 띄운 별도 작업이 합니다.
+    (디스코드 수정 대기가 Gemini 호출 자리·마감 시간을 잡아먹지 않도록)
+    사용법: start() → feed()... → stop() → finish(최종 답변)
+    first_visible: 요청 시작부터 첫 글자가 보이기까지 걸린 시간(초)
+    """
+
+    def __init__(self, edit_original, send_followup, interval=1.0, started=None):
+        self._edit_original = edit_original  # async (content, embed=None)
+        self._send_followup = send_followup  # async (content) -> edit()/delete()가 되는 메시지
+        self.interval = interval
+        self.started = started if started is not None else time.monotonic()
+        self.text = ""
+        self.first_visible = None
+        self.edits = 0
+        self._rendered = []  # 메시지별로 마지막으로 표시한 내용
+        self._followups = []
+        self._updated = asyncio.Event()
+        self._task = None
+        self._rendering = False
+        self._closed = False
+
+    def start(self):
+        self._task = asyncio.create_task(self._render_loop())
+
+    async def stop(self):
+        """표시 작업을 멈춤 (진행 중인 메시지 수정은 끝까지 기다리고, 다음 수정까지 쉬는 중이면 바로 취소)"""
+        self._closed = True
+        self._updated.set()
+        if self._task is None:
+            return
+        if not self._rendering:
+            self._task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._task
+        self._task = None
+
+    def feed(self, text):
+        self.text += text
+        self._updated.set()
+
+    async def _render_loop(self):
+        while not self._closed:
+            await self._updated.wait()
+            self._updated.clear()
+            if self._closed:
+                return
+            self._rendering = True
+            try:
+                await self._render()
+            except Exception as e:
+                log.warning(f"스트리밍 메시지 수정 실패: {e}")
+            finally:
+                self._rendering = False
+            if self._closed:
+                return  # 수정 중에 stop()이 불렸으면 interval만큼 더 자지 않고 바로 끝냄
+            await asyncio.sleep(self.interval)
+
+    def rewind(self, length=0):
+        """length 이후의 글을 지웁니다. (도구 호출 턴의 중간 답변, 재시도 등) 다음 표시 때 반영"""
+        self.text = self.text[:length]
+        self._updated.set()
+
+    async def finish(self, final_text=None, embed=None):
+        """최종 답변으로 마지막 표시 (첫 메시지에 embed를 붙임)"""
+        await self.stop()
+        if final_text is not None:
+            self.text = final_text
+        await self._render(embed=embed, final=True)
+
+    async def _render(self, embed=None, final=False):
+        chunks = split_message(self.text)
+        if not chunks and not final:
+            return  # 아직 보여줄 글이 없으면 진행 상황 메시지를 그대로 둠
+
+        first = chunks[0] if chunks else None
+        if final or not self._rendered or self._rendered[0] != first:
+            await self._edit_original(first, embed)
+            self.edits += 1
+        for i, chunk in enumerate(chunks[1:]):
+            if i < len(self._followups):
+                if self._rendered[i + 1] != chunk:
+                    await self._followups[i].edit(content=chunk)
+                    self.edits += 1
+            else:
+                self._followups.append(await self._send_followup(chunk))
+        for message in self._followups[max(0, len(chunks) - 1):]:
+            try:
+                await message.delete()  # 되감기로 필요 없어진 후속 메시지
+            except Exception as e:
+                log.warning(f"스트리밍 후속 메시지 삭제 실패: {e}")
+        del self._followups[max(0, len(chunks) - 1):]
+        self._rendered = chunks
+
+        if self.first_visible is None and chunks:
+            self.first_visible = time.monotonic() - self.started
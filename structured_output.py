@@ -0,0 +1,56 @@
+import json
+import re
+
+# 🔹 Gemini JSON 응답: 스키마로 형식을 고정하고, 그래도 어긋난 응답은 로컬에서 최대한 복구
+FENCE_PATTERN = re.compile(r"^```(?:json)?\s*|\s*```$")
+TRAILING_COMMA_PATTERN = re.compile(r",\s*([}\]])")
+
+class ResponseParseError(ValueError):
+    """응답을 JSON으로 해석할 수 없음 (같은 요청을 다시 보내도 소용없으므로 재시도하지 않음)"""
+
+def json_generation_config(schema):
+    """generate_content_async(generation_config=...)에 넘길 JSON 응답 설정"""
+    return {"response_mime_type": "application/json", "response_schema": schema}
+
+class JsonResponseParser:
+    """
+    JSON 응답 파서. 그대로 읽히지 않으면 코드 펜스 제거, 앞뒤 잡담 잘라내기, 끝의 쉼표 제거 순으로 복구를 시도합니다.
+    stats: parsed(바로 성공) / recovered(복구 후 성공) / failed(실패)
+    """
+
+    def __init__(self):
+        self.stats = {"parsed": 0, "recovered": 0, "failed": 0}
+
+    def parse(self, text, expected_type=dict):
+        try:
+            result = json.loads(text)
+            if isinstance(result, expected_type):
+                self.stats["parsed"] += 1
+                return result
+        except (TypeError, json.JSONDecodeError):
+            pass
+
+        result = self._recover(text or "", expected_type)
+        if result is None:
+            self.stats["failed"] += 1
+            raise ResponseParseError(f"JSON 응답을 해석하지 못했어요: {(text or '')[:100]!r}")
+        self.stats["recovered"] += 1
+        return result
+
+    def _recover(self, text, expected_type):
+        opener, closer = ("[", "]") if expected_type is list else ("{", "}")
+        cleaned = FENCE_PATTERN.sub("", text.strip())
+        start, end = cleaned.find(opener), cleaned.rfind(closer)
+        if start == -1 or end <= start:
+            return None
+        candidate = cleaned[start:end + 1]
+        for attempt in (candidate, TRAILING_COMMA_PATTERN.sub(r"\1", candidate)):
+            try:
+                result = json.loads(attempt)
+            except json.JSONDecodeError:
+                continue
+            if isinstance(result, expected_type):
+                return result
+        return None
+
+json_parser = JsonResponseParser()
@@ -0,0 +1,125 @@
+import asyncio
+
+import pytest
+
+from adaptive_limiter import AdaptiveLimiter, SlotTimeoutError, is_throttle_error
+
+class ResourceExhausted(Exception):
+    code = 429
+
+class DeadlineExceeded(Exception):
+    pass
+
+class Unavailable(Exception):
+    code = 503
+
+def test_is_throttle_error():
+    assert is_throttle_error(ResourceExhausted())
+    assert is_throttle_error(Unavailable())
+    assert is_throttle_error(DeadlineExceeded())  # 모델 호출 자체의 타임아웃
+    assert not is_throttle_error(asyncio.TimeoutError())  # 우리 쪽 마감·다른 작업의 타임아웃은 과부하가 아님
+    assert not is_throttle_error(ValueError("bad request"))
+
+def test_slot_timeout_leaves_queue_without_sample():
+    async def main():
+        limiter = AdaptiveLimiter(initial_limit=1, min_limit=1, max_limit=1)
+        async with limiter.slot():
+            with pytest.raises(SlotTimeoutError):
+                async with limiter.slot(timeout=0.01):
+                    pass
+            assert limiter.queue_depth == 0
+        return limiter
+
+    limiter = asyncio.run(main())
+    assert limiter.in_flight == 0
+    assert limiter.stats["acquired"] == 1
+    assert limiter.stats["throttled"] == limiter.stats["errors"] == 0
+
+def test_throttle_halves_limit_once_per_cooldown():
+    async def main():
+        limiter = AdaptiveLimiter(initial_limit=16, min_limit=2, cooldown=60)
+        for _ in range(3):
+            with pytest.raises(ResourceExhausted):
+                async with limiter.slot():
+                    raise ResourceExhausted()
+        return limiter
+
+    limiter = asyncio.run(main())
+    assert limiter.limit == 8
+    assert limiter.stats["throttled"] == 3
+    assert limiter.in_flight == 0
+
+def test_healthy_calls_raise_limit():
+    async def main():
+        limiter = AdaptiveLimiter(initial_limit=4, max_limit=10)
+        for _ in range(20):
+            async with limiter.slot():
+                pass
+        return limiter
+
+    assert asyncio.run(main()).limit > 4
+
+def test_cancelled_call_is_not_recorded():
+    async def main():
+        limiter = AdaptiveLimiter(initial_limit=4)
+        started = asyncio.Event()
+
+        async def call():
+            async with limiter.slot("interactive"):
+                started.set()
+                await asyncio.sleep(10)
+
+        task = asyncio.create_task(call())
+        await started.wait()
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        return limiter
+
+    limiter = asyncio.run(main())
+    assert limiter.limit == 4
+    assert limiter.in_flight == 0
+    assert limiter.get_stats()["baseline_latency"] == {}
+
+def test_skip_sample_releases_without_recording():
+    async def main():
+        limiter = AdaptiveLimiter(initial_limit=4)
+        with pytest.raises(RuntimeError):
+            async with limiter.slot() as lease:
+                lease.skip_sample()
+                raise RuntimeError("not called")
+        return limiter
+
+    limiter = asyncio.run(main())
+    assert limiter.stats["errors"] == 0
+    assert limiter.in_flight == 0
+
+def test_baseline_is_tracked_per_priority():
+    async def main():
+        limiter = AdaptiveLimiter(initial_limit=4)
+        async with limiter.slot("background"):
+            pass
+        async with limiter.slot("interactive"):
+            await asyncio.sleep(0.05)
+        return limiter
+
+    baselines = asyncio.run(main()).get_stats()["baseline_latency"]
+    assert set(baselines) == {"background", "interactive"}
+    assert baselines["interactive"] > baselines["background"]
+
+def test_waiters_get_slot_when_released():
+    async def main():
+        limiter = AdaptiveLimiter(initial_limit=1, min_limit=1, max_limit=1)
+        order = []
+
+        async def call(name):
+            async with limiter.slot():
+                order.append(name)
+                await asyncio.sleep(0.01)
+
+        await asyncio.gather(*(call(i) for i in range(3)))
+        return limiter, order
+
+    limiter, order = asyncio.run(main())
+    assert order == [0, 1, 2]
+    assert limiter.stats["max_queue"] == 2
@@ -0,0 +1,35 @@
+import asyncio
+import gc
+import logging
+
+import background_tasks
+
+def test_spawned_task_survives_gc_and_is_released():
+    async def main():
+        done = asyncio.Event()
+
+        async def work():
+            await asyncio.sleep(0.01)
+            done.set()
+
+        background_tasks.spawn(work())
+        gc.collect()
+        assert background_tasks.running_count() == 1
+        await asyncio.wait_for(done.wait(), 1)
+        await asyncio.sleep(0)
+        return background_tasks.running_count()
+
+    assert asyncio.run(main()) == 0
+
+def test_exception_is_logged(caplog):
+    async def fail():
+        raise RuntimeError("boom")
+
+    async def main():
+        task = background_tasks.spawn(fail())
+        await asyncio.sleep(0.01)
+        return task
+
+    with caplog.at_level(logging.ERROR, logger="RubyBot"):
+        asyncio.run(main())
+    assert "RuntimeError: boom" in caplog.text
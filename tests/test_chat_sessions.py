@@ -0,0 +1,90 @@
+from types import SimpleNamespace
+
+from chat_sessions import ChatSessionManager, summarize_evidence
+
+class FakeSession:
+    def __init__(self):
+        self.history = []
+
+def text(role, content):
+    return SimpleNamespace(role=role, parts=[SimpleNamespace(text=content)])
+
+def tool(role, payload):
+    return SimpleNamespace(role=role, parts=[SimpleNamespace(text="", payload=payload)])
+
+def turn(question, answer, evidence=None):
+    messages = [text("user", question)]
+    if evidence is not None:
+        messages += [tool("model", "function_call google_search"), tool("user", evidence)]
+    return messages + [text("model", answer)]
+
+def test_lru_eviction_and_reset():
+    sessions = ChatSessionManager(FakeSession, max_sessions=2)
+    first = sessions.get(1)
+    sessions.get(2)
+    assert sessions.get(1) is first  # 1을 최근에 씀
+    sessions.get(3)
+    assert 2 not in sessions and 1 in sessions
+    assert sessions.stats["lru_evictions"] == 1
+    assert sessions.reset(1)
+    assert not sessions.reset(1)
+
+def test_idle_eviction(monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr("chat_sessions.time.monotonic", lambda: now[0])
+    sessions = ChatSessionManager(FakeSession, idle_ttl=60)
+    sessions.get(1)
+    now[0] = 30.0
+    sessions.get(2)
+    now[0] = 70.0
+    assert sessions.evict_idle() == 1
+    assert 1 not in sessions and 2 in sessions
+
+def test_trim_drops_whole_turns_from_the_front():
+    sessions = ChatSessionManager(FakeSession, token_budget=300)  # 턴 하나가 약 110토큰
+    session = sessions.get(1)
+    for i in range(5):
+        session.history += turn(f"q{i}" * 50, f"a{i}" * 50, evidence="e" * 200)
+    dropped = sessions.trim(1)
+    assert dropped == 12
+    assert [message.role for message in session.history] == ["user", "model", "user", "model"] * 2  # 도구 호출·응답도 그대로
+    assert session.history[0].parts[0].text.startswith("q3")
+
+def test_single_oversized_turn_is_condensed_not_split():
+    sessions = ChatSessionManager(FakeSession, token_budget=100)
+    session = sessions.get(1)
+    session.history += turn("short question", "short answer")
+    session.history += turn("question", "answer", evidence="scraped " * 500)
+    sessions.trim(1)
+    assert [message.parts[0].text for message in session.history] == ["question", "answer"]
+
+def test_trim_under_budget_is_noop():
+    sessions = ChatSessionManager(FakeSession, token_budget=1000)
+    session = sessions.get(1)
+    session.history += turn("q", "a")
+    assert sessions.trim(1) == 0
+    assert len(session.history) == 2
+    assert sessions.get_stats()["history_chars"] == 2
+
+def test_compact_turn_keeps_question_summary_and_answer():
+    sessions = ChatSessionManager(FakeSession)
+    session = sessions.get(1)
+    session.history += turn("old", "old answer")
+    session.history += turn("prompt with pages " * 100, "final answer", evidence="raw " * 300)
+    saved = sessions.compact_turn(1, 2, "[질문] new")
+    assert [message.parts[0].text for message in session.history] == ["old", "old answer", "[질문] new", "final answer"]
+    assert saved > 0
+    assert sessions.get_stats()["history_chars"] == len("oldold answer[질문] newfinal answer")
+
+def test_compact_turn_ignores_incomplete_turn():
+    sessions = ChatSessionManager(FakeSession)
+    session = sessions.get(1)
+    session.history += [text("user", "q")]
+    assert sessions.compact_turn(1, 0, "summary") == 0
+    assert session.history[0].parts[0].text == "q"
+
+def test_summarize_evidence():
+    evidence = "--- [출처: https://a.example] ---\n" + "가 " * 200 + "\n\n--- [출처: https://b.example] ---\n짧은 글"
+    summary = summarize_evidence(evidence, excerpt_chars=10).splitlines()
+    assert summary == ["- https://a.example: 가 가 가 가 가 …", "- https://b.example: 짧은 글"]
+    assert summarize_evidence("관련 정보를 찾을 수 없었습니다.") == "- 관련 정보를 찾을 수 없었습니다."
@@ -0,0 +1,27 @@
+from lang_detect import detect_language
+
+def test_script_based_languages():
+    assert detect_language("오늘 저녁에 같이 할 사람?")[0] == "ko"
+    assert detect_language("今日は一緒に遊ぼう")[0] == "ja"
+    assert detect_language("Привет всем, кто играет сегодня?")[0] == "ru"
+
+def test_latin_languages_are_confident():
+    cases = {
+        "en": "is anyone online tonight",
+        "de": "kann mir jemand helfen",
+        "fr": "quelqu'un peut m'aider ce soir",
+        "es": "hola a todos, alguien quiere jugar",
+    }
+    for expected, text in cases.items():
+        lang, confidence = detect_language(text)
+        assert lang == expected
+        assert confidence >= 0.9
+
+def test_unsupported_latin_language_is_not_confident():
+    # 네덜란드어는 독일어와 비슷하지만 "이미 독일어"로 보고 번역을 건너뛰면 안 됨
+    for text in ("ik wil nu spelen", "kan iemand mij helpen met deze quest", "jag vill spela nu"):
+        assert detect_language(text)[1] < 0.9
+
+def test_mentions_and_urls_are_ignored():
+    assert detect_language("<@123456> https://example.com") == (None, 0.0)
+    assert detect_language("<:ruby:1234> hallo, kann mir jemand helfen")[0] == "de"
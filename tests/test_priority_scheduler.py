@@ -0,0 +1,83 @@
+import asyncio
+from collections import Counter
+
+from priority_scheduler import WeightedPriorityQueue
+
+class FakeFuture:
+    def __init__(self, name, done=False):
+        self.name = name
+        self._done = done
+
+    def done(self):
+        return self._done
+
+def drain(queue, count):
+    return [queue.pop().name for _ in range(count)]
+
+def test_dispatch_follows_weights():
+    queue = WeightedPriorityQueue({"interactive": 6, "background": 1})
+    for _ in range(70):
+        queue.push(FakeFuture("interactive"), "interactive")
+        queue.push(FakeFuture("background"), "background")
+    counts = Counter(drain(queue, 70))
+    assert counts == {"interactive": 60, "background": 10}
+
+def test_unknown_priority_uses_lowest_class():
+    queue = WeightedPriorityQueue({"interactive": 6, "background": 1})
+    queue.push(FakeFuture("x"), "nonexistent")
+    assert queue.depth("background") == 1
+
+def test_done_futures_are_skipped():
+    queue = WeightedPriorityQueue()
+    queue.push(FakeFuture("cancelled", done=True), "interactive")
+    queue.push(FakeFuture("live"), "background")
+    assert queue.pop().name == "live"
+    assert queue.pop() is None
+
+def test_remove():
+    queue = WeightedPriorityQueue()
+    future = FakeFuture("a")
+    queue.push(future, "manual")
+    queue.remove(future)
+    assert len(queue) == 0
+
+def test_aging_promotes_instead_of_reverting_to_fifo(monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr("priority_scheduler.time.monotonic", lambda: now[0])
+    queue = WeightedPriorityQueue({"interactive": 6, "background": 1}, max_wait=10)
+    for _ in range(100):
+        queue.push(FakeFuture("background"), "background")
+    now[0] = 20.0  # 자동 번역이 모두 max_wait를 넘김
+    for _ in range(100):
+        queue.push(FakeFuture("interactive"), "interactive")
+    counts = Counter(drain(queue, 20))
+    # 오래 기다린 클래스는 가장 높은 가중치로 올라가 자리를 나눠 갖지만, 대화 요청도 절반은 받음
+    assert counts["interactive"] == 10
+    assert counts["background"] == 10
+    assert queue.get_stats()["background"]["aged"] == 10
+
+def test_wait_percentiles(monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr("priority_scheduler.time.monotonic", lambda: now[0])
+    queue = WeightedPriorityQueue()
+    for _ in range(4):
+        queue.push(FakeFuture("interactive"), "interactive")
+    now[0] = 2.0
+    drain(queue, 4)
+    queue.record_immediate("interactive")
+    stats = queue.get_stats()["interactive"]
+    assert stats["dispatched"] == 5
+    assert stats["p50_wait"] == 2.0
+    assert stats["max_wait"] == 2.0
+
+def test_with_real_futures():
+    async def main():
+        loop = asyncio.get_running_loop()
+        queue = WeightedPriorityQueue()
+        futures = [loop.create_future() for _ in range(3)]
+        for future in futures:
+            queue.push(future, "background")
+        futures[0].cancel()
+        return queue.pop() is futures[1]
+
+    assert asyncio.run(main())
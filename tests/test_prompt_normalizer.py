@@ -0,0 +1,35 @@
+from prompt_normalizer import PromptNormalizer
+
+ORIGINAL = "<@123> 이거 봐 https://example.com/a?b=1 <:smile:456> `code`"
+
+def test_protect_replaces_urls_emoji_mentions_and_code():
+    normalizer = PromptNormalizer()
+    protected, spans = normalizer.protect(ORIGINAL)
+    assert protected == "⟦0⟧ 이거 봐 ⟦1⟧ ⟦2⟧ ⟦3⟧"
+    assert spans == ["<@123>", "https://example.com/a?b=1", "<:smile:456>", "`code`"]
+    stats = normalizer.get_stats()
+    assert stats["protected_messages"] == stats["messages"] == 1
+    assert stats["tokens_after"] < stats["tokens_before"]
+
+def test_restore_round_trip_and_reordered_placeholders():
+    normalizer = PromptNormalizer()
+    _, spans = normalizer.protect(ORIGINAL)
+    assert normalizer.restore("⟦0⟧ look ⟦1⟧ ⟦2⟧ ⟦3⟧", spans, ORIGINAL) == "<@123> look https://example.com/a?b=1 <:smile:456> `code`"
+    # 어순이 바뀌거나 모델이 공백을 넣어도 번호로 되돌림
+    assert normalizer.restore("⟦3⟧ ⟦ 2 ⟧ see ⟦1⟧, ⟦0⟧", spans, ORIGINAL) == "`code` <:smile:456> see https://example.com/a?b=1, <@123>"
+    assert normalizer.stats["restore_fallbacks"] == 0
+
+def test_missing_or_unknown_placeholder_falls_back_to_original():
+    normalizer = PromptNormalizer()
+    _, spans = normalizer.protect(ORIGINAL)
+    assert normalizer.restore("⟦0⟧ look ⟦1⟧ ⟦3⟧", spans, ORIGINAL) == ORIGINAL  # ⟦2⟧ 유실
+    assert normalizer.restore("⟦0⟧ look ⟦1⟧ ⟦2⟧ ⟦3⟧ ⟦4⟧", spans, ORIGINAL) == ORIGINAL  # 없는 번호
+    assert normalizer.stats["restore_fallbacks"] == 2
+
+def test_text_without_spans_is_left_alone():
+    normalizer = PromptNormalizer()
+    assert normalizer.protect("그냥 문장") == ("그냥 문장", [])
+    assert normalizer.restore("just a sentence", [], "그냥 문장") == "just a sentence"
+    # 원문에 이미 자리표시자 모양이 있으면 보호하지 않고 그대로 보냄
+    assert normalizer.protect("⟦0⟧ <@123>") == ("⟦0⟧ <@123>", [])
+    assert normalizer.get_stats()["protected_messages"] == 0
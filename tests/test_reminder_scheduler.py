@@ -0,0 +1,133 @@
+import asyncio
+import time
+
+from reminder_scheduler import ReminderDelivery, ReminderScheduler
+
+def make_scheduler():
+    fired = []
+
+    async def fire(reminder_id, payload, due_ts):
+        fired.append((reminder_id, payload))
+
+    return ReminderScheduler(fire), fired
+
+def test_fires_in_due_order():
+    async def main():
+        scheduler, fired = make_scheduler()
+        now = time.time()
+        scheduler.schedule("c", now + 0.06, "셋")
+        scheduler.schedule("a", now + 0.02, "하나")
+        scheduler.schedule("b", now + 0.04, "둘")
+        assert scheduler.next_due() == now + 0.02
+        await asyncio.sleep(0.12)
+        return scheduler, fired
+
+    scheduler, fired = asyncio.run(main())
+    assert fired == [("a", "하나"), ("b", "둘"), ("c", "셋")]
+    assert len(scheduler) == 0
+    assert scheduler.stats["fired"] == 3
+
+def test_cancel_and_replace_skip_stale_heap_entries():
+    async def main():
+        scheduler, fired = make_scheduler()
+        now = time.time()
+        scheduler.schedule("a", now + 0.02, "취소됨")
+        scheduler.schedule("b", now + 0.03, "옛 시각")
+        scheduler.schedule("b", now + 0.05, "새 시각")  # 같은 ID는 교체
+        assert scheduler.cancel("a")
+        assert not scheduler.cancel("a")
+        assert "a" not in scheduler and "b" in scheduler
+        assert scheduler.next_due() == now + 0.05  # 취소·교체된 머리는 꺼낼 때 버려짐
+        await asyncio.sleep(0.1)
+        return scheduler, fired
+
+    scheduler, fired = asyncio.run(main())
+    assert fired == [("b", "새 시각")]
+    assert scheduler.stats["cancelled"] == 1
+    assert scheduler._heap == []
+
+def test_single_timer_is_rearmed_for_earlier_reminder():
+    async def main():
+        scheduler, fired = make_scheduler()
+        now = time.time()
+        scheduler.schedule("late", now + 30, None)
+        late_timer = scheduler._timer
+        scheduler.schedule("later", now + 60, None)
+        assert scheduler._timer is late_timer  # 더 늦은 알림은 타이머를 건드리지 않음
+
+        scheduler.schedule("soon", now + 0.02, None)
+        assert scheduler._timer is not late_timer and late_timer.cancelled()
+        assert scheduler._timer_due == now + 0.02
+        await asyncio.sleep(0.06)
+        assert fired == [("soon", None)]
+        assert scheduler._timer_due == now + 30  # 울린 뒤 다음 알림에 다시 걸림
+
+        scheduler.cancel("late")
+        scheduler.cancel("later")
+        assert scheduler._timer is None
+        return scheduler
+
+    scheduler = asyncio.run(main())
+    assert scheduler.get_stats()["pending"] == 0
+
+def test_past_due_reminders_fire_immediately_with_lag_stats():
+    async def main():
+        scheduler, fired = make_scheduler()
+        now = time.time()
+        scheduler.schedule("missed", now - 2, "밀린 알림")
+        scheduler.schedule("missed2", now - 1, "밀린 알림2")
+        await asyncio.sleep(0.01)
+        return scheduler, fired
+
+    scheduler, fired = asyncio.run(main())
+    assert fired == [("missed", "밀린 알림"), ("missed2", "밀린 알림2")]
+    stats = scheduler.get_stats()
+    assert 2 <= stats["max_lag"] < 3
+    assert 1 <= stats["last_lag"] < 2
+    assert 1.5 <= stats["avg_lag"] < 2.5
+    assert stats["pending"] == 0
+
+class FakeChannel:
+    def __init__(self, channel_id):
+        self.id = channel_id
+        self.sent = []
+
+    async def send(self, content):
+        self.sent.append(content)
+
+def test_delivery_coalesces_within_window():
+    async def main():
+        delivery = ReminderDelivery(window=0.05)
+        first, second = FakeChannel(1), FakeChannel(2)
+        delivery.enqueue(first, "알림 1")
+        await asyncio.sleep(0.02)
+        delivery.enqueue(first, "알림 2")  # 창 안: 같은 메시지로
+        delivery.enqueue(second, "다른 채널")
+        await asyncio.sleep(0.02)
+        assert first.sent == []  # 창이 끝나기 전에는 보내지 않음
+        await asyncio.sleep(0.03)
+        assert first.sent == ["알림 1\n알림 2"]
+        delivery.enqueue(first, "알림 3")  # 창이 지난 뒤에는 새 묶음
+        await asyncio.sleep(0.08)
+        return delivery, first, second
+
+    delivery, first, second = asyncio.run(main())
+    assert first.sent == ["알림 1\n알림 2", "알림 3"]
+    assert second.sent == ["다른 채널"]
+    assert delivery.stats == {"reminders": 4, "sends": 3, "saved_sends": 1}
+
+def test_pack_respects_message_limit():
+    delivery = ReminderDelivery()
+    line = "가" * 999
+    assert delivery._pack([line, line]) == [f"{line}\n{line}"]  # 999 + 1 + 999 = 1999
+    exact = "나" * 1000
+    assert delivery._pack([exact, "다" * 999]) == [f"{exact}\n{'다' * 999}"]  # 정확히 2000자
+    assert delivery._pack([exact, exact]) == [exact, exact]  # 2001자가 되면 나눔
+
+def test_pack_splits_single_long_message():
+    delivery = ReminderDelivery()
+    long_line = "라" * 4500
+    chunks = delivery._pack(["앞", long_line, "뒤"])
+    assert chunks == ["앞", "라" * 2000, "라" * 2000, "라" * 500 + "\n뒤"]
+    assert all(len(chunk) <= ReminderDelivery.MAX_MESSAGE_LENGTH for chunk in chunks)
+    assert "".join(chunks).replace("\n", "") == "앞" + long_line + "뒤"  # 잘리는 글자 없음
@@ -0,0 +1,184 @@
+import asyncio
+import time
+
+import pytest
+
+from adaptive_limiter import AdaptiveLimiter
+from retry_policy import CallDeadlineError, CircuitBreaker, CircuitOpenError, RetryPolicy, is_retryable_error
+
+class ResourceExhausted(Exception):
+    code = 429
+
+class InternalServerError(Exception):
+    pass
+
+def test_is_retryable_error():
+    assert is_retryable_error(ResourceExhausted())
+    assert is_retryable_error(InternalServerError())
+    assert is_retryable_error(asyncio.TimeoutError())
+    assert is_retryable_error(ConnectionResetError())
+    assert not is_retryable_error(ValueError("invalid argument"))
+
+def test_breaker_opens_after_threshold_and_recovers(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr("retry_policy.time.monotonic", lambda: now[0])
+    breaker = CircuitBreaker(failure_threshold=2, cooldown=30)
+    breaker.record_failure()
+    assert breaker.state == "closed"
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow()
+
+    now[0] += 30
+    assert breaker.state == "half_open"
+    assert breaker.allow()
+    assert not breaker.allow()  # 시험 호출은 하나만
+    breaker.record_success()
+    assert breaker.state == "closed"
+
+def test_cancelled_trial_releases_breaker(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr("retry_policy.time.monotonic", lambda: now[0])
+    breaker = CircuitBreaker(failure_threshold=1, cooldown=30)
+    breaker.record_failure()
+    now[0] += 30
+    policy = RetryPolicy("trial", breaker=breaker)
+
+    async def main():
+        started = asyncio.Event()
+
+        async def hang():
+            started.set()
+            await asyncio.sleep(10)
+
+        task = asyncio.create_task(policy.run(hang))
+        await started.wait()
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(main())
+    assert breaker.allow()  # 취소된 시험 호출이 자리를 잡고 있지 않음
+
+def test_retries_retryable_errors_then_succeeds():
+    calls = []
+
+    @RetryPolicy("flaky", retries=3, base_backoff=0.001)
+    async def flaky():
+        calls.append(1)
+        if len(calls) < 3:
+            raise ResourceExhausted()
+        return "ok"
+
+    assert asyncio.run(flaky()) == "ok"
+    assert flaky.retry_policy.stats["retries"] == 2
+
+def test_fatal_error_is_not_retried_and_uses_fallback():
+    calls = []
+
+    @RetryPolicy("fatal", retries=3, base_backoff=0.001, fallback=lambda e, x: f"fallback {x}")
+    async def fatal(x):
+        calls.append(x)
+        raise ValueError("invalid argument")
+
+    assert asyncio.run(fatal(1)) == "fallback 1"
+    assert calls == [1]
+    assert fatal.retry_policy.stats["fatal"] == 1
+
+def test_open_breaker_short_circuits():
+    breaker = CircuitBreaker(failure_threshold=1, cooldown=30)
+    breaker.record_failure()
+    policy = RetryPolicy("blocked", breaker=breaker)
+
+    async def call():
+        return "called"
+
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(policy.run(call))
+    assert policy.stats["short_circuited"] == 1
+
+def test_deadline_bounds_queue_wait_without_penalising_the_api():
+    """대기열에서 마감이 지난 호출은 CallDeadlineError로 끝나고, API가 정상이면 과부하·브레이커 실패로 기록되지 않음"""
+    limiter = AdaptiveLimiter(initial_limit=5, min_limit=2, max_limit=5)
+    breaker = CircuitBreaker(failure_threshold=5)
+    policy = RetryPolicy("burst", deadline=0.3, limiter=limiter, breaker=breaker)
+
+    async def healthy_api():
+        await asyncio.sleep(0.05)
+        return "ok"
+
+    async def main():
+        started = time.monotonic()
+        results = await asyncio.gather(*(policy.run(healthy_api) for _ in range(60)), return_exceptions=True)
+        return results, time.monotonic() - started
+
+    results, elapsed = asyncio.run(main())
+    assert elapsed < 0.5  # 60개를 다 기다리면 0.6초 이상 걸림
+    assert "ok" in results
+    assert all(r == "ok" or isinstance(r, CallDeadlineError) for r in results)
+    assert policy.stats["deadline_exceeded"] == sum(isinstance(r, CallDeadlineError) for r in results)
+    assert limiter.stats["throttled"] == limiter.stats["errors"] == 0
+    assert limiter.limit == 5
+    assert limiter.in_flight == limiter.queue_depth == 0
+    assert breaker.state == "closed" and breaker._failures == 0
+
+def test_deadline_hit_during_slow_work_is_not_a_throttle_signal():
+    """슬롯 안에서 검색 등 다른 작업이 느려 마감이 지나도 리미터 한도를 줄이지 않음"""
+    limiter = AdaptiveLimiter(initial_limit=4, min_limit=1, max_limit=4)
+    breaker = CircuitBreaker(failure_threshold=1)
+    policy = RetryPolicy("chat", deadline=0.05, limiter=limiter, breaker=breaker)
+
+    async def slow_search_then_model():
+        await asyncio.sleep(1)
+
+    with pytest.raises(CallDeadlineError):
+        asyncio.run(policy.run(slow_search_then_model))
+    assert limiter.limit == 4
+    assert limiter.stats["throttled"] == limiter.stats["errors"] == 0
+    assert limiter.get_stats()["baseline_latency"] == {}  # 끊긴 호출은 지연 표본에도 넣지 않음
+    assert breaker.state == "closed"
+
+def test_model_timeout_is_still_a_throttle_signal():
+    class DeadlineExceeded(Exception):
+        pass
+
+    limiter = AdaptiveLimiter(initial_limit=4, min_limit=1, max_limit=4)
+    policy = RetryPolicy("model", retries=1, deadline=5, limiter=limiter)
+
+    async def model_timeout():
+        raise DeadlineExceeded()
+
+    with pytest.raises(DeadlineExceeded):
+        asyncio.run(policy.run(model_timeout))
+    assert limiter.stats["throttled"] == 1
+    assert limiter.limit == 2
+
+def test_exhausted_deadline_skips_call_without_penalty():
+    """재시도 차례가 왔을 때 이미 마감이 지났으면 API를 부르지 않고 CallDeadlineError"""
+    limiter = AdaptiveLimiter(initial_limit=1, min_limit=1, max_limit=1)
+    breaker = CircuitBreaker(failure_threshold=5)
+    policy = RetryPolicy("late", retries=3, base_backoff=0.001, max_backoff=0.001, deadline=0.1, limiter=limiter, breaker=breaker)
+    calls = []
+
+    async def throttled_once():
+        calls.append(1)
+        raise ResourceExhausted()
+
+    async def hog():
+        async with limiter.slot():
+            await asyncio.sleep(0.3)
+
+    async def main():
+        retry = asyncio.create_task(policy.run(throttled_once))
+        await asyncio.sleep(0)  # 첫 시도가 자리를 받고 429로 실패한 뒤
+        hogger = asyncio.create_task(hog())  # 다른 호출이 자리를 오래 차지
+        with pytest.raises(CallDeadlineError):
+            await retry
+        await hogger
+
+    asyncio.run(main())
+    assert calls == [1]
+    assert policy.stats["deadline_exceeded"] == 1
+    assert limiter.stats["throttled"] == 1  # 실제 429만 기록
+    assert limiter.stats["errors"] == 0
+    assert limiter.in_flight == 0
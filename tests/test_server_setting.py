@@ -0,0 +1,276 @@
+import importlib
+import json
+import os
+
+import pytest
+
+@pytest.fixture
+def ss(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # 모듈이 import 때 만드는 bot_setting 폴더가 저장소에 생기지 않도록
+    module = importlib.import_module("server_setting")
+    settings_dir = tmp_path / "server_settings"
+    settings_dir.mkdir()
+    monkeypatch.setattr(module, "SETTINGS_DIR", str(settings_dir))
+    module.configure_backend("json")
+    module._cache_stats.update(hits=0, misses=0, invalidations=0)
+    yield module
+    module._dirty_settings.clear()
+    module.configure_backend("json")
+
+def reminder(guild_id, reminder_id, time):
+    return {"id": reminder_id, "guild_id": guild_id, "user_id": 1, "channel_id": 2, "frequency": "한번",
+            "time": time, "message": reminder_id}
+
+def keyed(*reminders):
+    return {r["id"]: r for r in reminders}
+
+def test_due_reminders_follow_saves_without_rescanning(ss, monkeypatch):
+    settings = ss.load_settings("1")
+    settings["reminders"] = keyed(reminder("1", "a", "2026-01-01 10:00:00"), reminder("1", "b", "2026-01-02 10:00:00"))
+    ss.save_settings("1", settings)
+    assert [r["id"] for r in ss.load_due_reminders("2026-01-01 12:00:00")] == ["a"]
+
+    def no_listdir(path):
+        raise AssertionError("알림 인덱스가 있으면 파일 목록을 다시 훑지 않아야 함")
+
+    monkeypatch.setattr(ss.os, "listdir", no_listdir)
+    settings = ss.load_settings("1")
+    del settings["reminders"]["a"]
+    ss.mark_settings_dirty("1", settings)
+    assert [r["id"] for r in ss.load_due_reminders("2026-01-01 12:00:00")] == ["a"]  # 아직 저장 전
+    ss.flush_dirty_settings()
+    assert ss.load_due_reminders("2026-01-01 12:00:00") == []
+    assert [r["id"] for r in ss.load_due_reminders("2026-01-03 00:00:00")] == ["b"]
+
+def test_due_reminders_are_copies(ss):
+    settings = ss.load_settings("1")
+    settings["reminders"] = keyed(reminder("1", "a", "2026-01-01 10:00:00"))
+    ss.save_settings("1", settings)
+    ss.load_due_reminders("2026-01-02 00:00:00")[0]["time"] = "2026-01-05 10:00:00"
+    assert ss.load_settings("1")["reminders"]["a"]["time"] == "2026-01-01 10:00:00"
+
+def test_sqlite_backend_due_reminders(ss, tmp_path):
+    ss.configure_backend("sqlite", str(tmp_path / "settings.db"))
+    settings = ss.load_settings("7")
+    settings["reminders"] = keyed(reminder("7", "x", "2026-01-01 10:00:00"), reminder("7", "y", "2026-03-01 10:00:00"))
+    ss.save_settings("7", settings)
+    assert [r["id"] for r in ss.load_due_reminders("2026-02-01 00:00:00")] == ["x"]
+
+def test_sqlite_write_touches_only_changed_rows(ss, tmp_path):
+    ss.configure_backend("sqlite", str(tmp_path / "settings.db"))
+    settings = ss.load_settings("7")
+    settings["source_channels"] = [10, 11, 12]
+    settings["reminders"] = keyed(*(reminder("7", str(i), f"2026-01-0{i + 1} 10:00:00") for i in range(3)))
+    ss.save_settings("7", settings)
+
+    def changes_after(update):
+        before = ss._db.total_changes
+        update()
+        ss.save_settings("7", settings)
+        return ss._db.total_changes - before
+
+    def bump_counter():
+        settings["search_usage_weekly"] += 1
+
+    def edit_reminders():
+        del settings["reminders"]["0"]  # 앞쪽 알림을 지워도 뒤쪽 행은 다시 쓰지 않음
+        settings["reminders"]["1"]["message"] = "바뀜"
+
+    def edit_channels():
+        settings["source_channels"] = [12, 10, 13]
+
+    assert changes_after(bump_counter) == 1  # guild_settings 한 행만
+    assert changes_after(edit_reminders) == 1 + 2
+    assert changes_after(edit_channels) == 1 + 4  # 11 삭제, 12·10 위치 변경, 13 추가
+
+    ss.invalidate_settings()
+    stored = ss.load_settings("7")
+    assert stored["source_channels"] == [12, 10, 13]
+    assert stored["reminders"] == settings["reminders"]
+    assert list(stored["reminders"]) == ["1", "2"]
+
+def test_legacy_reminder_list_gets_stable_ids(ss):
+    import json
+    legacy = {"reminders": [{"user_id": 1, "guild_id": "3", "channel_id": 2, "frequency": "매일", "time": "2026-01-01 10:00:00", "message": "출석"}]}
+    with open(ss.get_guild_settings_path("3"), "w", encoding="utf-8") as f:
+        json.dump(legacy, f)
+    first = list(ss.load_settings("3")["reminders"])
+    ss.invalidate_settings()
+    assert list(ss.load_settings("3")["reminders"]) == first  # 저장 전에 다시 읽어도 같은 ID
+    assert [r["id"] for r in ss.load_due_reminders("2026-01-02 00:00:00")] == first
+
+def test_put_and_pop_reminder_by_id_without_copying_settings(ss, monkeypatch):
+    settings = ss.load_settings("5")
+    settings["reminders"] = keyed(*(reminder("5", f"r{i}", "2026-01-01 10:00:00") for i in range(3)))
+    ss.save_settings("5", settings)
+    before = ss.peek_settings("5")
+
+    real_deepcopy = ss.copy.deepcopy
+
+    def deepcopy(value, *args):
+        assert "source_channels" not in value, "설정 전체를 깊은 복사하면 안 됨"
+        return real_deepcopy(value, *args)
+
+    with monkeypatch.context() as patch:
+        patch.setattr(ss.copy, "deepcopy", deepcopy)
+        moved = reminder("5", "r1", "2026-01-03 10:00:00")
+        ss.put_reminder("5", moved)
+        moved["time"] = "바깥에서 바꿔도 저장된 알림은 그대로"
+        ss.put_reminder("5", reminder("5", "r3", "2026-01-04 10:00:00"))
+        assert ss.pop_reminder("5", "r0", immediate=True)["id"] == "r0"
+        assert ss.pop_reminder("5", "없음") is None
+
+    reminders = ss.peek_settings("5")["reminders"]
+    assert list(reminders) == ["r1", "r2", "r3"]
+    assert reminders["r1"]["time"] == "2026-01-03 10:00:00"
+    assert list(before["reminders"]) == ["r0", "r1", "r2"]  # 예전 뷰는 바뀌지 않음
+    ss.invalidate_settings()
+    assert list(ss.load_settings("5")["reminders"]) == ["r1", "r2", "r3"]
+
+def test_due_index_sidecar_rereads_only_changed_files_after_restart(ss, monkeypatch):
+    for guild_id in ("1", "2", "3"):
+        settings = ss.load_settings(guild_id)
+        settings["reminders"] = keyed(reminder(guild_id, f"r{guild_id}", f"2026-0{guild_id}-01 10:00:00"))
+        ss.save_settings(guild_id, settings)
+    assert [r["id"] for r in ss.load_due_reminders("2026-01-15 00:00:00")] == ["r1"]
+
+    opened = []
+    real_open = open
+
+    def counting_open(path, *args, **kwargs):
+        opened.append(ss.os.path.basename(path))
+        return real_open(path, *args, **kwargs)
+
+    monkeypatch.setattr(ss, "open", counting_open, raising=False)
+    ss.configure_backend("json")  # 재시작 흉내: 메모리 인덱스를 비움
+    assert [r["id"] for r in ss.load_due_reminders("2026-01-15 00:00:00")] == ["r1"]
+    assert sorted(opened) == ["1.json", ss.REMINDER_DUE_INDEX_NAME]  # 알림이 가까운 서버의 파일만 읽음
+
+    with real_open(ss.get_guild_settings_path("3"), "w", encoding="utf-8") as f:  # 봇 밖에서 수정
+        ss.json.dump({"reminders": keyed(reminder("3", "r3", "2026-01-02 10:00:00"))}, f)
+    ss.os.utime(ss.get_guild_settings_path("3"), ns=(1, 1))
+    ss.configure_backend("json")
+    opened.clear()
+    assert sorted(r["id"] for r in ss.load_due_reminders("2026-01-15 00:00:00")) == ["r1", "r3"]
+    assert "2.json" not in opened
+
+def write_externally(ss, guild_id, settings):
+    path = ss.get_guild_settings_path(guild_id)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(settings, f)
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))  # 파일 시스템 시각 해상도와 무관하게 mtime을 바꿈
+
+def test_dirty_settings_survive_reload_until_flushed(ss, monkeypatch):
+    monkeypatch.setattr(ss, "MTIME_CHECK_INTERVAL", 0)
+    settings = ss.load_settings("1")
+    settings["counter"] = 1
+    ss.save_settings("1", settings)
+    settings["counter"] = 2
+    ss.mark_settings_dirty("1", settings)
+
+    write_externally(ss, "1", dict(settings, counter=99))
+    assert ss.load_settings("1")["counter"] == 2  # 저장 대기 중인 값이 외부 수정분에 덮이지 않음
+    ss.invalidate_settings("1")
+    assert ss.load_settings("1")["counter"] == 2  # 캐시에서 빠져도 마찬가지
+
+    assert ss.flush_dirty_settings() == 1
+    assert ss.pending_settings_count() == 0
+    with open(ss.get_guild_settings_path("1"), encoding="utf-8") as f:
+        assert json.load(f)["counter"] == 2
+    ss.invalidate_settings("1")
+    assert ss.load_settings("1")["counter"] == 2
+
+def test_failed_flush_keeps_settings_dirty(ss, monkeypatch):
+    settings = ss.load_settings("1")
+    settings["counter"] = 3
+    ss.mark_settings_dirty("1", settings)
+
+    def broken_write(guild_id, snapshot):
+        raise OSError("disk full")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(ss, "_write_settings", broken_write)
+        with pytest.raises(OSError):
+            ss.flush_dirty_settings()
+    assert ss.pending_settings_count() == 1
+    ss.invalidate_settings("1")
+    assert ss.load_settings("1")["counter"] == 3
+
+    assert ss.flush_dirty_settings() == 1
+    assert ss.pending_settings_count() == 0
+    assert ss.flush_dirty_settings() == 0
+
+def test_switching_backend_flushes_pending_settings(ss, tmp_path):
+    settings = ss.load_settings("1")
+    settings["counter"] = 4
+    ss.mark_settings_dirty("1", settings)
+
+    ss.configure_backend("sqlite", str(tmp_path / "settings.db"))
+    assert ss.pending_settings_count() == 0
+    with open(ss.get_guild_settings_path("1"), encoding="utf-8") as f:
+        assert json.load(f)["counter"] == 4  # 기존 JSON 백엔드에 저장됨
+    assert "counter" not in ss.load_settings("1")  # 새 백엔드로 새어 들어가지 않음
+
+def test_cache_reloads_file_changed_on_disk(ss, monkeypatch):
+    monkeypatch.setattr(ss, "MTIME_CHECK_INTERVAL", 0)
+    settings = ss.load_settings("1")
+    settings["counter"] = 1
+    ss.save_settings("1", settings)
+    assert ss.load_settings("1")["counter"] == 1
+
+    write_externally(ss, "1", dict(settings, counter=2))
+    assert ss.load_settings("1")["counter"] == 2
+    assert ss.get_cache_stats()["invalidations"] == 1
+
+def test_cache_skips_mtime_check_within_interval(ss, monkeypatch):
+    monkeypatch.setattr(ss, "MTIME_CHECK_INTERVAL", 60)
+    settings = ss.load_settings("1")
+    settings["counter"] = 1
+    ss.save_settings("1", settings)
+
+    write_externally(ss, "1", dict(settings, counter=2))
+    assert ss.load_settings("1")["counter"] == 1  # 확인 주기 전에는 캐시 그대로
+    ss.invalidate_settings("1")
+    assert ss.load_settings("1")["counter"] == 2
+
+def test_loaded_settings_do_not_leak_into_cache(ss):
+    settings = ss.load_settings("1")
+    settings["counter"] = 1
+    settings["reminders"]["x"] = reminder("1", "x", "2026-01-01 10:00:00")
+    ss.save_settings("1", settings)
+
+    loaded = ss.load_settings("1")
+    loaded["counter"] = 99
+    loaded["reminders"]["x"]["message"] = "바뀜"
+    settings["reminders"]["x"]["message"] = "저장 후 수정"  # 저장한 원본을 고쳐도 캐시에는 영향 없음
+    fresh = ss.load_settings("1")
+    assert fresh["counter"] == 1
+    assert fresh["reminders"]["x"]["message"] == "x"
+
+def test_peek_settings_is_frozen_and_tracks_saves(ss):
+    settings = ss.load_settings("1")
+    settings["reminders"] = keyed(reminder("1", "x", "2026-01-01 10:00:00"))
+    ss.save_settings("1", settings)
+
+    view = ss.peek_settings("1")
+    assert view is ss.peek_settings("1")  # 바뀌지 않았으면 같은 뷰를 재사용
+    with pytest.raises(TypeError):
+        view["counter"] = 1
+    with pytest.raises(TypeError):
+        view["reminders"]["x"]["message"] = "바뀜"
+
+    settings["counter"] = 1
+    ss.save_settings("1", settings)
+    assert ss.peek_settings("1")["counter"] == 1
+    assert "counter" not in view  # 예전 뷰는 그대로
+
+def test_cache_hit_and_miss_counters(ss, monkeypatch):
+    monkeypatch.setattr(ss, "MTIME_CHECK_INTERVAL", 60)
+    ss.load_settings("1")
+    ss.load_settings("1")
+    ss.peek_settings("1")
+    ss.load_settings("2")
+    stats = ss.get_cache_stats()
+    assert (stats["hits"], stats["misses"], stats["size"]) == (2, 2, 2)
+    assert stats["hit_rate"] == 0.5
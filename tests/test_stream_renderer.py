@@ -0,0 +1,115 @@
+import asyncio
+import time
+
+from stream_renderer import StreamRenderer, split_message
+
+def test_split_message_short_text():
+    assert split_message("hello") == ["hello"]
+    assert split_message("") == []
+
+def test_split_message_prefers_newlines():
+    text = "a" * 1500 + "\n" + "b" * 1000
+    assert split_message(text) == ["a" * 1500, "b" * 1000]
+
+def test_split_message_hard_cut_without_boundaries():
+    chunks = split_message("x" * 4500)
+    assert [len(chunk) for chunk in chunks] == [2000, 2000, 500]
+
+def test_split_message_full_chunks_are_stable_as_text_grows():
+    text = ("단어 " * 800).strip()
+    first = split_message(text)[0]
+    assert split_message(text + " 더 많은 글")[0] == first
+
+class FakeMessage:
+    def __init__(self, content):
+        self.content = content
+        self.deleted = False
+
+    async def edit(self, content):
+        self.content = content
+
+    async def delete(self):
+        self.deleted = True
+
+class FakeInteraction:
+    def __init__(self):
+        self.original = None
+        self.embed = None
+        self.followups = []
+
+    async def edit_original(self, content, embed=None):
+        self.original = content
+        self.embed = embed
+
+    async def send_followup(self, content):
+        message = FakeMessage(content)
+        self.followups.append(message)
+        return message
+
+def make_renderer(interaction, interval=0.01):
+    return StreamRenderer(interaction.edit_original, interaction.send_followup, interval=interval)
+
+def test_feed_does_not_block_and_render_task_shows_text():
+    async def main():
+        interaction = FakeInteraction()
+        renderer = make_renderer(interaction)
+        renderer.start()
+        renderer.feed("안녕")
+        await asyncio.sleep(0.05)
+        shown = interaction.original
+        await renderer.finish("안녕하세요!", embed="embed")
+        return interaction, renderer, shown
+
+    interaction, renderer, shown = asyncio.run(main())
+    assert shown == "안녕"
+    assert interaction.original == "안녕하세요!"
+    assert interaction.embed == "embed"
+    assert renderer.first_visible is not None
+
+def test_long_answer_rolls_over_and_rewind_deletes_followups():
+    async def main():
+        interaction = FakeInteraction()
+        renderer = make_renderer(interaction)
+        renderer.start()
+        renderer.feed("a" * 2500)
+        await asyncio.sleep(0.05)
+        followups_during = [message.content for message in interaction.followups]
+        renderer.rewind(0)
+        await renderer.finish("짧은 답")
+        return interaction, followups_during
+
+    interaction, followups_during = asyncio.run(main())
+    assert followups_during == ["a" * 500]
+    assert interaction.original == "짧은 답"
+    assert all(message.deleted for message in interaction.followups)
+
+def test_stop_without_start():
+    async def main():
+        interaction = FakeInteraction()
+        renderer = make_renderer(interaction)
+        await renderer.finish("done")
+        return interaction
+
+    assert asyncio.run(main()).original == "done"
+
+def test_stop_during_edit_waits_for_edit_but_not_interval():
+    async def main():
+        interaction = FakeInteraction()
+        edit_started = asyncio.Event()
+
+        async def slow_edit(content, embed=None):
+            edit_started.set()
+            await asyncio.sleep(0.05)
+            await interaction.edit_original(content, embed)
+
+        renderer = StreamRenderer(slow_edit, interaction.send_followup, interval=10)
+        renderer.start()
+        renderer.feed("진행 중")
+        await edit_started.wait()
+        started = time.monotonic()
+        await renderer.stop()
+        return interaction, time.monotonic() - started
+
+    interaction, stop_time = asyncio.run(main())
+    assert interaction.original == "진행 중"  # 진행 중이던 수정은 끝까지 함
+    assert stop_time < 1  # interval(10초)만큼 자지 않음
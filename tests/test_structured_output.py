@@ -0,0 +1,31 @@
+import pytest
+
+from structured_output import JsonResponseParser, ResponseParseError, json_generation_config
+
+def test_valid_json_is_parsed_directly():
+    parser = JsonResponseParser()
+    assert parser.parse('{"lang": "ko", "text": "안녕"}') == {"lang": "ko", "text": "안녕"}
+    assert parser.parse('["a", "b"]', expected_type=list) == ["a", "b"]
+    assert parser.stats == {"parsed": 2, "recovered": 0, "failed": 0}
+
+def test_fenced_chatty_and_trailing_comma_responses_are_recovered():
+    parser = JsonResponseParser()
+    assert parser.parse('```json\n{"a": 1}\n```') == {"a": 1}
+    assert parser.parse('물론이죠! 결과는 다음과 같아요: {"a": [1, 2,],} 도움이 되었길!') == {"a": [1, 2]}
+    assert parser.parse('Here you go: ["x", "y",]', expected_type=list) == ["x", "y"]
+    assert parser.stats == {"parsed": 0, "recovered": 3, "failed": 0}
+
+def test_wrong_type_is_recovered_from_inner_value():
+    parser = JsonResponseParser()
+    assert parser.parse('[{"a": 1}]') == {"a": 1}  # 목록으로 감싼 객체
+
+@pytest.mark.parametrize("text", ["", None, "죄송해요, 번역할 수 없어요.", '{"a": ', '"just a string"'])
+def test_unrecoverable_responses_raise(text):
+    parser = JsonResponseParser()
+    with pytest.raises(ResponseParseError):
+        parser.parse(text)
+    assert parser.stats["failed"] == 1
+
+def test_generation_config():
+    schema = {"type": "object"}
+    assert json_generation_config(schema) == {"response_mime_type": "application/json", "response_schema": schema}
@@ -0,0 +1,80 @@
+import asyncio
+import json
+
+import pytest
+
+from structured_output import ResponseParseError
+from translation_batcher import TranslationBatcher, parse_batch_response, parse_translations
+
+def test_parse_translations_keeps_only_requested_non_empty_languages():
+    result = {"translations": [{"language": "en", "text": "Hello"}, {"language": "ja", "text": "  "},
+                               {"language": "zh", "text": "你好"}, "garbage", {"text": "no language"}]}
+    assert parse_translations(result, ("en", "ja", "fr")) == {"en": "Hello"}
+
+def test_parse_translations_accepts_dict_and_legacy_shapes():
+    assert parse_translations({"translations": {"en": "Hi", "ja": 3}}, ("en", "ja")) == {"en": "Hi"}
+    assert parse_translations({"translated_text": "Hi"}, ("en",)) == {"en": "Hi"}
+    assert parse_translations({"translated_text": "Hi"}, ("en", "ja")) == {}  # 여러 언어면 어느 언어인지 알 수 없음
+    assert parse_translations({"translations": None}, ("en",)) == {}  # 빈 번역은 버림
+    assert parse_translations({}, ("en", "ja")) == {}
+
+def test_parse_batch_response_maps_by_id_and_drops_missing_targets():
+    items = [("안녕", ("en", "ja")), ("hello", ("ko",))]
+    response = json.dumps([
+        {"id": 1, "detected_language_code": "en", "translations": [{"language": "ko", "text": "안녕"}]},
+        {"id": 0, "detected_language_code": "ko", "translations": [{"language": "en", "text": "Hi"}]},  # ja 빠짐
+    ], ensure_ascii=False)
+    assert parse_batch_response(response, items) == [({"en": "Hi"}, "ko"), ({"ko": "안녕"}, "en")]
+
+def test_parse_batch_response_recovers_fenced_json_without_ids():
+    items = [("a", ("ko",)), ("b", ("ko",))]
+    response = '```json\n[{"translations": [{"language": "ko", "text": "가"}]}, {"detected_language_code": "en", "translations": []},]\n```'
+    assert parse_batch_response(response, items) == [({"ko": "가"}, "N/A"), ({}, "en")]
+
+@pytest.mark.parametrize("response", [
+    "not json at all",
+    '[{"id": 0, "translations": [',  # 잘린 응답
+    '{"id": 0, "translations": []}',  # 배열이 아님
+    '[{"id": 0, "translations": []}]',  # 항목 하나가 빠짐
+    '[{"id": 0}, {"id": 5}]',  # 없는 id
+])
+def test_parse_batch_response_rejects_malformed_or_partial(response):
+    with pytest.raises(ResponseParseError):
+        parse_batch_response(response, [("a", ("ko",)), ("b", ("ko",))])
+
+def make_batcher(max_batch_size=3, flush_window=10, fail_batch=False):
+    calls = []
+
+    async def translate_batch(items):
+        calls.append(("batch", len(items)))
+        if fail_batch:
+            raise ResponseParseError("bad")
+        return [({langs[0]: text.upper()}, "en") for text, langs in items]
+
+    async def translate_single(text, target_langs):
+        calls.append(("single", text))
+        return {target_langs[0]: text.upper()}, "en"
+
+    return TranslationBatcher(translate_batch, translate_single, flush_window=flush_window, max_batch_size=max_batch_size), calls
+
+def test_full_batch_flushes_without_waiting_for_timer():
+    async def main():
+        batcher, calls = make_batcher(max_batch_size=3, flush_window=10)
+        results = await asyncio.wait_for(asyncio.gather(*(batcher.translate(t, ("ko",)) for t in "abc")), 1)
+        return batcher, calls, results
+
+    batcher, calls, results = asyncio.run(main())
+    assert calls == [("batch", 3)]
+    assert results == [({"ko": "A"}, "en"), ({"ko": "B"}, "en"), ({"ko": "C"}, "en")]
+    assert batcher.get_stats()["calls_per_message"] == pytest.approx(1 / 3)
+
+def test_timer_flushes_partial_batch_and_failures_fall_back_to_single_calls():
+    async def main():
+        batcher, calls = make_batcher(max_batch_size=16, flush_window=0.01, fail_batch=True)
+        results = await asyncio.gather(batcher.translate("a", ("ko",)), batcher.translate("b", ("ko",)))
+        return batcher, calls, results
+
+    batcher, calls, results = asyncio.run(main())
+    assert calls == [("batch", 2), ("single", "a"), ("single", "b")]
+    assert results == [({"ko": "A"}, "en"), ({"ko": "B"}, "en")]
+    assert batcher.stats["fallbacks"] == 1
@@ -0,0 +1,47 @@
+import asyncio
+import sqlite3
+
+from translation_cache import TranslationCache, normalize_text
+
+def test_normalize_text():
+    assert normalize_text("  Hello\n  WORLD ") == "hello world"
+
+def test_memory_and_disk_hits(tmp_path):
+    db_path = str(tmp_path / "cache.db")
+    cache = TranslationCache(db_path)
+    cache.put("auto", "en", "안녕하세요", ["Hello", "ko"])
+    assert asyncio.run(cache.get("auto", "en", " 안녕하세요 ")) == ["Hello", "ko"]
+    assert cache.flush() == 1
+    cache.close()
+
+    reopened = TranslationCache(db_path)
+    assert asyncio.run(reopened.get("auto", "en", "안녕하세요")) == ["Hello", "ko"]
+    assert asyncio.run(reopened.get("auto", "ja", "안녕하세요")) is None
+    assert reopened.stats == {"memory_hits": 0, "disk_hits": 1, "misses": 1}
+    reopened.close()
+
+def test_pending_entry_evicted_from_memory_is_still_found(tmp_path):
+    cache = TranslationCache(str(tmp_path / "cache.db"), max_memory_items=1)
+    cache.put("auto", "en", "하나", ["one", "ko"])
+    cache.put("auto", "en", "둘", ["two", "ko"])
+    assert asyncio.run(cache.get("auto", "en", "하나")) == ["one", "ko"]
+    cache.close()
+
+def test_long_text_is_not_cached(tmp_path):
+    cache = TranslationCache(str(tmp_path / "cache.db"), max_text_length=10)
+    cache.put("auto", "en", "가" * 11, ["x", "ko"])
+    assert asyncio.run(cache.get("auto", "en", "가" * 11)) is None
+    cache.close()
+
+def test_flush_keeps_only_newest_rows(tmp_path):
+    db_path = str(tmp_path / "cache.db")
+    cache = TranslationCache(db_path, max_disk_items=5)
+    for i in range(12):
+        cache.put("auto", "en", f"문장 {i}", [str(i), "ko"])
+        cache.flush()
+    cache.put("auto", "en", "문장 11", ["11!", "ko"])  # 다시 쓴 항목은 최신으로 취급
+    cache.flush()
+    cache.close()
+    with sqlite3.connect(db_path) as db:
+        keys = {row[0] for row in db.execute("SELECT cache_key FROM translation_cache")}
+    assert keys == {f"auto|en|문장 {i}" for i in range(8, 12)}
@@ -0,0 +1,80 @@
+from translation_memory import TranslationMemory, _grams
+
+def jaccard(a, b):
+    a, b = _grams(a), _grams(b)
+    return len(a & b) / len(a | b)
+
+def test_template_swaps_numbers_and_mentions(tmp_path):
+    memory = TranslationMemory(str(tmp_path / "memory.json"))
+    memory.add(1, "<@123> 님이 레벨 8 달성!", "<@123> reached level 8!", "en", "ko")
+
+    kind, translation, entry = memory.lookup(1, "<@456> 님이 레벨 7 달성!", "en")
+    assert kind == "template"
+    assert translation == "<@456> reached level 7!"
+    assert entry["detected_language"] == "ko"
+    assert memory.stats == {"template_hits": 1, "adapt_hits": 0, "misses": 0}
+
+def test_similar_text_is_adapt_candidate_counted_only_when_used(tmp_path):
+    memory = TranslationMemory(str(tmp_path / "memory.json"), threshold=0.5)
+    memory.add(1, "오늘 저녁에 같이 게임 할 사람 있어?", "Anyone want to play games tonight?", "en", "ko")
+
+    kind, translation, entry = memory.lookup(1, "오늘 저녁에 같이 게임 할 사람 있나?", "en")
+    assert kind == "adapt" and translation is None
+    assert entry["translation"] == "Anyone want to play games tonight?"
+    assert memory.stats["adapt_hits"] == 0  # 후보를 찾은 것만으로는 세지 않음
+    memory.count_adapt(True)
+    memory.count_adapt(False)
+    assert memory.stats == {"template_hits": 0, "adapt_hits": 1, "misses": 1}
+
+def test_lookup_filters_by_guild_and_target_language(tmp_path):
+    memory = TranslationMemory(str(tmp_path / "memory.json"))
+    memory.add(1, "안녕하세요 여러분", "Hello everyone", "en", "ko")
+    assert memory.lookup(1, "안녕하세요 여러분", "ja") == (None, None, None)
+    assert memory.lookup(2, "안녕하세요 여러분", "en") == (None, None, None)
+    assert memory.lookup(1, "전혀 다른 문장이에요", "en") == (None, None, None)
+    assert memory.stats["misses"] == 3
+
+def test_threshold_is_inclusive_jaccard_score(tmp_path):
+    old, new = "내일 아침 회의 시간 알려줘", "내일 오후 회의 시간 알려줘"
+    score = jaccard(old, new)
+    assert 0 < score < 1
+
+    memory = TranslationMemory(str(tmp_path / "memory.json"), threshold=score)
+    memory.add(1, old, "Tell me tomorrow morning's meeting time", "en", "ko")
+    assert memory.lookup(1, new, "en")[0] == "adapt"
+
+    memory.threshold = score + 0.01
+    assert memory.lookup(1, new, "en") == (None, None, None)
+
+def test_picks_most_similar_entry(tmp_path):
+    memory = TranslationMemory(str(tmp_path / "memory.json"), threshold=0.3)
+    memory.add(1, "고양이가 창가에서 잠을 자요", "The cat sleeps by the window", "en", "ko")
+    memory.add(1, "강아지가 창가에서 잠을 자요", "The dog sleeps by the window", "en", "ko")
+    _, _, entry = memory.lookup(1, "강아지가 창가에서 낮잠을 자요", "en")
+    assert entry["source"] == "강아지가 창가에서 잠을 자요"
+
+def test_evicts_least_recently_used_and_cleans_index(tmp_path):
+    memory = TranslationMemory(str(tmp_path / "memory.json"), max_entries=2)
+    memory.add(1, "첫 번째 문장입니다", "first", "en", "ko")
+    memory.add(1, "두 번째 문장입니다", "second", "en", "ko")
+    assert memory.lookup(1, "첫 번째 문장입니다", "en")[0] == "template"  # 최근 사용으로 옮김
+    memory.add(1, "세 번째 문장이에요", "third", "en", "ko")
+
+    guild = memory._guilds["1"]
+    assert [entry["translation"] for entry in guild["entries"].values()] == ["first", "third"]
+    live_ids = set(guild["entries"])
+    assert all(ids and ids <= live_ids for ids in guild["index"].values())
+
+def test_save_and_load_round_trip(tmp_path):
+    path = str(tmp_path / "memory.json")
+    memory = TranslationMemory(path)
+    memory.add(1, "레벨 3 달성!", "Reached level 3!", "en", "ko")
+    memory.add(2, "좋은 아침", "おはよう", "ja", "ko")
+    assert memory.save()
+    assert not memory.save()  # 바뀐 게 없으면 다시 쓰지 않음
+
+    restored = TranslationMemory(path)
+    restored.load()
+    assert restored.lookup(1, "레벨 4 달성!", "en")[:2] == ("template", "Reached level 4!")
+    assert restored.lookup(2, "좋은 아침", "ja")[:2] == ("template", "おはよう")
+    assert not restored.save()  # 불러온 직후에는 저장할 것이 없음
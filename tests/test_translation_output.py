@@ -0,0 +1,75 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("discord")
+
+from translation_output import EMBED_FIELD_LIMIT, EMBED_TOTAL_LIMIT, TranslationOutput, TranslationPost
+
+class FakeChannel:
+    id = 1
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.sent = []
+
+    async def send(self, embed):
+        await asyncio.sleep(self.delay)
+        self.sent.append(embed)
+
+def post(name, text="hello", languages=("en",)):
+    return TranslationPost(name, None, f"https://discord.com/channels/1/2/{name}", text,
+                           [(f"🇺🇸 {lang}", text) for lang in languages], "ko → en")
+
+def authors(embed):
+    """임베드에 들어간 게시물 작성자 순서"""
+    if embed.footer.text.startswith("자동 번역"):
+        return [field.name[2:].split(" 님")[0] for field in embed.fields if field.name.startswith("💬")]
+    return [embed.author.name.removesuffix(" 님의 메시지")]
+
+def run_output(posts, window=0.02, delay=0.0, late_posts=(), settle=0.2):
+    async def main():
+        output, channel = TranslationOutput(window=window), FakeChannel(delay)
+        for p in posts:
+            output.enqueue(channel, p)
+        if late_posts:
+            await asyncio.sleep(window + delay / 2)  # 첫 묶음을 보내는 중에 도착
+            for p in late_posts:
+                output.enqueue(channel, p)
+        await asyncio.sleep(settle)
+        return output, channel
+
+    return asyncio.run(main())
+
+def test_posts_within_window_share_one_embed():
+    output, channel = run_output([post("a"), post("b"), post("c")])
+    assert [authors(embed) for embed in channel.sent] == [["a", "b", "c"]]
+    assert channel.sent[0].footer.text == "자동 번역 3개"
+    stats = output.get_stats()
+    assert (stats["posts"], stats["sends"], stats["saved_sends"], stats["delivered"]) == (3, 1, 2, 3)
+    assert stats["pending"] == 0
+
+def test_single_post_uses_regular_embed():
+    _, channel = run_output([post("a", languages=("en", "ja"))])
+    embed = channel.sent[0]
+    assert authors(embed) == ["a"]
+    assert [field.name for field in embed.fields] == ["원본 메시지", "🇺🇸 en", "🇺🇸 ja"]
+    assert embed.footer.text == "ko → en"
+
+def test_split_at_field_limit():
+    posts = [post(str(i), languages=("en", "ja")) for i in range(9)]  # 게시물당 필드 3개 → 27개
+    _, channel = run_output(posts)
+    assert [authors(embed) for embed in channel.sent] == [[str(i) for i in range(8)], ["8"]]
+    assert all(len(embed.fields) <= EMBED_FIELD_LIMIT for embed in channel.sent)
+
+def test_split_at_character_limit():
+    posts = [post(str(i), text="가" * 1500) for i in range(5)]  # 게시물당 약 2,000자 → 임베드당 2개
+    output, channel = run_output(posts)
+    assert [authors(embed) for embed in channel.sent] == [["0", "1"], ["2", "3"], ["4"]]
+    assert all(len(embed) <= EMBED_TOTAL_LIMIT for embed in channel.sent)
+    assert all(len(field.value) <= 1024 for embed in channel.sent for field in embed.fields)
+    assert output.stats["saved_sends"] == 2
+
+def test_posts_arriving_during_send_go_out_next_in_order():
+    _, channel = run_output([post("a"), post("b")], delay=0.05, late_posts=[post("c"), post("d")], settle=0.3)
+    assert [authors(embed) for embed in channel.sent] == [["a", "b"], ["c", "d"]]
@@ -0,0 +1,101 @@
+import asyncio
+
+from translation_queue import GuildTranslationQueue
+
+def job(text, author=1, channel=10):
+    return {"author_id": author, "channel_id": channel, "text": text, "target_languages": ["ko"], "memory_entry": "entry"}
+
+def test_total_workers_are_capped_across_guilds():
+    async def main():
+        running, peak = 0, 0
+
+        async def handler(_):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+
+        queue = GuildTranslationQueue(handler, workers_per_guild=2, max_workers=3)
+        for guild in range(5):
+            for i in range(4):
+                queue.submit(guild, job(f"{guild}-{i}", author=i))
+        while queue.depth() or queue.get_stats()["workers"]:
+            await asyncio.sleep(0.01)
+        return queue, peak
+
+    queue, peak = asyncio.run(main())
+    assert peak == 3
+    assert queue.stats["processed"] == 20
+    assert queue.get_stats()["active_guilds"] == 0
+
+def test_waiting_guild_gets_a_turn_before_busy_guild_finishes():
+    async def main():
+        order = []
+
+        async def handler(item):
+            order.append(item["text"])
+            await asyncio.sleep(0.01)
+
+        queue = GuildTranslationQueue(handler, workers_per_guild=1, max_workers=1)
+        for i in range(5):
+            queue.submit("busy", job(f"busy-{i}", author=i))
+        queue.submit("quiet", job("quiet"))
+        while queue.depth() or queue.get_stats()["workers"]:
+            await asyncio.sleep(0.01)
+        return queue, order
+
+    queue, order = asyncio.run(main())
+    assert order.index("quiet") == 1
+    assert queue.stats["handoffs"] >= 1
+
+def test_merge_policy_merges_only_when_full():
+    async def main():
+        gate = asyncio.Event()
+        handled = []
+
+        async def handler(item):
+            await gate.wait()
+            handled.append(item)
+
+        queue = GuildTranslationQueue(handler, max_depth=2, workers_per_guild=1, overflow_policy="merge")
+        queue.submit(1, job("first"))   # 워커가 바로 꺼내 처리 중
+        await asyncio.sleep(0)
+        queue.submit(1, job("a"))
+        queue.submit(1, job("b"))  # 여유가 있으면 합치지 않음
+        assert queue.depth(1) == 2
+        assert queue.submit(1, job("c"))  # 가득 찼고 같은 작성자·채널 → 마지막 작업에 이어 붙임
+        assert not queue.submit(1, job("other author", author=2))  # 가득 찼는데 합칠 수 없으면 버림
+        gate.set()
+        while queue.depth() or queue.get_stats()["workers"]:
+            await asyncio.sleep(0.01)
+        return queue, handled
+
+    queue, handled = asyncio.run(main())
+    assert [item["text"] for item in handled] == ["first", "a", "b\nc"]
+    assert handled[1]["memory_entry"] == "entry"
+    assert handled[2]["memory_entry"] is None
+    assert queue.stats["merged"] == 1
+    assert queue.stats["dropped"] == 1
+
+def test_drop_oldest_when_full():
+    async def main():
+        gate = asyncio.Event()
+        handled = []
+
+        async def handler(item):
+            await gate.wait()
+            handled.append(item["text"])
+
+        queue = GuildTranslationQueue(handler, max_depth=2, workers_per_guild=1)
+        for text in ["running", "a", "b", "c"]:
+            queue.submit(1, job(text))
+            await asyncio.sleep(0)
+        gate.set()
+        while queue.depth() or queue.get_stats()["workers"]:
+            await asyncio.sleep(0.01)
+        return queue, handled
+
+    queue, handled = asyncio.run(main())
+    assert handled == ["running", "b", "c"]
+    assert queue.stats["dropped"] == 1
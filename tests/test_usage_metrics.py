@@ -0,0 +1,35 @@
+import sqlite3
+from datetime import datetime
+
+import pytest
+
+from usage_metrics import UsageMetrics
+
+def test_counts_merge_flushed_and_pending(tmp_path):
+    metrics = UsageMetrics(str(tmp_path / "usage.db"))
+    now = datetime(2026, 1, 1, 10, 30)
+    for _ in range(3):
+        metrics.record(1, "번역", now)
+    metrics.record(2, "시이야", now)
+    assert metrics.flush() == 2
+    metrics.record(1, "번역", now)
+    metrics.record(2, "시이야", datetime(2026, 1, 2, 0, 0))  # 구간 밖
+
+    assert metrics.guild_command_counts("2026-01-01 00", "2026-01-02 00") == {1: {"번역": 4}, 2: {"시이야": 1}}
+    assert metrics.top_guilds("2026-01-01 00", "2026-01-03 00", limit=1) == [(1, 4)]
+    metrics.close()
+
+def test_failed_flush_keeps_pending_counts(tmp_path):
+    metrics = UsageMetrics(str(tmp_path / "usage.db"))
+    now = datetime(2026, 1, 1, 10, 30)
+    metrics.record(1, "번역", now)
+    metrics._db.execute("CREATE TRIGGER fail_insert BEFORE INSERT ON usage_hourly BEGIN SELECT RAISE(ABORT, 'disk full'); END")
+    with pytest.raises(sqlite3.Error):
+        metrics.flush()
+    metrics.record(1, "번역", now)  # 실패 뒤에 들어온 기록과도 합쳐짐
+    assert metrics.guild_command_counts("2026-01-01 00", "2026-01-02 00") == {1: {"번역": 2}}
+
+    metrics._db.execute("DROP TRIGGER fail_insert")
+    assert metrics.flush() == 1
+    assert metrics._db.execute("SELECT count FROM usage_hourly").fetchall() == [(2,)]
+    metrics.close()
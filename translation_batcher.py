@@ -0,0 +1,113 @@
+import asyncio
+import json
+import logging
+
+from background_tasks import spawn
+from structured_output import ResponseParseError, json_parser
+
+log = logging.getLogger('RubyBot')
+
+# 🔹 자동 번역 프롬프트 및 마이크로 배치 처리
+
+# 여러 목표 언어를 한 번에 받기 위해 응답의 "translations"는 [{"language": 언어 코드, "text": 번역문}] 형태입니다.
+TRANSLATION_RESULT_PROPERTIES = {
+    "detected_language_code": {"type": "STRING"},
+    "translation_needed": {"type": "BOOLEAN"},
+    "translations": {
+        "type": "ARRAY",
+        "items": {"type": "OBJECT", "properties": {"language": {"type": "STRING"}, "text": {"type": "STRING"}}, "required": ["language", "text"]}
+    }
+}
+TRANSLATION_SCHEMA = {"type": "OBJECT", "properties": TRANSLATION_RESULT_PROPERTIES, "required": list(TRANSLATION_RESULT_PROPERTIES)}
+BATCH_TRANSLATION_SCHEMA = {
+    "type": "ARRAY",
+    "items": {"type": "OBJECT", "properties": {"id": {"type": "INTEGER"}, **TRANSLATION_RESULT_PROPERTIES}, "required": ["id", *TRANSLATION_RESULT_PROPERTIES]}
+}
+
+def build_single_prompt(text, target_langs):
+    """메시지 1개용 자동 번역 프롬프트 (target_langs의 모든 언어를 한 번에 요청)"""
+    return f"""Analyze the following text. Your primary language for analysis is Korean. 1. First, identify the main language of the text. 2. If the text contains any Korean characters, translation is not needed. 3. Translate the text into each of these languages (ISO 639-1): {", ".join(target_langs)} ONLY IF translation is necessary, skipping any language the text is already written in. Provide the output ONLY in JSON format: {{"detected_language_code": "ISO 639-1 code", "translation_needed": boolean, "translations": [{{"language": "ISO 639-1 code", "text": "Translated text"}}]}} Original Text: --- {text} ---"""
+
+def build_batch_prompt(items):
+    """여러 메시지를 한 번에 번역하는 프롬프트. items: [(text, target_langs), ...]"""
+    payload = json.dumps([{"id": i, "target_languages": list(target_langs), "text": text} for i, (text, target_langs) in enumerate(items)], ensure_ascii=False)
+    return f"""Analyze each item in the JSON array below. For each item: 1. Identify the main language of "text". 2. If the text contains any Korean characters, translation is not needed. 3. Otherwise translate "text" into every language in "target_languages" (ISO 639-1), skipping any language the text is already written in. Provide the output ONLY as a JSON array with exactly one object per input item, in the same order: [{{"id": number, "detected_language_code": "ISO 639-1 code", "translation_needed": boolean, "translations": [{{"language": "ISO 639-1 code", "text": "Translated text"}}]}}] Items: {payload}"""
+
+def parse_translations(result, target_langs):
+    """응답 객체 하나에서 {언어 코드: 번역문}을 꺼냅니다. (요청한 언어만, 빈 번역 제외)"""
+    translations = result.get("translations")
+    if isinstance(translations, list):
+        translations = {t.get("language"): t.get("text") for t in translations if isinstance(t, dict)}
+    if not isinstance(translations, dict):
+        # 예전 형식(translated_text 하나)으로 답한 경우
+        translations = {target_langs[0]: result.get("translated_text", "")} if len(target_langs) == 1 else {}
+    return {lang: translations[lang] for lang in target_langs if isinstance(translations.get(lang), str) and translations[lang].strip()}
+
+def parse_batch_response(response_text, items):
+    """배치 응답(JSON 배열)을 [(translations, detected_language), ...]로 변환. 해석할 수 없거나 개수가 안 맞으면 ResponseParseError"""
+    results = json_parser.parse(response_text, list)
+    by_id = {r.get("id", i): r for i, r in enumerate(results) if isinstance(r, dict)}
+    if any(i not in by_id for i in range(len(items))):
+        raise ResponseParseError(f"배치 번역 응답 개수가 맞지 않아요. (요청 {len(items)}개, 응답 {len(results)}개)")
+    return [(parse_translations(by_id[i], target_langs), by_id[i].get("detected_language_code", "N/A")) for i, (_, target_langs) in enumerate(items)]
+
+class TranslationBatcher:
+    """
+    짧은 시간(flush_window) 동안 들어온 자동 번역 요청을 모아 API 호출 한 번으로 처리하고,
+    결과를 기다리던 on_message 핸들러들에게 나눠줍니다.
+    """
+
+    def __init__(self, translate_batch, translate_single, flush_window=0.3, max_batch_size=20):
+        self._translate_batch = translate_batch  # async (items) -> [(translations, detected_language)]
+        self._translate_single = translate_single  # 배치 실패 시 개별 번역용 async (text, target_langs)
+        self.flush_window = flush_window
+        self.max_batch_size = max_batch_size
+        self._pending = []  # [(text, target_langs, future)]
+        self._timer = None
+        self.stats = {"messages": 0, "api_calls": 0, "batches": 0, "fallbacks": 0}
+
+    async def translate(self, text, target_langs):
+        """text를 target_langs(언어 코드 튜플)의 모든 언어로 번역 → (translations, detected_language)"""
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((text, tuple(target_langs), future))
+        if len(self._pending) >= self.max_batch_size:
+            self._flush_now()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.flush_window, self._flush_now)
+        return await future
+
+    def _flush_now(self):
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            spawn(self._run_batch(batch))
+
+    async def _run_batch(self, batch):
+        self.stats["messages"] += len(batch)
+        items = [(text, target_langs) for text, target_langs, _ in batch]
+        try:
+            if len(batch) == 1:
+                results = [await self._translate_single(*items[0])]
+            else:
+                results = await self._translate_batch(items)
+                self.stats["batches"] += 1
+            self.stats["api_calls"] += 1
+        except Exception as e:
+            log.warning(f"배치 번역 실패, 개별 번역으로 다시 시도해요: {e}")
+            self.stats["fallbacks"] += 1
+            results = await asyncio.gather(*(self._translate_single(text, target_langs) for text, target_langs in items), return_exceptions=True)
+            self.stats["api_calls"] += len(items)
+
+        for (_, _, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    def get_stats(self):
+        messages = self.stats["messages"]
+        return {**self.stats, "calls_per_message": self.stats["api_calls"] / messages if messages else 0.0}
@@ -0,0 +1,136 @@
+import asyncio
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+# 🔹 번역 결과 캐시 (메모리 LRU + 디스크 SQLite 2단계)
+TRANSLATION_CACHE_DB_PATH = "bot_setting/translation_cache.db"
+WHITESPACE_PATTERN = re.compile(r"\s+")
+
+TRANSLATION_CACHE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS translation_cache (
+    cache_key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_translation_cache_created ON translation_cache (created_at);
+"""
+
+def normalize_text(text):
+    """캐시 키용 정규화: 유니코드 정규화, 소문자, 공백 정리"""
+    return WHITESPACE_PATTERN.sub(" ", unicodedata.normalize("NFKC", text)).strip().lower()
+
+class TranslationCache:
+    """
+    자주 반복되는 짧은 문장의 번역 결과를 API 호출 없이 돌려주기 위한 캐시입니다.
+    get()은 메모리에 없을 때만 스레드에서 디스크를 읽으며, 읽기 전용 연결을 따로 써서 flush()의 쓰기를 기다리지 않습니다. (WAL)
+    """
+
+    def __init__(self, db_path=TRANSLATION_CACHE_DB_PATH, max_memory_items=5000, ttl_seconds=7 * 24 * 3600,
+                 max_disk_items=200000, max_text_length=300):
+        self.max_memory_items = max_memory_items
+        self.ttl_seconds = ttl_seconds
+        self.max_disk_items = max_disk_items
+        self.max_text_length = max_text_length  # 이보다 긴 문장은 반복될 일이 거의 없어 캐시하지 않음
+        self._memory = OrderedDict()  # cache_key -> (value, created_at)
+        self._pending = {}  # 디스크에 아직 안 쓴 항목
+        self._lock = threading.Lock()
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0}
+
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(db_path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(TRANSLATION_CACHE_SCHEMA)
+        self._db_lock = threading.Lock()
+        self._reader = sqlite3.connect(db_path, check_same_thread=False)
+        self._reader_lock = threading.Lock()
+
+    def make_key(self, kind, target_lang, text):
+        normalized = normalize_text(text)
+        if not normalized or len(normalized) > self.max_text_length:
+            return None
+        return f"{kind}|{target_lang}|{normalized}"
+
+    def _remember(self, cache_key, value, created_at):
+        self._memory[cache_key] = (value, created_at)
+        self._memory.move_to_end(cache_key)
+        while len(self._memory) > self.max_memory_items:
+            self._memory.popitem(last=False)
+
+    def _read_disk(self, cache_key):
+        with self._reader_lock:
+            return self._reader.execute("SELECT value, created_at FROM translation_cache WHERE cache_key = ?", (cache_key,)).fetchone()
+
+    async def get(self, kind, target_lang, text):
+        """캐시된 번역 결과 반환 (없으면 None)"""
+        cache_key = self.make_key(kind, target_lang, text)
+        if cache_key is None:
+            return None
+        now = time.time()
+        with self._lock:
+            item = self._memory.get(cache_key)
+            if item is not None and now - item[1] < self.ttl_seconds:
+                self._memory.move_to_end(cache_key)
+                self.stats["memory_hits"] += 1
+                return item[0]
+            pending = self._pending.get(cache_key)  # 메모리에서 밀려났지만 아직 디스크에 안 쓴 항목
+            if pending is not None and now - pending[1] < self.ttl_seconds:
+                self._remember(cache_key, *pending)
+                self.stats["memory_hits"] += 1
+                return pending[0]
+
+        row = await asyncio.to_thread(self._read_disk, cache_key)
+        if row is not None and now - row[1] < self.ttl_seconds:
+            value = json.loads(row[0])
+            with self._lock:
+                self._remember(cache_key, value, row[1])
+                self.stats["disk_hits"] += 1
+            return value
+
+        with self._lock:
+            self._memory.pop(cache_key, None)
+            self.stats["misses"] += 1
+        return None
+
+    def put(self, kind, target_lang, text, value):
+        cache_key = self.make_key(kind, target_lang, text)
+        if cache_key is None:
+            return
+        now = time.time()
+        with self._lock:
+            self._remember(cache_key, value, now)
+            self._pending[cache_key] = (value, now)
+
+    def flush(self):
+        """새 항목을 디스크에 쓰고, 만료되거나 넘치는 항목을 정리합니다. (이벤트 루프 밖에서 호출)"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        with self._db_lock, self._db:
+            if pending:
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO translation_cache (cache_key, value, created_at) VALUES (?, ?, ?)",
+                    [(key, json.dumps(value, ensure_ascii=False), created_at) for key, (value, created_at) in pending.items()])
+            self._db.execute("DELETE FROM translation_cache WHERE created_at < ?", (time.time() - self.ttl_seconds,))
+            # rowid는 쓴 순서대로 커지므로 (INSERT OR REPLACE도 새 rowid) 최근 max_disk_items번의 쓰기보다 오래된 행을 범위 삭제
+            # 전체를 정렬하거나 OFFSET으로 훑지 않고 rowid 범위만 지움
+            self._db.execute(
+                "DELETE FROM translation_cache WHERE rowid <= (SELECT MAX(rowid) FROM translation_cache) - ?",
+                (self.max_disk_items,))
+        return len(pending)
+
+    def get_stats(self):
+        hits = self.stats["memory_hits"] + self.stats["disk_hits"]
+        total = hits + self.stats["misses"]
+        return {**self.stats, "memory_size": len(self._memory), "hit_rate": hits / total if total else 0.0}
+
+    def close(self):
+        self.flush()
+        with self._db_lock:
+            self._db.close()
+        with self._reader_lock:
+            self._reader.close()
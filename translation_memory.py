@@ -0,0 +1,138 @@
+import json
+import os
+import re
+import threading
+from collections import OrderedDict, defaultdict
+
+from prompt_normalizer import EMOJI_PATTERN, MENTION_PATTERN
+
+# 🔹 번역 메모리: 예전 원문/번역 쌍을 기억해두고 비슷한 메시지에 재활용
+TRANSLATION_MEMORY_PATH = "bot_setting/translation_memory.json"
+# 숫자, 커스텀 이모지, 멘션은 번역 없이 그대로 바꿔 끼울 수 있는 토큰
+SLOT_PATTERN = re.compile("|".join((EMOJI_PATTERN.pattern, MENTION_PATTERN.pattern, r"\d+(?:[.,]\d+)?")))
+TOKEN_PATTERN = re.compile(SLOT_PATTERN.pattern + r"|\w+|[^\w\s]", re.UNICODE)
+
+def _grams(text):
+    text = f" {SLOT_PATTERN.sub('#', text.lower())} "
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+def _try_template(old_source, old_translation, new_source):
+    """숫자/이모지/멘션만 다른 경우, 예전 번역에서 해당 토큰만 바꿔 끼워 반환 (불가능하면 None)"""
+    old_tokens, new_tokens = TOKEN_PATTERN.findall(old_source), TOKEN_PATTERN.findall(new_source)
+    if len(old_tokens) != len(new_tokens):
+        return None
+    translation = old_translation
+    for old, new in zip(old_tokens, new_tokens):
+        if old == new:
+            continue
+        if not (SLOT_PATTERN.fullmatch(old) and SLOT_PATTERN.fullmatch(new)):
+            return None  # 일반 단어가 다르면 템플릿으로 처리할 수 없음
+        if translation.count(old) != 1:
+            return None  # 번역문에서 위치를 확정할 수 없음
+        translation = translation.replace(old, new)
+    return translation
+
+class TranslationMemory:
+    """
+    서버별로 최근 번역 쌍을 문자 3-gram 역색인으로 보관하고, 비슷한(자카드 유사도) 예전 번역을 찾아줍니다.
+    서버당 max_entries개까지만 보관하며 오래 쓰이지 않은 항목부터 지웁니다.
+    """
+
+    def __init__(self, path=TRANSLATION_MEMORY_PATH, max_entries=300, threshold=0.6):
+        self.path = path
+        self.max_entries = max_entries
+        self.threshold = threshold
+        self._guilds = {}  # guild_id(str) -> {"entries": OrderedDict(entry_id -> entry), "index": {gram: set(entry_id)}, "next_id": int}
+        self._lock = threading.Lock()
+        self._dirty = False
+        self.stats = {"template_hits": 0, "adapt_hits": 0, "misses": 0}
+
+    def _guild(self, guild_id):
+        return self._guilds.setdefault(str(guild_id), {"entries": OrderedDict(), "index": defaultdict(set), "next_id": 0})
+
+    def add(self, guild_id, source, translation, target_lang, detected_language):
+        with self._lock:
+            guild = self._guild(guild_id)
+            entry_id = guild["next_id"]
+            guild["next_id"] += 1
+            grams = _grams(source)
+            guild["entries"][entry_id] = {"source": source, "translation": translation, "target_language": target_lang,
+                                          "detected_language": detected_language, "grams": grams}
+            for gram in grams:
+                guild["index"][gram].add(entry_id)
+            while len(guild["entries"]) > self.max_entries:
+                old_id, old_entry = guild["entries"].popitem(last=False)
+                for gram in old_entry["grams"]:
+                    ids = guild["index"].get(gram)
+                    if ids is not None:
+                        ids.discard(old_id)
+                        if not ids:
+                            del guild["index"][gram]
+            self._dirty = True
+
+    def lookup(self, guild_id, source, target_lang):
+        """
+        비슷한 예전 번역을 찾습니다.
+        반환: ("template", 번역문, entry) / ("adapt", None, entry) / (None, None, None)
+        """
+        grams = _grams(source)
+        with self._lock:
+            guild = self._guilds.get(str(guild_id))
+            if not guild or not grams:
+                self.stats["misses"] += 1
+                return None, None, None
+            overlap = defaultdict(int)
+            for gram in grams:
+                for entry_id in guild["index"].get(gram, ()):
+                    overlap[entry_id] += 1
+
+            best_id, best_score = None, 0.0
+            for entry_id, shared in overlap.items():
+                entry = guild["entries"][entry_id]
+                if entry["target_language"] != target_lang:
+                    continue
+                score = shared / (len(grams) + len(entry["grams"]) - shared)
+                if score > best_score:
+                    best_id, best_score = entry_id, score
+            if best_id is None or best_score < self.threshold:
+                self.stats["misses"] += 1
+                return None, None, None
+
+            guild["entries"].move_to_end(best_id)
+            entry = guild["entries"][best_id]
+            translation = _try_template(entry["source"], entry["translation"], source)
+            if translation is not None:
+                self.stats["template_hits"] += 1
+                return "template", translation, entry
+            return "adapt", None, entry  # 실제로 썼는지는 호출하는 쪽이 count_adapt()로 알려줌
+
+    def count_adapt(self, used):
+        """lookup()이 준 "adapt" 후보를 실제 번역에 썼으면 adapt_hits, 버렸으면 misses로 셉니다."""
+        with self._lock:
+            self.stats["adapt_hits" if used else "misses"] += 1
+
+    def load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return
+        for guild_id, entries in data.items():
+            for entry in entries[-self.max_entries:]:
+                self.add(guild_id, entry["source"], entry["translation"], entry["target_language"], entry["detected_language"])
+        self._dirty = False
+
+    def save(self):
+        """변경된 내용이 있으면 파일로 저장합니다. (이벤트 루프 밖에서 호출)"""
+        with self._lock:
+            if not self._dirty:
+                return False
+            data = {guild_id: [{k: v for k, v in entry.items() if k != "grams"} for entry in guild["entries"].values()]
+                    for guild_id, guild in self._guilds.items()}
+            self._dirty = False
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(temp_path, self.path)
+        return True
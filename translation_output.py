@@ -0,0 +1,158 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+
+import discord
+
+from background_tasks import spawn
+
+log = logging.getLogger('RubyBot')
+
+# 🔹 자동 번역 결과 전송: 같은 채널에 비슷한 시각에 끝난 번역을 임베드 하나로 묶어서 보냄
+EMBED_TOTAL_LIMIT = 6000
+EMBED_FIELD_LIMIT = 25
+FIELD_NAME_LIMIT = 256
+FIELD_VALUE_LIMIT = 1024
+EMBED_MARGIN = 100  # 묶음 임베드 꼬리말 등 여유분
+MAX_TRACKED_CHANNELS = 200  # 채널별 전송 지연을 기록해 둘 최대 채널 수
+
+def _clip(text, limit):
+    return text if len(text) <= limit else text[:limit - 1] + "…"
+
+def _code(text, limit=FIELD_VALUE_LIMIT):
+    return f"```{_clip(text, limit - 6)}```"
+
+class TranslationPost:
+    """번역 결과 하나 (원본 메시지 1개 + 언어별 번역문)"""
+    __slots__ = ("author_name", "author_icon", "jump_url", "original", "translations", "footer", "queued_at")
+
+    def __init__(self, author_name, author_icon, jump_url, original, translations, footer):
+        self.author_name = author_name
+        self.author_icon = author_icon
+        self.jump_url = jump_url
+        self.original = original
+        self.translations = translations  # [(필드 이름, 번역문), ...]
+        self.footer = footer
+        self.queued_at = time.monotonic()
+
+    def _value_limit(self):
+        """필드 값 하나의 최대 길이. 번역 언어가 많아도 게시물 하나가 임베드 전체 한도(6000자) 안에 들도록 나눠 가짐"""
+        names = FIELD_NAME_LIMIT + len(self.footer) + sum(len(_clip(name, FIELD_NAME_LIMIT)) for name, _ in self.translations)
+        return min(FIELD_VALUE_LIMIT, (EMBED_TOTAL_LIMIT - EMBED_MARGIN - names) // (1 + len(self.translations)))
+
+    def single_embed(self):
+        """평소처럼 메시지 1개를 임베드 1개로"""
+        limit = self._value_limit()
+        embed = discord.Embed(color=discord.Color.og_blurple())
+        embed.set_author(name=_clip(f"{self.author_name} 님의 메시지", FIELD_NAME_LIMIT), icon_url=self.author_icon, url=self.jump_url)
+        embed.add_field(name="원본 메시지", value=_code(self.original, limit), inline=False)
+        for name, text in self.translations:
+            embed.add_field(name=_clip(name, FIELD_NAME_LIMIT), value=_code(text, limit), inline=False)
+        embed.set_footer(text=self.footer)
+        return embed
+
+    def merged_fields(self):
+        """묶음 임베드에 들어갈 필드들 (작성자·원본 링크를 첫 필드에 포함)"""
+        limit = self._value_limit()
+        link = f"[원본]({self.jump_url})"
+        fields = [(_clip(f"💬 {self.author_name} 님 · {self.footer}", FIELD_NAME_LIMIT), link + _code(self.original, limit - len(link)))]
+        fields.extend((_clip(name, FIELD_NAME_LIMIT), _code(text, limit)) for name, text in self.translations)
+        return fields
+
+class TranslationOutput:
+    """
+    번역 채널별로 결과를 모았다가 임베드 한도(필드 25개, 6000자) 안에서 하나로 합쳐 보냅니다.
+    전송 중에 도착한 결과는 다음 임베드에 합쳐지므로, 채널이 바쁠수록 메시지 수가 줄어듭니다.
+    """
+
+    def __init__(self, window=0.5):
+        self.window = window  # 모으는 시간 (초)
+        self._channels = {}  # channel_id -> {"channel", "posts", "busy"}
+        self._latency = OrderedDict()  # channel_id -> [전송 수, 총 지연, 최대 지연] (최근 전송한 MAX_TRACKED_CHANNELS개 채널만)
+        self.stats = {"posts": 0, "sends": 0, "saved_sends": 0, "failed": 0, "delivered": 0, "total_latency": 0.0, "max_latency": 0.0}
+
+    def enqueue(self, channel, post):
+        state = self._channels.setdefault(channel.id, {"channel": channel, "posts": [], "busy": False})
+        state["posts"].append(post)
+        if not state["busy"]:
+            state["busy"] = True
+            asyncio.get_running_loop().call_later(self.window, lambda: spawn(self._drain(channel.id)))
+
+    def _pack(self, posts):
+        """posts를 임베드 한도에 맞게 나눔 → [(embed, [post, ...]), ...]"""
+        if len(posts) == 1:
+            return [(posts[0].single_embed(), posts)]
+        packs, fields, members, size = [], [], [], 0
+        for post in posts:
+            post_fields = post.merged_fields()[:EMBED_FIELD_LIMIT]
+            post_size = sum(len(name) + len(value) for name, value in post_fields)
+            if members and (len(fields) + len(post_fields) > EMBED_FIELD_LIMIT or size + post_size > EMBED_TOTAL_LIMIT - EMBED_MARGIN):
+                packs.append((fields, members))
+                fields, members, size = [], [], 0
+            fields.extend(post_fields)
+            members.append(post)
+            size += post_size
+
+        if members:
+            packs.append((fields, members))
+        result = []
+        for fields, members in packs:
+            if len(members) == 1:
+                result.append((members[0].single_embed(), members))
+                continue
+            embed = discord.Embed(color=discord.Color.og_blurple())
+            for name, value in fields:
+                embed.add_field(name=name, value=value, inline=False)
+            embed.set_footer(text=f"자동 번역 {len(members)}개")
+            result.append((embed, members))
+        return result
+
+    async def _drain(self, channel_id):
+        state = self._channels[channel_id]
+        try:
+            while state["posts"]:
+                posts, state["posts"] = state["posts"], []
+                packs = self._pack(posts)
+                self.stats["posts"] += len(posts)
+                self.stats["saved_sends"] += len(posts) - len(packs)
+                for embed, members in packs:
+                    try:
+                        await state["channel"].send(embed=embed)
+                        self.stats["sends"] += 1
+                    except Exception as e:
+                        self.stats["failed"] += 1
+                        log.error(f"번역 결과 전송 실패 (채널: {channel_id}): {e}")
+                        continue
+                    self._record_latency(channel_id, [time.monotonic() - post.queued_at for post in members])
+        finally:
+            state["busy"] = False
+            if state["posts"]:
+                state["busy"] = True
+                spawn(self._drain(channel_id))
+            else:
+                del self._channels[channel_id]
+
+    def _record_latency(self, channel_id, lags):
+        self.stats["delivered"] += len(lags)
+        self.stats["total_latency"] += sum(lags)
+        self.stats["max_latency"] = max(self.stats["max_latency"], *lags)
+        latency = self._latency.pop(channel_id, None) or [0, 0.0, 0.0]
+        latency[0] += len(lags)
+        latency[1] += sum(lags)
+        latency[2] = max(latency[2], *lags)
+        self._latency[channel_id] = latency  # 최근 전송한 채널을 맨 뒤로
+        while len(self._latency) > MAX_TRACKED_CHANNELS:
+            self._latency.popitem(last=False)
+
+    def get_stats(self):
+        """전송 지연 = 번역 완료부터 채널 전송 완료까지 (초). 가장 느린 채널은 최근 전송한 채널 중에서"""
+        delivered = self.stats["delivered"]
+        slowest = max(self._latency.items(), key=lambda item: item[1][1] / item[1][0], default=(None, [1, 0.0, 0.0]))
+        return {
+            **self.stats,
+            "pending": sum(len(state["posts"]) for state in self._channels.values()),
+            "avg_latency": self.stats["total_latency"] / delivered if delivered else 0.0,
+            "slowest_channel": slowest[0],
+            "slowest_avg_latency": slowest[1][1] / slowest[1][0]
+        }
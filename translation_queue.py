@@ -0,0 +1,127 @@
+import logging
+from collections import deque
+
+from background_tasks import spawn
+
+log = logging.getLogger('RubyBot')
+
+# 🔹 서버별 자동 번역 작업 대기열 (작업 수 제한 + 넘칠 때의 처리 정책 + 전체 워커 수 제한)
+OVERFLOW_POLICIES = ("drop_oldest", "merge", "skip")
+
+class GuildTranslationQueue:
+    """
+    서버마다 정해진 개수(workers_per_guild)의 워커만 번역 작업을 처리하도록 하는 대기열입니다.
+    모든 서버를 합친 워커 수도 max_workers개로 제한합니다. 한도에 걸려 워커를 못 받은 서버는 차례를 기다리고,
+    워커는 작업 하나를 끝낼 때마다 기다리는 서버가 있으면 자리를 넘겨줍니다. (바쁜 서버 하나가 독차지하지 않도록)
+    overflow_policy:
+      - drop_oldest: 대기열이 가득 차면 가장 오래된 작업을 버리고 새 작업을 넣음
+      - merge: 대기열이 가득 찼을 때 마지막 대기 작업이 같은 작성자·채널이면 이어 붙이고, 합칠 수 없으면 새 작업을 버림
+        (여유가 있을 때는 합치지 않음: 합친 작업은 번역 메모리·캐시를 쓰지 못하고 메시지별 결과도 하나로 묶임)
+      - skip: 대기열이 가득 차면 새 작업을 버림
+    작업(job)은 dict이며 "author_id", "channel_id", "text" 키를 사용합니다.
+    """
+
+    def __init__(self, handler, max_depth=20, workers_per_guild=2, overflow_policy="drop_oldest", max_workers=16):
+        if overflow_policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"알 수 없는 대기열 정책: {overflow_policy}")
+        self._handler = handler  # async def handler(job)
+        self.max_depth = max_depth
+        self.workers_per_guild = workers_per_guild
+        self.max_workers = max_workers
+        self.overflow_policy = overflow_policy
+        self._guilds = {}  # guild_id -> {"jobs": deque, "workers": int}
+        self._workers = 0
+        self._waiting = deque()  # 전체 워커 한도 때문에 워커를 못 받은 guild_id (차례대로)
+        self.stats = {"submitted": 0, "processed": 0, "dropped": 0, "merged": 0, "failed": 0, "handoffs": 0}
+
+    @staticmethod
+    def _mergeable(last, job):
+        return (last["author_id"] == job["author_id"] and last["channel_id"] == job["channel_id"]
+                and last.get("target_languages") == job.get("target_languages"))
+
+    def submit(self, guild_id, job) -> bool:
+        """작업을 대기열에 넣습니다. 정책에 의해 새 작업이 버려지면 False"""
+        self.stats["submitted"] += 1
+        state = self._guilds.setdefault(guild_id, {"jobs": deque(), "workers": 0})
+        jobs = state["jobs"]
+        accepted = True
+
+        if self.overflow_policy == "merge" and len(jobs) >= self.max_depth and self._mergeable(jobs[-1], job):
+            last = jobs[-1]
+            last["text"] = f"{last['text']}\n{job['text']}"
+            last["message"] = job.get("message", last.get("message"))
+            last["memory_entry"] = None  # 합친 글에는 예전 번역 템플릿이 맞지 않음
+            self.stats["merged"] += 1
+        elif len(jobs) >= self.max_depth:
+            if self.overflow_policy == "drop_oldest":
+                jobs.popleft()
+                jobs.append(job)
+            else:
+                accepted = False
+            self.stats["dropped"] += 1
+            if self.stats["dropped"] % 50 == 1:  # 로그 폭주 방지
+                log.warning(f"[번역 대기열] 서버 {guild_id}의 번역 대기열이 가득 찼어요. (정책: {self.overflow_policy}, 누적 버림: {self.stats['dropped']}개)")
+        else:
+            jobs.append(job)
+
+        self._start_worker(guild_id, state)
+        return accepted
+
+    def _start_worker(self, guild_id, state):
+        if not state["jobs"] or state["workers"] >= self.workers_per_guild:
+            return
+        if self._workers >= self.max_workers:
+            if state["workers"] == 0 and guild_id not in self._waiting:
+                self._waiting.append(guild_id)
+            return
+        state["workers"] += 1
+        self._workers += 1
+        spawn(self._worker(guild_id, state))
+
+    def _dispatch_waiting(self):
+        while self._waiting and self._workers < self.max_workers:
+            guild_id = self._waiting.popleft()
+            state = self._guilds.get(guild_id)
+            if state:
+                self._start_worker(guild_id, state)
+
+    async def _worker(self, guild_id, state):
+        try:
+            while state["jobs"]:
+                job = state["jobs"].popleft()
+                try:
+                    await self._handler(job)
+                    self.stats["processed"] += 1
+                except Exception as e:
+                    self.stats["failed"] += 1
+                    log.error(f"[번역 대기열] 작업 처리 중 오류 (서버: {guild_id}): {e}")
+                if self._waiting and self._workers >= self.max_workers:
+                    self.stats["handoffs"] += 1
+                    break  # 워커를 기다리는 다른 서버에 자리를 넘김
+        finally:
+            state["workers"] -= 1
+            self._workers -= 1
+            if state["jobs"]:
+                if state["workers"] == 0 and guild_id not in self._waiting:
+                    self._waiting.append(guild_id)
+            elif state["workers"] == 0 and self._guilds.get(guild_id) is state:
+                del self._guilds[guild_id]
+            self._dispatch_waiting()
+
+    def depth(self, guild_id=None):
+        if guild_id is not None:
+            state = self._guilds.get(guild_id)
+            return len(state["jobs"]) if state else 0
+        return sum(len(state["jobs"]) for state in self._guilds.values())
+
+    def get_stats(self):
+        busiest = max(self._guilds.items(), key=lambda item: len(item[1]["jobs"]), default=(None, None))
+        return {
+            **self.stats,
+            "depth": self.depth(),
+            "workers": self._workers,
+            "waiting_guilds": len(self._waiting),
+            "active_guilds": len(self._guilds),
+            "busiest_guild": busiest[0],
+            "busiest_depth": len(busiest[1]["jobs"]) if busiest[1] else 0
+        }
@@ -0,0 +1,96 @@
+import os
+import sqlite3
+import threading
+from collections import Counter
+
+# 🔹 명령어 사용량 집계 저장소 (시간 단위 롤업)
+USAGE_DB_PATH = "bot_setting/usage_metrics.db"
+
+USAGE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS usage_hourly (
+    hour TEXT NOT NULL,
+    guild_id INTEGER NOT NULL,
+    command TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (hour, guild_id, command)
+);
+"""
+# 조회는 모두 기간(hour) 범위로 하므로 기본 키 인덱스 (hour, guild_id, command)를 그대로 사용함
+
+def hour_bucket(dt):
+    """datetime -> 'YYYY-MM-DD HH' 롤업 키"""
+    return dt.strftime("%Y-%m-%d %H")
+
+class UsageMetrics:
+    """명령어 호출 수를 메모리에 모았다가 시간 단위로 SQLite에 합산 저장합니다."""
+
+    def __init__(self, db_path=USAGE_DB_PATH):
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(db_path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(USAGE_SCHEMA)
+        self._db_lock = threading.Lock()
+        self._pending = Counter()  # (hour, guild_id, command) -> count
+        self._pending_lock = threading.Lock()
+
+    def record(self, guild_id, command, now):
+        """명령어 1회 사용 기록 (메모리만 갱신, O(1))"""
+        key = (hour_bucket(now), guild_id, command)
+        with self._pending_lock:
+            self._pending[key] += 1
+
+    def flush(self):
+        """모아둔 카운터를 DB에 합산하고 반영한 행 수를 반환 (이벤트 루프 밖에서 호출)
+        DB 저장에 실패하면 꺼낸 카운터를 다시 합쳐 두고 예외를 그대로 올림 (다음 flush에서 재시도)"""
+        with self._pending_lock:
+            pending, self._pending = self._pending, Counter()
+        if not pending:
+            return 0
+        try:
+            with self._db_lock, self._db:
+                self._db.executemany(
+                    "INSERT INTO usage_hourly (hour, guild_id, command, count) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT(hour, guild_id, command) DO UPDATE SET count = count + excluded.count",
+                    [(hour, guild_id, command, count) for (hour, guild_id, command), count in pending.items()])
+        except sqlite3.Error:
+            with self._pending_lock:
+                self._pending.update(pending)
+            raise
+        return len(pending)
+
+    def _pending_in_range(self, start_hour, end_hour):
+        with self._pending_lock:
+            return [(key, count) for key, count in self._pending.items() if start_hour <= key[0] < end_hour]
+
+    def guild_command_counts(self, start_hour, end_hour):
+        """[start_hour, end_hour) 구간의 서버별·명령어별 사용량 {guild_id: {command: count}}"""
+        result = {}
+        with self._db_lock:
+            rows = self._db.execute(
+                "SELECT guild_id, command, SUM(count) FROM usage_hourly "
+                "WHERE hour >= ? AND hour < ? GROUP BY guild_id, command",
+                (start_hour, end_hour)).fetchall()
+        for guild_id, command, count in rows:
+            result.setdefault(guild_id, Counter())[command] += count
+        for (_, guild_id, command), count in self._pending_in_range(start_hour, end_hour):
+            result.setdefault(guild_id, Counter())[command] += count
+        return result
+
+    def top_guilds(self, start_hour, end_hour, limit=10):
+        """[start_hour, end_hour) 구간에서 사용량이 많은 서버 상위 N개 [(guild_id, total)]"""
+        totals = Counter()
+        with self._db_lock:
+            rows = self._db.execute(
+                "SELECT guild_id, SUM(count) FROM usage_hourly "
+                "WHERE hour >= ? AND hour < ? GROUP BY guild_id",
+                (start_hour, end_hour)).fetchall()
+        for guild_id, count in rows:
+            totals[guild_id] += count
+        for (_, guild_id, _), count in self._pending_in_range(start_hour, end_hour):
+            totals[guild_id] += count
+        return totals.most_common(limit)
+
+    def close(self):
+        self.flush()
+        with self._db_lock:
+            self._db.close()